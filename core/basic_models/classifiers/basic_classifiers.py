@@ -1,24 +1,29 @@
+import asyncio
+import concurrent.futures
 import inspect
 import pickle
 import sys
 from abc import ABC, abstractmethod
 from functools import cached_property
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Dict, Optional, Union, List, Set
 
 import numpy as np
-from timeout_decorator import timeout_decorator
 
 import core.basic_models.classifiers.classifiers_constants as cls_const
 from core.basic_models.classifiers.vectorizer_models import vectorizers
 from core.model.factory import build_factory
 from core.model.registered import Registered
 from core.text_preprocessing.base import BaseTextPreprocessingResult
-from core.utils.exception_handlers import exc_handler
+from core.utils.deadline import deadline
 
 classifiers = Registered()
 
 classifier_factory = build_factory(classifiers)
 
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=cls_const.EXTERNAL_CLASSIFIER_MAX_WORKERS,
+                                                  thread_name_prefix="external_classifier")
+_abandoned_calls: Set[concurrent.futures.Future] = set()
+
 
 class Classifier(ABC):
     """Базовый класс для сущности Классификатор."""
@@ -54,6 +59,15 @@ class Classifier(ABC):
         # Формируется отсортированный список наиболее вероятных вариантов
         raise NotImplementedError
 
+    async def find_best_answer_async(
+            self,
+            text_preprocessing_result: BaseTextPreprocessingResult,
+            mask: Optional[Dict[str, bool]] = None,
+            scenario_classifiers: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Union[str, float, bool]]]:
+        # Классификаторы, умеющие не блокировать event loop, переопределяют этот метод
+        return self.find_best_answer(text_preprocessing_result, mask, scenario_classifiers)
+
     @abstractmethod
     def initial_launch(
             self,
@@ -99,18 +113,48 @@ class SkipClassifier(Classifier):
 class ExternalClassifier(Classifier):
     """Внешний классификатор.
     Выполняет некую функцию обёртки для вызова реализованных классов классификаторов по имени.
+
+    Синхронные классификаторы выполняются в общем ограниченном пуле потоков, ответ ждётся не дольше таймаута.
+    Поток нельзя прервать, поэтому не успевший классификатор продолжает работу, такие вызовы считаются
+    в abandoned_calls и в метрике external_classifier_abandoned. В отличие от прежнего таймаута по SIGALRM,
+    который прерывал сам классификатор, зависший классификатор занимает поток пула. Пока брошенных вызовов
+    не меньше MAX_ABANDONED_CALLS, новые вызовы не ставятся в очередь пула, а сразу возвращают ответ таймаута
+    и считаются в метрике external_classifier_rejected, так что оставшиеся потоки не простаивают в очереди.
     """
 
     # Дефолтное значение таймаута, время за которое должен прийти ответ от внешнего классификатора
     BLOCKING_TIMEOUT = cls_const.EXTERNAL_CLASSIFIER_BLOCKING_TIMEOUT
     CLASSIFIER_TYPE = "external"
+    ABANDONED_COUNTER = "external_classifier_abandoned"
+    REJECTED_COUNTER = "external_classifier_rejected"
+    MAX_ABANDONED_CALLS = cls_const.EXTERNAL_CLASSIFIER_MAX_ABANDONED_CALLS
 
     def __init__(self, settings: Dict[str, Any], id: Optional[str] = None) -> None:
         super(ExternalClassifier, self).__init__(settings, id)
         self._classifier_key = settings["classifier"]
-        self._timeout_wrap = timeout_decorator.timeout(self.settings.get("timeout") or self.BLOCKING_TIMEOUT)
+        self._timeout = self.settings.get("timeout") or self.BLOCKING_TIMEOUT
+
+    @staticmethod
+    def abandoned_calls() -> int:
+        return len(_abandoned_calls)
+
+    def _submit(self, classifier: Classifier, *args) -> Optional[concurrent.futures.Future]:
+        from core.monitoring.monitoring import monitoring
+        if len(_abandoned_calls) >= self.MAX_ABANDONED_CALLS:
+            # пул занят зависшими вызовами, ожидание в очереди закончилось бы тем же таймаутом
+            monitoring.got_counter(self.REJECTED_COUNTER)
+            return None
+        return _executor.submit(classifier.find_best_answer, *args)
+
+    def _abandon(self, future: concurrent.futures.Future) -> None:
+        from core.monitoring.monitoring import monitoring
+        # ещё не начатый вызов отменяется, начатый доработает в своём потоке
+        if future.cancel() or future.done():
+            return
+        monitoring.got_counter(self.ABANDONED_COUNTER)
+        _abandoned_calls.add(future)
+        future.add_done_callback(_abandoned_calls.discard)
 
-    @exc_handler(on_error_obj_method_name="on_timeout_error", handled_exceptions=(timeout_decorator.TimeoutError,))
     def find_best_answer(
             self,
             text_preprocessing_result: BaseTextPreprocessingResult,
@@ -118,7 +162,38 @@ class ExternalClassifier(Classifier):
             scenario_classifiers: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Union[str, float, bool]]]:
         classifier = scenario_classifiers[self._classifier_key]
-        return self._timeout_wrap(classifier.find_best_answer)(text_preprocessing_result, mask, scenario_classifiers)
+        future = self._submit(classifier, text_preprocessing_result, mask, scenario_classifiers)
+        if future is None:
+            return self.on_timeout_error()
+        try:
+            return future.result(timeout=self._timeout)
+        except concurrent.futures.TimeoutError:
+            self._abandon(future)
+            return self.on_timeout_error()
+
+    async def find_best_answer_async(
+            self,
+            text_preprocessing_result: BaseTextPreprocessingResult,
+            mask: Optional[Dict[str, bool]] = None,
+            scenario_classifiers: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Union[str, float, bool]]]:
+        classifier = scenario_classifiers[self._classifier_key]
+        future = None
+        if type(classifier).find_best_answer_async is Classifier.find_best_answer_async:
+            # Синхронный классификатор выполняется в потоке, чтобы не блокировать event loop до таймаута
+            future = self._submit(classifier, text_preprocessing_result, mask, scenario_classifiers)
+            if future is None:
+                return self.on_timeout_error()
+            answer = asyncio.wrap_future(future)
+        else:
+            answer = classifier.find_best_answer_async(text_preprocessing_result, mask, scenario_classifiers)
+        try:
+            async with deadline(self._timeout):
+                return await answer
+        except asyncio.TimeoutError:
+            if future is not None:
+                self._abandon(future)
+            return self.on_timeout_error()
 
     @staticmethod
     def on_timeout_error(*args, **kwarg):
@@ -8,6 +8,9 @@ OTHER_KEY = "other"
 
 # Дополнительные константы для внешних "external" классификаторов
 EXTERNAL_CLASSIFIER_BLOCKING_TIMEOUT = 0.2  # Время (в секундах) за которое классификатор должен успеть ответить
+EXTERNAL_CLASSIFIER_MAX_WORKERS = 8  # Число потоков, в которых выполняются синхронные классификаторы
+# Число брошенных по таймауту и ещё работающих вызовов, после которого новые вызовы сразу завершаются таймаутом
+EXTERNAL_CLASSIFIER_MAX_ABANDONED_CALLS = 6
 
 # Константы классификатора Intent Recognizer
 INTENT_RECOGNIZER_ANSWER_DISTANCE_KEY = "answer_distance"
@@ -10,6 +10,7 @@ from croniter import croniter
 import core.logging.logger_constants as log_const
 from core.basic_models.classifiers.basic_classifiers import Classifier, ExternalClassifier
 from core.basic_models.operators.operators import Operator
+from core.basic_models.requirement.requirement_compiler import requirement_compiler
 from core.logging.logger_utils import log, log_classifier_result
 from core.model.base_user import BaseUser
 from core.model.factory import build_factory, list_factory, factory
@@ -34,6 +35,7 @@ class Requirement:
 
     Атрибуты:
         cache_result    то же, что и items["cache_result"]
+        cost            статическая оценка стоимости проверки, по ней упорядочиваются условия внутри and/or
 
     Примечания:
         Кэширование допустимо только в случае, если функция выдаёт один и тот же результат в рамках времени кэширования,
@@ -42,6 +44,7 @@ class Requirement:
         подойдёт для рассматриваемого requirement.
     """
     cache_result = False
+    cost = 1
 
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         items = items or {}
@@ -122,7 +125,11 @@ class CompositeRequirement(Requirement):
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         super().__init__(items, id)
         self._requirements = items["requirements"]
-        self.requirements = self.build_requirements()
+        self.requirements = requirement_compiler.compile_children(self.build_requirements())
+
+    @cached_property
+    def cost(self) -> int:
+        return sum(requirement.cost for requirement in self.requirements)
 
     @list_factory(Requirement)
     def build_requirements(self):
@@ -134,7 +141,7 @@ class AndRequirement(CompositeRequirement):
     def _check(self, text_preprocessing_result: BaseTextPreprocessingResult, user: BaseUser,
                params: Dict[str, Any] = None) -> bool:
         return all(
-            requirement.check(text_preprocessing_result=text_preprocessing_result, user=user, params=params)
+            requirement_compiler.check_child(requirement, text_preprocessing_result, user, params)
             for requirement in self.requirements
         )
 
@@ -144,7 +151,7 @@ class OrRequirement(CompositeRequirement):
     def _check(self, text_preprocessing_result: BaseTextPreprocessingResult, user: BaseUser,
                params: Dict[str, Any] = None) -> bool:
         return any(
-            requirement.check(text_preprocessing_result=text_preprocessing_result, user=user, params=params)
+            requirement_compiler.check_child(requirement, text_preprocessing_result, user, params)
             for requirement in self.requirements
         )
 
@@ -155,7 +162,11 @@ class NotRequirement(Requirement):
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         super().__init__(items, id)
         self._requirement = items["requirement"]
-        self.requirement = self.build_requirement()
+        self.requirement = requirement_compiler.intern(self.build_requirement())
+
+    @property
+    def cost(self) -> int:
+        return self.requirement.cost
 
     @factory(Requirement)
     def build_requirement(self):
@@ -206,6 +217,8 @@ class TopicRequirement(Requirement):
 
 
 class TemplateRequirement(Requirement):
+    cost = 10
+
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         super().__init__(items, id)
         self._template = UnifiedTemplateMultiLoader(items["template"])
@@ -284,6 +297,7 @@ class DateTimeRequirement(Requirement):
 
 class IntersectionRequirement(Requirement):
     phrases: Optional[List]
+    cost = 5
 
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         super().__init__(items, id)
@@ -312,6 +326,7 @@ class ClassifierRequirement(Requirement):
     Возвращает True, если результат классификации запроса относится к одной из указанных категорий, прошедших порог,
     но не равной классу other.
     """
+    cost = 100
 
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         super().__init__(items=items, id=id)
@@ -15,6 +15,8 @@ class ExternalRequirements(SmartUpdatableDescriptionsItems):
 
 class ExternalRequirement(Requirement):
     requirement: str
+    # the referenced requirement is known only when checked
+    cost = 10
 
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         super().__init__(items, id)
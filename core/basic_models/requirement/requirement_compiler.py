@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+import core.logging.logger_constants as log_const
+from core.logging.logger_utils import log
+
+if TYPE_CHECKING:
+    from core.basic_models.requirement.basic_requirements import Requirement
+
+
+class RequirementTiming:
+    def __init__(self, name: str, cost: int):
+        self.name = name
+        self.cost = cost
+        self.calls = 0
+        self.seconds = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+    def raw(self):
+        return {"name": self.name, "cost": self.cost, "calls": self.calls, "seconds": self.seconds, "mean": self.mean}
+
+
+class RequirementCompiler:
+    """Turns requirement trees into DAGs while they are built from descriptions.
+
+    Equal sub-requirements (by `id` and `hash_for_cache`) built within one `scope` are shared by one object.
+    This only saves memory: `cache_result` is keyed by `hash_for_cache`, so equal requirements are checked once
+    per message without sharing too. Descriptions open a scope for every load, so requirements of replaced
+    descriptions are not kept; outside of a scope nothing is shared. With `reorder` children of and/or requirements
+    are checked from the cheapest by their static `cost`; it is off by default, since descriptions may rely on
+    a child guarding the next one. With `timing` children of and/or requirements are timed to validate the costs,
+    the timings are logged every `timing_log_interval` seconds.
+    """
+
+    DEFAULT_TIMING_LOG_INTERVAL = 60
+
+    def __init__(self):
+        self.reorder = False
+        self.timing = False
+        self.timing_log_interval = self.DEFAULT_TIMING_LOG_INTERVAL
+        self._scope: ContextVar[Optional[Dict[Tuple[Optional[str], str], "Requirement"]]] = \
+            ContextVar("requirement_compiler_scope", default=None)
+        self.timings: Dict[str, RequirementTiming] = {}
+        self._timings_start = perf_counter()
+
+    def configure(self, reorder: bool = False, timing: bool = False,
+                  timing_log_interval: float = DEFAULT_TIMING_LOG_INTERVAL) -> None:
+        self.reorder = reorder
+        self.timing = timing
+        self.timing_log_interval = timing_log_interval
+
+    @contextmanager
+    def scope(self, requirements: Optional[Dict[Tuple[Optional[str], str], "Requirement"]] = None) -> Iterator[None]:
+        token = self._scope.set({} if requirements is None else requirements)
+        try:
+            yield
+        finally:
+            self._scope.reset(token)
+
+    def intern(self, requirement: "Requirement") -> "Requirement":
+        requirements = self._scope.get()
+        if requirements is None:
+            return requirement
+        return requirements.setdefault((requirement.id, requirement.hash_for_cache), requirement)
+
+    def compile_children(self, requirements: List["Requirement"]) -> List["Requirement"]:
+        requirements = [self.intern(requirement) for requirement in requirements]
+        if self.reorder:
+            requirements.sort(key=lambda requirement: requirement.cost)
+        return requirements
+
+    def check_child(self, requirement: "Requirement", text_preprocessing_result, user, params) -> bool:
+        if not self.timing:
+            return requirement.check(text_preprocessing_result=text_preprocessing_result, user=user, params=params)
+        start = perf_counter()
+        try:
+            return requirement.check(text_preprocessing_result=text_preprocessing_result, user=user, params=params)
+        finally:
+            timing = self.timings.get(requirement.hash_for_cache)
+            if timing is None:
+                timing = self.timings[requirement.hash_for_cache] = RequirementTiming(
+                    requirement.id or type(requirement).__name__, requirement.cost)
+            timing.calls += 1
+            timing.seconds += perf_counter() - start
+            if perf_counter() - self._timings_start >= self.timing_log_interval:
+                self.log_timings()
+
+    def log_timings(self) -> None:
+        """Logs the timings from the slowest in total and starts them again"""
+        timings = sorted(self.timings.values(), key=lambda timing: timing.seconds, reverse=True)
+        log("RequirementCompiler timings of %(count)s requirements", level="INFO",
+            params={log_const.KEY_NAME: "requirement_timings", "count": len(timings),
+                    "timings": [timing.raw() for timing in timings]})
+        self.clear()
+
+    def clear(self) -> None:
+        self.timings.clear()
+        self._timings_start = perf_counter()
+
+
+requirement_compiler = RequirementCompiler()
@@ -1,6 +1,8 @@
 import time
 from typing import Dict, Any, Optional, Tuple
 
+from core.model.state_version import next_state_version
+
 
 class Variables:
     DEFAULT_TTL = 86400
@@ -8,6 +10,7 @@ class Variables:
     def __init__(self, items, user, savable: bool = True):
         self._savable = savable
         self._storage: Dict[str, Tuple[Any, float]] = items or {}
+        self.version = 0
 
     @property
     def raw(self) -> Optional[Dict[str, Any]]:
@@ -23,6 +26,7 @@ class Variables:
     def set(self, key, value, ttl=None) -> None:
         ttl = ttl if ttl is not None else self.DEFAULT_TTL
         self._storage[key] = value, time.time() + ttl
+        self.version = next_state_version()
 
     def update(self, key, value, ttl=None) -> None:
         _, expire_time = self._storage.get(key, (None, None))
@@ -30,6 +34,7 @@ class Variables:
             ttl = ttl if ttl is not None else self.DEFAULT_TTL
             expire_time = ttl + time.time()
         self._storage[key] = value, expire_time
+        self.version = next_state_version()
 
     def get(self, key, default=None):
         value, expire_time = self._storage.get(key, (default, time.time() + self.DEFAULT_TTL))
@@ -43,8 +48,14 @@ class Variables:
             if expire_time <= time.time():
                 self.delete(key)
 
+    @property
+    def next_expire_time(self) -> float:
+        return min((expire_time for _, expire_time in self._storage.values()), default=float("inf"))
+
     def delete(self, key) -> None:
         del self._storage[key]
+        self.version = next_state_version()
 
     def clear(self) -> None:
         self._storage.clear()
+        self.version = next_state_version()
@@ -3,7 +3,9 @@ import importlib
 import typing
 
 from core.db_adapter import error
-from core.db_adapter.db_adapter import AsyncDBAdapter
+from core.db_adapter.aioredis_adapter import COMPARE_AND_SET_SCRIPT, REPLACE_IF_EQUALS_SCRIPT, \
+    VERSIONED_REPLACE_IF_EQUALS_SCRIPT, VERSIONED_SAVE_SCRIPT, count_replace_if_equals
+from core.db_adapter.db_adapter import AsyncDBAdapter, version_key
 from core.logging.logger_utils import log
 from core.monitoring.monitoring import monitoring
 
@@ -16,6 +18,8 @@ class AIORedisSentinelAdapter(AsyncDBAdapter):
         self._sentinel: typing.Optional[sentinel_type] = None
         self.service_name = None
         self.socket_timeout = None
+        self._scripts = {}
+        self.version_ttl = self.config.pop("version_ttl", 0)
 
         try:
             del self.config["type"]
@@ -53,22 +57,51 @@ class AIORedisSentinelAdapter(AsyncDBAdapter):
             sentinels_tuples.append(tuple(sent))
         self._sentinel = self.aioredis.sentinel.Sentinel(sentinels_tuples, **config)
 
+    async def get_redis(self):
+        return await self._sentinel.master_for(self.service_name, socket_timeout=self.socket_timeout)
+
     async def _open(self, filename, *args, **kwargs):
         pass
 
+    def _script(self, redis, script):
+        if script not in self._scripts:
+            # EVALSHA with the cached sha, the script is loaded again after a failover to a new master
+            self._scripts[script] = redis.register_script(script)
+        return self._scripts[script]
+
     async def _save(self, id, data):
         redis = await self._sentinel.master_for(self.service_name, socket_timeout=self.socket_timeout)
-        await redis.set(id, data)
+        if not self.versioned:
+            return await redis.set(id, data)
+        await self._script(redis, VERSIONED_SAVE_SCRIPT)(keys=[id, version_key(id)], args=[self.version_ttl, data],
+                                                          client=redis)
 
     async def _replace_if_equals(self, id, sample, data):
-        log("no replace_if_equals method. running save instead", level="WARNING")
-        await self.save(id, data)
+        redis = await self._sentinel.master_for(self.service_name, socket_timeout=self.socket_timeout)
+        if self.versioned:
+            replaced = await self._script(redis, VERSIONED_REPLACE_IF_EQUALS_SCRIPT)(
+                keys=[id, version_key(id)], args=[self.version_ttl, sample, data], client=redis)
+        else:
+            replaced = await self._script(redis, REPLACE_IF_EQUALS_SCRIPT)(keys=[id], args=[sample, data],
+                                                                           client=redis)
+        return count_replace_if_equals(bool(replaced))
+
+    async def _compare_and_set(self, id, expected_version, data):
+        redis = await self._sentinel.master_for(self.service_name, socket_timeout=self.socket_timeout)
+        version = await self._script(redis, COMPARE_AND_SET_SCRIPT)(
+            keys=[id, version_key(id)], args=[self.version_ttl, expected_version, data], client=redis)
+        return bool(version)
 
     async def _get(self, id):
         redis = await self._sentinel.master_for(self.service_name, socket_timeout=self.socket_timeout)
         data = await redis.get(id)
         return data
 
+    async def _get_with_version(self, id):
+        redis = await self._sentinel.master_for(self.service_name, socket_timeout=self.socket_timeout)
+        data, version = await redis.mget(id, version_key(id))
+        return data, int(version or 0)
+
     async def _list_dir(self, path):
         raise error.NotSupportedOperation
 
@@ -1,6 +1,6 @@
 # coding: utf-8
 import asyncio
-from typing import Optional
+from typing import Any, Optional, Tuple
 
 import core.logging.logger_constants as log_const
 from core.logging.logger_utils import log
@@ -17,6 +17,11 @@ class DBAdapterException(Exception):
     pass
 
 
+def version_key(id) -> str:
+    """Key of the version counter stored next to the value, versioned writes of the value increment it"""
+    return f"{id}:version"
+
+
 class DBAdapter(Rerunable):
     IS_ASYNC = False
 
@@ -39,9 +44,15 @@ class DBAdapter(Rerunable):
     def _replace_if_equals(self, id, sample, data):
         raise NotImplementedError
 
+    def _compare_and_set(self, id, expected_version, data):
+        raise NotImplementedError
+
     def _get(self, id):
         raise NotImplementedError
 
+    def _get_with_version(self, id):
+        raise NotImplementedError
+
     def _list_dir(self, path):
         raise NotImplementedError
 
@@ -91,10 +102,21 @@ class DBAdapter(Rerunable):
 
 class AsyncDBAdapter(DBAdapter):
     IS_ASYNC = True
+    # set by enable_versioning, then save and replace_if_equals increment the version as compare_and_set does
+    versioned = False
 
     async def is_alive(self) -> Optional[bool]:
         raise NotImplementedError
 
+    async def check_versioning(self) -> None:
+        """Raises DBAdapterException if compare_and_set can't be used with this storage"""
+        pass
+
+    async def enable_versioning(self) -> None:
+        """Makes every write increment the version, for apps that save users with compare_and_set"""
+        await self.check_versioning()
+        self.versioned = True
+
     async def _on_all_tries_fail(self):
         raise
 
@@ -104,9 +126,15 @@ class AsyncDBAdapter(DBAdapter):
     async def _replace_if_equals(self, id, sample, data):
         raise NotImplementedError
 
+    async def _compare_and_set(self, id, expected_version, data):
+        raise NotImplementedError
+
     async def _get(self, id):
         raise NotImplementedError
 
+    async def _get_with_version(self, id):
+        raise NotImplementedError
+
     async def _path_exists(self, path):
         raise NotImplementedError
 
@@ -121,10 +149,25 @@ class AsyncDBAdapter(DBAdapter):
     async def replace_if_equals(self, id, sample, data):
         return await self._async_run(self._replace_if_equals, id, sample, data)
 
+    @monitoring.got_histogram("save_time")
+    async def compare_and_set(self, id, expected_version: int, data) -> bool:
+        """Saves data only if the stored version is expected_version, the stored version is incremented then.
+
+        A missing version counts as 0, so the first versioned save of a new or a not yet versioned value
+        expects version 0. After enable_versioning save and replace_if_equals increment the version too, so a stale
+        compare_and_set can't overwrite them. Without it plain writes cost no version update.
+        """
+        return await self._async_run(self._compare_and_set, id, expected_version, data)
+
     @monitoring.got_histogram("get_time")
     async def get(self, id):
         return await self._async_run(self._get, id)
 
+    @monitoring.got_histogram("get_time")
+    async def get_with_version(self, id) -> Tuple[Any, int]:
+        """Returns the value with its version for a later compare_and_set"""
+        return await self._async_run(self._get_with_version, id)
+
     async def _async_run(self, action, *args, _try_count=None, **kwargs):
         if _try_count is None:
             _try_count = self.try_count
@@ -6,11 +6,13 @@ from typing import Optional
 import pyignite
 from pyignite import AioClient
 from pyignite.aio_cache import AioCache
+from pyignite.datatypes.cache_config import CacheAtomicityMode
+from pyignite.datatypes.prop_codes import PROP_CACHE_ATOMICITY_MODE
 from pyignite.exceptions import ReconnectError, SocketError, CacheError
 
 import core.logging.logger_constants as log_const
 from core.db_adapter import error
-from core.db_adapter.db_adapter import AsyncDBAdapter
+from core.db_adapter.db_adapter import AsyncDBAdapter, DBAdapterException, version_key
 from core.logging.logger_utils import log
 from core.monitoring.monitoring import monitoring
 
@@ -26,6 +28,7 @@ class IgniteAdapter(AsyncDBAdapter):
             random.shuffle(self._url)
         self._cache_name = config["cache_name"]
         self._cache = None
+        self._transactional: Optional[bool] = None
         super(IgniteAdapter, self).__init__(config)
 
     async def _open(self, filename, *args, **kwargs):
@@ -58,19 +61,63 @@ class IgniteAdapter(AsyncDBAdapter):
             monitoring.got_counter("ignite_connection_exception")
             raise
 
+    async def _is_transactional(self, cache) -> bool:
+        if self._transactional is None:
+            settings = await cache.settings()
+            self._transactional = settings.get(PROP_CACHE_ATOMICITY_MODE) == CacheAtomicityMode.TRANSACTIONAL
+        return self._transactional
+
+    async def check_versioning(self) -> None:
+        cache = await self.get_cache()
+        if not await self._is_transactional(cache):
+            raise DBAdapterException(f"compare_and_set needs a TRANSACTIONAL ignite cache, {self._cache_name} is not")
+
     async def _save(self, id, data):
         cache = await self.get_cache()
-        return await cache.put(id, data)
+        if not self.versioned:
+            return await cache.put(id, data)
+        async with self._client.tx_start() as tx:
+            version = await cache.get(version_key(id)) or 0
+            await cache.put(id, data)
+            await cache.put(version_key(id), version + 1)
+            await tx.commit()
 
     async def _replace_if_equals(self, id, sample, data):
         cache = await self.get_cache()
-        return await cache.replace_if_equals(id, sample, data)
+        if not self.versioned:
+            return await cache.replace_if_equals(id, sample, data)
+        async with self._client.tx_start() as tx:
+            if await cache.get(id) != sample:
+                return False
+            version = await cache.get(version_key(id)) or 0
+            await cache.put(id, data)
+            await cache.put(version_key(id), version + 1)
+            await tx.commit()
+        return True
+
+    async def _compare_and_set(self, id, expected_version, data):
+        # the version is locked by the pessimistic transaction, value and version become visible together on commit
+        cache = await self.get_cache()
+        await self.check_versioning()
+        async with self._client.tx_start() as tx:
+            version = await cache.get(version_key(id)) or 0
+            if version != expected_version:
+                return False
+            await cache.put(id, data)
+            await cache.put(version_key(id), version + 1)
+            await tx.commit()
+        return True
 
     async def _get(self, id):
         cache = await self.get_cache()
         data = await cache.get(id)
         return data
 
+    async def _get_with_version(self, id):
+        cache = await self.get_cache()
+        values = await cache.get_all([id, version_key(id)])
+        return values.get(id), values.get(version_key(id)) or 0
+
     async def get_cache(self):
         if self._client is None:
             log('Attempt to recreate ignite instance', level="WARNING")
@@ -78,6 +125,14 @@ class IgniteAdapter(AsyncDBAdapter):
             monitoring.got_counter("ignite_reconnection")
         return self._cache
 
+    async def get_client(self) -> AioClient:
+        await self.get_cache()
+        return self._client
+
+    @property
+    def cache_name(self) -> str:
+        return self._cache_name
+
     @property
     def _handled_exception(self):
         # TypeError is raised during reconnection if all nodes are exhausted
@@ -1,4 +1,4 @@
-from core.db_adapter.db_adapter import AsyncDBAdapter
+from core.db_adapter.db_adapter import AsyncDBAdapter, version_key
 from copy import copy
 from cachetools import TTLCache
 from core.db_adapter import error
@@ -34,20 +34,35 @@ class MemoryAdapter(AsyncDBAdapter):
     async def _open(self, filename, *args, **kwargs):
         pass
 
-    async def _save(self, id, data):
+    def _set(self, id, data, versioned=False):
         self.memory_storage[id] = data
+        if versioned or self.versioned:
+            # versions are stored as str to be measured by getsizeof like the values, they expire by the same ttl
+            self.memory_storage[version_key(id)] = str(int(self.memory_storage.get(version_key(id), 0)) + 1)
+
+    async def _save(self, id, data):
+        self._set(id, data)
 
     async def _replace_if_equals(self, id, sample, data):
         stored_data = self.memory_storage.get(id)
         if stored_data == sample:
-            self.memory_storage[id] = data
+            self._set(id, data)
             return True
         return False
 
+    async def _compare_and_set(self, id, expected_version, data):
+        if int(self.memory_storage.get(version_key(id), 0)) != expected_version:
+            return False
+        self._set(id, data, versioned=True)
+        return True
+
     async def _get(self, id):
         data = self.memory_storage.get(id)
         return data
 
+    async def _get_with_version(self, id):
+        return self.memory_storage.get(id), int(self.memory_storage.get(version_key(id), 0))
+
     async def _list_dir(self, path):
         pass
 
@@ -0,0 +1,174 @@
+# coding: utf-8
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+import scenarios.logging.logger_constants as log_const
+from core.db_adapter.db_adapter import DBAdapterException
+from core.logging.logger_utils import log
+from core.monitoring.monitoring import monitoring
+
+
+class _CachedUser:
+    __slots__ = ("data", "flushed_data", "flushed_version", "dirty", "stored_at", "flush_callbacks")
+
+    def __init__(self, data: Optional[Union[str, bytes]], flushed_data: Optional[Union[str, bytes]], dirty: bool,
+                 flushed_version: Optional[int] = None):
+        self.data = data
+        self.flushed_data = flushed_data
+        self.flushed_version = flushed_version
+        self.dirty = dirty
+        self.stored_at = time.monotonic()
+        # awaited once the data saved so far is written to db
+        self.flush_callbacks: List[Callable[[], Awaitable[None]]] = []
+
+
+class WriteBehindUserCache:
+    """Per-process L1 cache of serialized users keyed by db_uid with coalescing write-behind flushes.
+
+    Valid only while this process is the single writer of a user, e.g. when messages of a user are pinned to
+    one queue worker and the cache is invalidated on rebalance. Saves only update the cache, dirty users are
+    written to the db adapter by `flush`, so several messages of a chatty user cost one db write. Flushes check
+    the stored value with replace_if_equals or, for versioned saves, with compare_and_set. A user changed in db
+    by somebody else is dropped from the cache together with its callbacks. Callbacks given to `after_flush`,
+    e.g. commits of message offsets, are awaited only when the user is written, so messages of a dropped user are
+    redelivered and processed again against the stored state.
+    """
+    DEFAULT_MAX_SIZE = 10000
+    DEFAULT_TTL = 60
+    DEFAULT_FLUSH_INTERVAL = 1.0
+
+    def __init__(self, db_adapter, app_name: str, config: Optional[Dict] = None, check_for_collisions: bool = True,
+                 versioned: bool = False):
+        config = config or {}
+        self._db_adapter = db_adapter
+        self.app_name = app_name
+        self.max_size = config.get("max_size", self.DEFAULT_MAX_SIZE)
+        self.ttl = config.get("ttl", self.DEFAULT_TTL)
+        self.flush_interval = config.get("flush_interval", self.DEFAULT_FLUSH_INTERVAL)
+        self.check_for_collisions = check_for_collisions
+        self.versioned = versioned
+        self._users: "OrderedDict[str, _CachedUser]" = OrderedDict()
+        # dirty users pushed out by the size bound are still the latest state until flushed
+        self._evicted: Dict[str, _CachedUser] = {}
+        # periodic flushes, flushes on rebalance and on shutdown must not interleave
+        self._flush_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    @property
+    def dirty_count(self) -> int:
+        return sum(1 for cached in self._users.values() if cached.dirty) + len(self._evicted)
+
+    def _get_cached(self, db_uid: str) -> Optional[_CachedUser]:
+        cached = self._users.get(db_uid)
+        if cached is None:
+            return self._evicted.get(db_uid)
+        if not cached.dirty and time.monotonic() - cached.stored_at > self.ttl:
+            del self._users[db_uid]
+            return None
+        self._users.move_to_end(db_uid)
+        return cached
+
+    def get(self, db_uid: str) -> Optional[_CachedUser]:
+        cached = self._get_cached(db_uid)
+        monitoring.got_counter("user_cache_hit" if cached is not None else "user_cache_miss")
+        return cached
+
+    def loaded(self, db_uid: str, db_data: Optional[Union[str, bytes]], db_version: Optional[int] = None) -> None:
+        """Remembers a user just read from db"""
+        self._store(db_uid, _CachedUser(db_data, flushed_data=db_data, dirty=False, flushed_version=db_version))
+
+    def save(self, db_uid: str, data: Union[str, bytes]) -> None:
+        cached = self._get_cached(db_uid)
+        if cached is None:
+            cached = _CachedUser(data, flushed_data=None, dirty=True)
+        else:
+            # updated in place: a flush in progress must see the new data
+            cached.data = data
+            cached.dirty = True
+            cached.stored_at = time.monotonic()
+        self._store(db_uid, cached)
+
+    def after_flush(self, db_uid: str, callback: Callable[[], Awaitable[None]]) -> bool:
+        """Defers callback until the user is written to db, returns False if the user is not dirty"""
+        cached = self._users.get(db_uid) or self._evicted.get(db_uid)
+        if cached is None or not cached.dirty:
+            return False
+        cached.flush_callbacks.append(callback)
+        return True
+
+    def _store(self, db_uid: str, cached: _CachedUser) -> None:
+        self._evicted.pop(db_uid, None)
+        self._users[db_uid] = cached
+        self._users.move_to_end(db_uid)
+        while len(self._users) > self.max_size:
+            evicted_uid, evicted = self._users.popitem(last=False)
+            if evicted.dirty:
+                self._evicted[evicted_uid] = evicted
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        dirty = list(self._evicted.items()) + [(db_uid, cached) for db_uid, cached in self._users.items()
+                                                if cached.dirty]
+        for db_uid, cached in dirty:
+            await self._flush_user(db_uid, cached)
+
+    async def _flush_user(self, db_uid: str, cached: _CachedUser) -> None:
+        data = cached.data
+        callbacks, cached.flush_callbacks = cached.flush_callbacks, []
+        try:
+            if self.versioned and cached.flushed_version is not None and self.check_for_collisions:
+                no_collisions = await self._db_adapter.compare_and_set(db_uid, cached.flushed_version, data)
+            elif cached.flushed_data and self.check_for_collisions:
+                no_collisions = await self._db_adapter.replace_if_equals(db_uid, sample=cached.flushed_data,
+                                                                         data=data)
+            else:
+                await self._db_adapter.save(db_uid, data)
+                no_collisions = True
+        except (DBAdapterException, ValueError):
+            log("Failed to flush cached user data", params={log_const.KEY_NAME: log_const.FAILED_DB_INTERACTION,
+                                                            "db_uid": db_uid}, level="ERROR")
+            monitoring.counter_save_error(self.app_name)
+            cached.flush_callbacks = callbacks + cached.flush_callbacks
+            return
+        if not no_collisions:
+            log("User %(db_uid)s was changed in db by another writer, cached changes are dropped",
+                params={log_const.KEY_NAME: "user_cache_collision", "db_uid": db_uid}, level="WARNING")
+            monitoring.counter_save_collision(self.app_name)
+            if self._users.get(db_uid) is cached:
+                del self._users[db_uid]
+            if self._evicted.get(db_uid) is cached:
+                del self._evicted[db_uid]
+            return
+        if self._evicted.get(db_uid) is cached:
+            del self._evicted[db_uid]
+        cached.flushed_data = data
+        if cached.flushed_version is not None:
+            cached.flushed_version += 1
+        # the user could be saved again while awaiting the db
+        cached.dirty = cached.data != data
+        if not cached.dirty:
+            # registered while awaiting the db for the data just written
+            callbacks, cached.flush_callbacks = callbacks + cached.flush_callbacks, []
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception:
+                log("User cache flush callback failed", params={log_const.KEY_NAME: "user_cache_flush_callback_error",
+                                                                 "db_uid": db_uid}, level="ERROR", exc_info=True)
+
+    async def invalidate(self) -> None:
+        """Flushes dirty users and forgets everything, e.g. when partitions are revoked.
+
+        Offsets deferred for users that failed to flush are not committed, their messages are redelivered.
+        """
+        async with self._flush_lock:
+            await self._flush()
+            self._users.clear()
+            self._evicted.clear()
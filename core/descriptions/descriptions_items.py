@@ -1,6 +1,8 @@
 # coding=utf-8
 from typing import Callable
 
+from core.basic_models.requirement.requirement_compiler import requirement_compiler
+
 
 class DescriptionsItems:
     def __init__(self, factory: Callable, items, ordered=False):
@@ -8,6 +10,7 @@ class DescriptionsItems:
         self._factory = factory
         self._raw_items = None
         self._items = None
+        self._requirements = None
         self._init(items)
 
     def __contains__(self, key):
@@ -16,6 +19,8 @@ class DescriptionsItems:
     def _init(self, raw_items):
         self._raw_items = raw_items
         self._items = dict()
+        # equal requirements are shared only by items of one load
+        self._requirements = dict()
         for id in self._raw_items.keys():
             self._get_or_create_item(id)
 
@@ -25,7 +30,8 @@ class DescriptionsItems:
     def _get_or_create_item(self, id):
         existed_item = self._items.get(id)
         if existed_item is None:
-            existed_item = self._factory(id=id, items=self._raw_items[id])
+            with requirement_compiler.scope(self._requirements):
+                existed_item = self._factory(id=id, items=self._raw_items[id])
             self._items[id] = existed_item
         return existed_item
 
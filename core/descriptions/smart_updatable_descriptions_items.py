@@ -14,3 +14,4 @@ class SmartUpdatableDescriptionsItems(DescriptionsItems):
         for key in redundant:
             del self._items[key]
         self._raw_items = items
+        self._requirements = dict()
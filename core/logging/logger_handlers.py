@@ -1,5 +1,9 @@
+import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import weakref
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional, Union
 
 
 class RotatingFilePidHandler(RotatingFileHandler):
@@ -8,3 +12,107 @@ class RotatingFilePidHandler(RotatingFileHandler):
         pid = os.getpid()
         filename = f"{filename}.{pid}"
         super(RotatingFilePidHandler, self).__init__(filename, mode, maxBytes, backupCount, encoding, delay)
+
+
+class _QueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # очередь ограничена, остановка ждёт, пока слушатель освободит место
+        self.queue.put(self._sentinel)
+
+
+class QueueListenerHandler(QueueHandler):
+    """Передаёт записи в отдельный поток, где их форматируют и пишут обработчики handlers.
+
+    Форматирование и запись в файл или поток не задерживают event loop. Очередь ограничена queue_size записями,
+    при переполнении политика "drop" отбрасывает запись, "block" ждёт место не дольше block_timeout секунд
+    (None - без ограничения), после чего запись отбрасывается. Отброшенные записи считаются в dropped и
+    в метрике log_records_dropped.
+
+    После fork поток слушателя в дочернем процессе не существует, поэтому слушатель и очередь незакрытых
+    обработчиков создаются в нём заново.
+
+    Пример для logging_config.yml, обработчики конфигурируются по алфавиту, поэтому имя обработчика-очереди
+    должно быть после имён его обработчиков:
+        handlers:
+          queue_app_handler:
+            class: core.logging.logger_handlers.QueueListenerHandler
+            handlers: [console_app_handler, file_app_handler]
+            queue_size: 10000
+            policy: drop
+    """
+
+    DROP = "drop"
+    BLOCK = "block"
+    DEFAULT_QUEUE_SIZE = 10000
+    DROPPED_COUNTER = "log_records_dropped"
+
+    def __init__(self, handlers: List[Union[str, logging.Handler]], queue_size: int = DEFAULT_QUEUE_SIZE,
+                 policy: str = DROP, block_timeout: Optional[float] = None):
+        if policy not in (self.DROP, self.BLOCK):
+            raise ValueError(f"Unknown policy {policy!r}, expected {self.DROP!r} or {self.BLOCK!r}")
+        super(QueueListenerHandler, self).__init__(queue.Queue(queue_size))
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self.handlers = [self._resolve_handler(handler) for handler in handlers]
+        self.listener = None
+        self._start_listener()
+        _queue_listener_handlers.add(self)
+
+    def _start_listener(self) -> None:
+        self.listener = _QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def _restart_after_fork(self) -> None:
+        if self.listener is None:
+            return
+        # записи в очереди пишет родитель, а её замки могли остаться захваченными его потоками
+        self.queue = queue.Queue(self.queue.maxsize)
+        self._start_listener()
+
+    @staticmethod
+    def _resolve_handler(handler: Union[str, logging.Handler]) -> logging.Handler:
+        if isinstance(handler, logging.Handler):
+            return handler
+        resolved = logging._handlers.get(handler)
+        if resolved is None:
+            raise ValueError(f"Handler {handler!r} is not configured yet, "
+                             f"handlers are configured in alphabetical order of their names")
+        return resolved
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # форматирование в потоке слушателя, args нужны json форматерам
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.policy == self.BLOCK:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop()
+
+    def _drop(self) -> None:
+        from core.monitoring.monitoring import monitoring
+        self.dropped += 1
+        monitoring.got_counter(self.DROPPED_COUNTER)
+
+    def close(self) -> None:
+        # оставшиеся в очереди записи пишутся до закрытия обработчиков
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        super(QueueListenerHandler, self).close()
+
+
+_queue_listener_handlers = weakref.WeakSet()
+
+
+def _restart_queue_listeners() -> None:
+    for handler in list(_queue_listener_handlers):
+        handler._restart_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_queue_listeners)
@@ -1,8 +1,8 @@
-import inspect
 import logging
 import re
+import sys
 from unittest.mock import Mock
-from typing import Dict, List, Union, Optional
+from typing import Any, Callable, Dict, List, Union, Optional
 
 import timeout_decorator
 
@@ -22,6 +22,34 @@ LOG_STORE_FOR = "log_store_for"
 HEADERS = "headers"
 
 
+class LazyParam:
+    """Сообщение или параметр лога, вычисляемые только для записей, которые будут записаны.
+
+    Пример: log("DATA: %(data)s", params={"data": lazy(lambda: message.masked_value)}, level="DEBUG")
+    """
+
+    __slots__ = ("func", "args")
+
+    def __init__(self, func: Callable[..., Any], *args: Any):
+        self.func = func
+        self.args = args
+
+    def resolve(self) -> Any:
+        return self.func(*self.args)
+
+
+lazy = LazyParam
+
+
+def resolve_params(params):
+    """Вычисляет ленивые параметры: params целиком или значения словаря"""
+    if isinstance(params, LazyParam):
+        params = params.resolve()
+    if isinstance(params, dict) and any(isinstance(value, LazyParam) for value in params.values()):
+        params = {key: value.resolve() if isinstance(value, LazyParam) else value for key, value in params.items()}
+    return params
+
+
 class LoggerMessageCreator:
     LOGGER_HEADERS = [KAFKA_REPLY_TOPIC, "app_callback_id"]
     ART_NAMES = [
@@ -76,26 +104,52 @@ class LoggerMessageCreator:
 
 default_logger = logging.getLogger()
 
+_loggers: Dict[str, logging.Logger] = {}
+_message_makers: Dict[Any, type] = {}
+
+
+def _get_logger(module_name: str) -> logging.Logger:
+    logger = _loggers.get(module_name)
+    if logger is None:
+        logger = _loggers[module_name] = logging.getLogger(module_name)
+    return logger
 
-def log(message, user=None, params=None, level="INFO", exc_info=None, log_store_for=1):
+
+def _get_message_maker():
+    from smart_kit.configs import get_app_config
+    try:
+        app_config = get_app_config()
+    except AttributeError:
+        return LoggerMessageCreator
+    message_maker = _message_makers.get(app_config)
+    if message_maker is None:
+        message_maker = getattr(app_config, "LOGGER_MESSAGE_CREATOR", LoggerMessageCreator)
+        if isinstance(message_maker, Mock):
+            message_maker = LoggerMessageCreator
+        _message_makers[app_config] = message_maker
+    return message_maker
+
+
+def log(message, user=None, params=None, level="INFO", exc_info=None, log_store_for=1, logger_name=None):
     try:
         level_name = logging.getLevelName(level)
-        current_frame = inspect.currentframe()
-        previous_frame = current_frame.f_back
-        module_name = previous_frame.f_globals["__name__"]
-        logger = logging.getLogger(module_name)
+        # логгер вызывающего модуля, кадр стека не нужен при явном logger_name и для выключенных уровней
+        previous_frame = None
+        if logger_name is None:
+            previous_frame = sys._getframe(1)
+            logger_name = previous_frame.f_globals["__name__"]
+        logger = _get_logger(logger_name)
         if not logger.isEnabledFor(level_name):
             return
 
+        if previous_frame is None:
+            previous_frame = sys._getframe(1)
         instance = previous_frame.f_locals.get('self', None)
 
-        from smart_kit.configs import get_app_config
-        try:
-            message_maker = get_app_config().LOGGER_MESSAGE_CREATOR
-            if isinstance(message_maker, Mock):
-                raise AttributeError
-        except AttributeError:
-            message_maker = LoggerMessageCreator
+        message_maker = _get_message_maker()
+        if isinstance(message, LazyParam):
+            message = message.resolve()
+        params = resolve_params(params)
 
         log_store_for_map = getattr(logging, "log_store_for_map", None)
         if log_store_for_map is not None and params is not None:
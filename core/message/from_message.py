@@ -74,6 +74,13 @@ class SmartAppFromMessage:
         self._callback_id = callback_id  # FIXME: by some reason it possibly to change callback_id
         self.masking_fields = masking_fields
         self.validators = validators
+        self._reset_derived_views()
+
+    def _reset_derived_views(self) -> None:
+        # views derived from the value are memoized and dropped when the value is changed through setters
+        self._device = None
+        self._app_info = None
+        self._masked_value = None
 
     def validate(self) -> bool:
         """Try to json.load message and check for all required fields"""
@@ -174,6 +181,7 @@ class SmartAppFromMessage:
     @channel.setter
     def channel(self, value):
         self.uuid[field.USER_CHANNEL] = value
+        self._reset_derived_views()
 
     @property
     def uid(self) -> Optional[str]:
@@ -194,6 +202,7 @@ class SmartAppFromMessage:
     @payload.setter
     def payload(self, payload):
         self._value[self.PAYLOAD] = payload
+        self._reset_derived_views()
 
     @property
     def type(self) -> str:
@@ -208,11 +217,15 @@ class SmartAppFromMessage:
 
     @property
     def device(self) -> Device:
-        return Device(self.payload.get(field.DEVICE) or {})
+        if self._device is None:
+            self._device = Device(self.payload.get(field.DEVICE) or {})
+        return self._device
 
     @property
     def app_info(self) -> AppInfo:
-        return AppInfo(self.payload.get(field.APP_INFO) or {})
+        if self._app_info is None:
+            self._app_info = AppInfo(self.payload.get(field.APP_INFO) or {})
+        return self._app_info
 
     @property
     def smart_bio(self) -> Dict[str, Any]:
@@ -254,10 +267,14 @@ class SmartAppFromMessage:
 
     @property
     def masked_value(self) -> str:
-        mask_numbers_flag = settings.Settings()["template_settings"].get("mask_numbers", False)
-        masked_data = mask_numbers(masking(self.as_dict, self.masking_fields)) if mask_numbers_flag else \
-            masking(self.as_dict, self.masking_fields)
-        return json.dumps(masked_data, ensure_ascii=False)
+        if self._masked_value is None:
+            mask_numbers_flag = settings.Settings()["template_settings"].get("mask_numbers", False)
+            # маскированные данные сразу сериализуются, поэтому коллекции без маскируемых полей не копируются
+            masked_data = masking(self.as_dict, self.masking_fields, share=True)
+            if mask_numbers_flag:
+                masked_data = mask_numbers(masked_data)
+            self._masked_value = json.dumps(masked_data, ensure_ascii=False)
+        return self._masked_value
 
     @property
     def message_name(self) -> str:
@@ -266,6 +283,7 @@ class SmartAppFromMessage:
     @message_name.setter
     def message_name(self, message_name: str):
         self._value[self.MESSAGE_NAME] = message_name
+        self._reset_derived_views()
 
     # unique message_id
     @property
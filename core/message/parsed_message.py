@@ -0,0 +1,31 @@
+# coding=utf-8
+import json
+from functools import cached_property
+from typing import Any, Dict
+
+
+class ParsedMessage:
+    """Raw mq message value decoded once and shared by all processing tries of the message.
+
+    The first `value()` call returns the already parsed dict. Processing may mutate the dict (e.g. a
+    message name override or annotations normalization), so the next calls return a fresh dict parsed
+    from the cached decoded string instead of decoding the raw bytes again.
+    """
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self._parsed_taken = False
+
+    @cached_property
+    def as_str(self) -> str:
+        return self.raw.decode()
+
+    @cached_property
+    def _parsed(self) -> Dict[str, Any]:
+        return json.loads(self.as_str)
+
+    def value(self) -> Dict[str, Any]:
+        if not self._parsed_taken:
+            self._parsed_taken = True
+            return self._parsed
+        return json.loads(self.as_str)
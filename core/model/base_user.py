@@ -1,7 +1,7 @@
 # coding: utf-8
 import json
 from functools import cached_property
-from typing import List
+from typing import List, Union
 
 from core.descriptions.descriptions import Descriptions
 from core.model.queued_objects.limited_queued_hashable_objects_description import \
@@ -67,9 +67,19 @@ class BaseUser(Model):
              KEY_NAME: "user_save"})
         return raw
 
+    def serialize(self, codec) -> Union[str, bytes]:
+        """Serializes the user with a codec from scenarios.user.user_codec"""
+        data = codec.encode(self.raw)
+        log("%(class_name)s.serialize USER %(uid)s SAVE db_version = %(db_version)s. "
+            "Saving User %(uid)s. Serialized %(codec)s length is %(user_length)s.", self,
+            {"db_version": str(self.private_vars.get(self.USER_DB_VERSION)),
+             "uid": str(self.id), "user_length": len(data), "codec": codec.NAME,
+             KEY_NAME: "user_save"})
+        return data
+
     def expire(self):
-        self.counters.expire()
-        self.variables.expire()
-        self.private_vars.expire()
-        self.local_vars.expire()
-        self.message_vars.expire()
+        self.expire_field("counters")
+        self.expire_field("variables")
+        self.expire_field("private_vars")
+        self.expire_field("local_vars")
+        self.expire_field("message_vars")
@@ -1,4 +1,5 @@
 # coding: utf-8
+from core.model.state_version import next_state_version
 
 
 class LazyItems:
@@ -8,6 +9,7 @@ class LazyItems:
         self._raw_items = items or {}
         self._items = dict()
         self._user = user
+        self._version = 0
         self._clear_removed_items()
 
     def _clear_removed_items(self):
@@ -36,6 +38,7 @@ class LazyItems:
 
     def __setitem__(self, description, value):
         self._items[description] = value
+        self._version = next_state_version()
 
     def __iter__(self):
         return iter(self._descriptions[key] for key in self._descriptions)
@@ -46,6 +49,11 @@ class LazyItems:
             self._items.pop(description)
         if descr_id in self._raw_items:
             self._raw_items.pop(descr_id)
+        self._version = next_state_version()
+
+    @property
+    def version(self) -> int:
+        return max([self._version, *(getattr(item, "version", 0) for item in self._items.values())])
 
     @property
     def descriptions(self):
@@ -3,22 +3,52 @@ from typing import Dict, Any
 
 
 class Model:
+    """Model of declared fields built from a raw dict.
+
+    Field objects are built on the first attribute access. Raw values of fields that were never accessed are
+    returned by `raw` as they were loaded, so untouched parts of a big model cost neither building nor dumping.
+    """
+
     @property
     def fields(self):
         return []
 
     def __init__(self, values, user):
-        values = values or {}
-
-        for field in self.fields:
-            value = values.get(field.name)
-            description = field.description
-            args = field.args
-            if description is not None:
-                obj = field.model(value, description, user, *args)
-            else:
-                obj = field.model(value, user, *args)
-            setattr(self, field.name, obj)
+        self._model_values = values or {}
+        self._model_user = user
+        self._model_fields = {field.name: field for field in self.fields}
+        self._model_expire_pending = set()
+
+    def __getattr__(self, name):
+        # called only for attributes not set yet, i.e. for fields that are not built
+        fields = self.__dict__.get("_model_fields")
+        if fields is None or name not in fields:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return self._build_field(fields[name])
+
+    def _build_field(self, field):
+        value = self._model_values.get(field.name)
+        description = field.description
+        args = field.args
+        if description is not None:
+            obj = field.model(value, description, self._model_user, *args)
+        else:
+            obj = field.model(value, self._model_user, *args)
+        setattr(self, field.name, obj)
+        if field.name in self._model_expire_pending:
+            self._model_expire_pending.discard(field.name)
+            obj.expire()
+        return obj
+
+    def is_field_built(self, name) -> bool:
+        return name in self.__dict__
+
+    def expire_field(self, name):
+        """Expires a built field now, a field that is not built yet is expired when it is built"""
+        if self.is_field_built(name):
+            getattr(self, name).expire()
+        else:
+            self._model_expire_pending.add(name)
 
     def get_field(self, name):
         return getattr(self, name)
@@ -26,9 +56,11 @@ class Model:
     @property
     def raw(self) -> Dict[str, Any]:
         result = {}
-        for field in self.fields:
-            value = getattr(self, field.name)
-            raw = value.raw
+        for name in self._model_fields:
+            if self.is_field_built(name):
+                raw = getattr(self, name).raw
+            else:
+                raw = self._model_values.get(name)
             if raw is not None:
-                result[field.name] = raw
+                result[name] = raw
         return result
@@ -0,0 +1,13 @@
+# coding: utf-8
+import itertools
+
+_versions = itertools.count(1)
+
+
+def next_state_version() -> int:
+    """Process wide increasing number stamped on a user state object when it changes.
+
+    A container's version is the max of its own version and the versions of its items, so any change
+    inside, including removal of an item, gives the container a greater version.
+    """
+    return next(_versions)
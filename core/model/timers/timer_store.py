@@ -0,0 +1,427 @@
+# coding: utf-8
+from __future__ import annotations
+
+import base64
+import json
+from collections import namedtuple
+from typing import TYPE_CHECKING
+
+from core.model.factory import build_factory
+from core.model.heapq.heapq_storage import HeapqKV
+from core.model.registered import Registered
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+    from core.db_adapter.db_adapter import AsyncDBAdapter
+
+timer_stores = Registered()
+timer_store_factory = build_factory(timer_stores)
+
+# Reference to the original ConsumerRecord, its value is stored once for all timers of the record
+TimerMessageRef = namedtuple("TimerMessageRef", "topic, partition, offset, key, headers")
+# The fields of the original ConsumerRecord needed to build a LOCAL_TIMEOUT message and to send answers
+TimerMessage = namedtuple("TimerMessage", "topic, partition, offset, key, value, headers")
+BehaviorTimer = namedtuple("BehaviorTimer", "due_time, db_uid, callback_id, kafka_key, shard, message_ref")
+
+
+def make_timer_shard(topic: str, partition: int) -> str:
+    return f"{topic}:{partition}"
+
+
+def make_timer_message_ref(mq_message: Any) -> TimerMessageRef:
+    return TimerMessageRef(topic=mq_message.topic, partition=mq_message.partition, offset=mq_message.offset,
+                           key=mq_message.key, headers=list(mq_message.headers or []))
+
+
+def message_ref_id(ref: TimerMessageRef) -> str:
+    return f"{ref.topic}:{ref.partition}:{ref.offset}"
+
+
+def _encode_bytes(value: Optional[bytes]) -> Optional[str]:
+    return base64.b64encode(value).decode() if value is not None else None
+
+
+def _decode_bytes(value: Optional[str]) -> Optional[bytes]:
+    return base64.b64decode(value) if value is not None else None
+
+
+def timer_to_json(timer: BehaviorTimer) -> str:
+    ref = timer.message_ref
+    return json.dumps({
+        "due_time": timer.due_time,
+        "db_uid": timer.db_uid,
+        "callback_id": timer.callback_id,
+        "kafka_key": timer.kafka_key,
+        "shard": timer.shard,
+        "message_ref": {
+            "topic": ref.topic,
+            "partition": ref.partition,
+            "offset": ref.offset,
+            "key": _encode_bytes(ref.key),
+            "headers": [[name, _encode_bytes(value)] for name, value in ref.headers],
+        }
+    })
+
+
+def timer_from_json(raw: str) -> BehaviorTimer:
+    data = json.loads(raw)
+    ref = data["message_ref"]
+    message_ref = TimerMessageRef(topic=ref["topic"], partition=ref["partition"], offset=ref["offset"],
+                                  key=_decode_bytes(ref["key"]),
+                                  headers=[(name, _decode_bytes(value)) for name, value in ref["headers"]])
+    return BehaviorTimer(due_time=data["due_time"], db_uid=data["db_uid"], callback_id=data["callback_id"],
+                         kafka_key=data["kafka_key"], shard=data["shard"], message_ref=message_ref)
+
+
+class TimerStore:
+    """Storage of pending behavior timeouts.
+
+    Keeps a local index of callback ids scheduled by this process, so the main loop can check
+    for already scheduled callbacks without a round trip to the storage.
+
+    Durable stores lease claimed timers for `lease` seconds instead of deleting them: a timer is deleted
+    by `complete` after its timeout is handled, a timer not completed in time, e.g. because the pod died,
+    is claimed again.
+
+    Timers keep a reference to their message, its value is stored once per message and deleted with the last
+    timer referencing it.
+    """
+    IS_DURABLE = False
+    DEFAULT_LEASE = 60
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, db_adapter: Optional[AsyncDBAdapter] = None):
+        self.config = config or {}
+        self._db_adapter = db_adapter
+        self.lease = self.config.get("lease", self.DEFAULT_LEASE)
+        self._local_ids = set()
+        # callback id -> lease of timers claimed by this process and not completed yet, None for deleted on claim
+        self._leases: Dict[str, Optional[float]] = {}
+
+    def __contains__(self, callback_id: str) -> bool:
+        # a claimed timer is scheduled until its timeout is handled, added again it would be claimed twice
+        return callback_id in self._local_ids or callback_id in self._leases
+
+    def __len__(self) -> int:
+        return len(self._local_ids)
+
+    async def add(self, timer: BehaviorTimer, value: bytes) -> None:
+        """Schedules a timer, value is the value of the message referenced by the timer"""
+        await self._add(timer, value)
+        self._local_ids.add(timer.callback_id)
+
+    async def remove(self, callback_id: str) -> bool:
+        self._local_ids.discard(callback_id)
+        return await self._remove(callback_id)
+
+    async def pop_due(self, now: float, shards: Optional[Iterable[str]] = None,
+                      limit: int = 100) -> List[BehaviorTimer]:
+        """Claims timers with due_time <= now. Shards limit the drain to timers of the given kafka partitions"""
+        timers = []
+        for timer, lease in await self._pop_due(now, shards, limit):
+            self._local_ids.discard(timer.callback_id)
+            # the lease expired while the timer waited in a queue of this process, it is handled once
+            claimed_here = timer.callback_id in self._leases
+            self._leases[timer.callback_id] = lease
+            if not claimed_here:
+                timers.append(timer)
+        return timers
+
+    async def get_message(self, timer: BehaviorTimer) -> Optional[TimerMessage]:
+        """Message of a claimed timer, None if its value is lost"""
+        ref = timer.message_ref
+        value = await self._get_message(message_ref_id(ref))
+        if value is None:
+            return None
+        return TimerMessage(topic=ref.topic, partition=ref.partition, offset=ref.offset, key=ref.key, value=value,
+                            headers=ref.headers)
+
+    async def complete(self, timer: BehaviorTimer) -> None:
+        """Deletes a claimed timer after its timeout is handled"""
+        if timer.callback_id in self._leases:
+            await self._complete(timer, self._leases.pop(timer.callback_id))
+
+    async def _add(self, timer: BehaviorTimer, value: bytes) -> None:
+        raise NotImplementedError
+
+    async def _remove(self, callback_id: str) -> bool:
+        raise NotImplementedError
+
+    async def _pop_due(self, now: float, shards: Optional[Iterable[str]],
+                       limit: int) -> List[Tuple[BehaviorTimer, Optional[float]]]:
+        """Returns claimed timers with their leases, None for timers deleted on claim"""
+        raise NotImplementedError
+
+    async def _get_message(self, ref_id: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def _complete(self, timer: BehaviorTimer, lease: Optional[float]) -> None:
+        raise NotImplementedError
+
+
+class MemoryTimerStore(TimerStore):
+    def __init__(self, config: Optional[Dict[str, Any]] = None, db_adapter: Optional[AsyncDBAdapter] = None):
+        super().__init__(config, db_adapter)
+        self._timers: Dict[str, BehaviorTimer] = {}
+        self._heapq = HeapqKV(value_to_key_func=lambda timer: timer.callback_id)
+        # message ref id -> message value and callback ids of the timers referencing it
+        self._messages: Dict[str, bytes] = {}
+        self._message_timers: Dict[str, Set[str]] = {}
+
+    async def _add(self, timer: BehaviorTimer, value: bytes) -> None:
+        ref_id = message_ref_id(timer.message_ref)
+        self._messages[ref_id] = value
+        self._message_timers.setdefault(ref_id, set()).add(timer.callback_id)
+        self._timers[timer.callback_id] = timer
+        self._heapq.push(timer.due_time, timer)
+
+    def _release_message(self, timer: BehaviorTimer) -> None:
+        ref_id = message_ref_id(timer.message_ref)
+        callback_ids = self._message_timers.get(ref_id, set())
+        callback_ids.discard(timer.callback_id)
+        if not callback_ids:
+            self._message_timers.pop(ref_id, None)
+            self._messages.pop(ref_id, None)
+
+    async def _remove(self, callback_id: str) -> bool:
+        # heap entry is dropped lazily on pop
+        timer = self._timers.pop(callback_id, None)
+        if timer is None:
+            return False
+        self._release_message(timer)
+        return True
+
+    async def _pop_due(self, now: float, shards: Optional[Iterable[str]],
+                       limit: int) -> List[Tuple[BehaviorTimer, Optional[float]]]:
+        # timers of a process are lost with it, there is nobody to claim them again
+        timers = []
+        while len(timers) < limit:
+            due_time = self._heapq.get_head_key()
+            if due_time is None or due_time > now:
+                break
+            _, timer = self._heapq.pop()
+            if self._timers.get(timer.callback_id) is timer:
+                del self._timers[timer.callback_id]
+                timers.append((timer, None))
+        return timers
+
+    async def _get_message(self, ref_id: str) -> Optional[bytes]:
+        return self._messages.get(ref_id)
+
+    async def _complete(self, timer: BehaviorTimer, lease: Optional[float]) -> None:
+        # the timer is deleted on claim, its message is kept until the timeout is handled
+        self._release_message(timer)
+
+
+class RedisTimerStore(TimerStore):
+    """Timers in a redis sorted set per shard scored by due time, payloads in separate keys.
+
+    A claim moves the score of due timers to the end of the lease in one script, so several pods can drain
+    the same shard. A completed timer is deleted only if its score is still the lease of this claim.
+    A message value is kept with a set of callback ids of its timers and deleted when the set is empty.
+    """
+    IS_DURABLE = True
+    DEFAULT_PREFIX = "behavior_timers"
+    CLAIM_SCRIPT = """
+local callback_ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[3])
+for _, callback_id in ipairs(callback_ids) do
+    redis.call('ZADD', KEYS[1], ARGV[2], callback_id)
+end
+return callback_ids
+"""
+    # KEYS: shard, timer, message timers, message; ARGV: callback id
+    REMOVE_SCRIPT = """
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('DEL', KEYS[2])
+redis.call('SREM', KEYS[3], ARGV[1])
+if redis.call('SCARD', KEYS[3]) == 0 then
+    redis.call('DEL', KEYS[4])
+end
+return 1
+"""
+    # KEYS: as REMOVE_SCRIPT; ARGV: callback id, lease
+    COMPLETE_SCRIPT = """
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not score or tonumber(score) ~= tonumber(ARGV[2]) then
+    return 0
+end
+""" + REMOVE_SCRIPT
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, db_adapter: Optional[AsyncDBAdapter] = None):
+        super().__init__(config, db_adapter)
+        self._prefix = self.config.get("prefix", self.DEFAULT_PREFIX)
+        self._scripts_redis = None
+        self._claim_script = None
+        self._remove_script = None
+        self._complete_script = None
+
+    def _shard_key(self, shard: str) -> str:
+        return f"{self._prefix}:shard:{shard}"
+
+    def _timer_key(self, callback_id: str) -> str:
+        return f"{self._prefix}:timer:{callback_id}"
+
+    def _message_key(self, ref_id: str) -> str:
+        return f"{self._prefix}:message:{ref_id}"
+
+    def _message_timers_key(self, ref_id: str) -> str:
+        return f"{self._prefix}:message_timers:{ref_id}"
+
+    def _timer_keys(self, timer: BehaviorTimer) -> List[str]:
+        ref_id = message_ref_id(timer.message_ref)
+        return [self._shard_key(timer.shard), self._timer_key(timer.callback_id), self._message_timers_key(ref_id),
+                self._message_key(ref_id)]
+
+    async def _get_redis(self):
+        redis = await self._db_adapter.get_redis()
+        if self._scripts_redis is not redis:
+            # scripts are bound to the client they are registered with
+            self._claim_script = redis.register_script(self.CLAIM_SCRIPT)
+            self._remove_script = redis.register_script(self.REMOVE_SCRIPT)
+            self._complete_script = redis.register_script(self.COMPLETE_SCRIPT)
+            self._scripts_redis = redis
+        return redis
+
+    async def _add(self, timer: BehaviorTimer, value: bytes) -> None:
+        redis = await self._get_redis()
+        ref_id = message_ref_id(timer.message_ref)
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._timer_key(timer.callback_id), timer_to_json(timer))
+            pipe.zadd(self._shard_key(timer.shard), {timer.callback_id: timer.due_time})
+            pipe.sadd(self._message_timers_key(ref_id), timer.callback_id)
+            pipe.set(self._message_key(ref_id), value)
+            await pipe.execute()
+
+    async def _remove(self, callback_id: str) -> bool:
+        redis = await self._get_redis()
+        raw = await redis.getdel(self._timer_key(callback_id))
+        if raw is None:
+            return False
+        await self._remove_script(keys=self._timer_keys(timer_from_json(raw)), args=[callback_id])
+        return True
+
+    async def _pop_due(self, now: float, shards: Optional[Iterable[str]],
+                       limit: int) -> List[Tuple[BehaviorTimer, Optional[float]]]:
+        redis = await self._get_redis()
+        lease = now + self.lease
+        timers = []
+        for shard in shards or []:
+            shard_key = self._shard_key(shard)
+            callback_ids = await self._claim_script(keys=[shard_key], args=[now, lease, limit - len(timers)])
+            for callback_id in callback_ids:
+                if isinstance(callback_id, bytes):
+                    callback_id = callback_id.decode()
+                raw = await redis.get(self._timer_key(callback_id))
+                if raw is None:
+                    # removed after the claim
+                    await redis.zrem(shard_key, callback_id)
+                    continue
+                timers.append((timer_from_json(raw), lease))
+            if len(timers) >= limit:
+                break
+        return timers
+
+    async def _get_message(self, ref_id: str) -> Optional[bytes]:
+        redis = await self._get_redis()
+        return await redis.get(self._message_key(ref_id))
+
+    async def _complete(self, timer: BehaviorTimer, lease: Optional[float]) -> None:
+        await self._get_redis()
+        await self._complete_script(keys=self._timer_keys(timer), args=[timer.callback_id, lease])
+
+
+class IgniteTimerStore(TimerStore):
+    """Timers in an ignite SQL table indexed by shard and due time.
+
+    Due timers are selected by the index, a timer is claimed by the pod whose conditional UPDATE moves its
+    due time to the end of the lease. A completed timer is deleted only if its due time is still this lease.
+    Message values are kept in a second table and deleted when no timer references them.
+    """
+    IS_DURABLE = True
+    DEFAULT_TABLE = "behavior_timers"
+    DEFAULT_CACHE_SUFFIX = "_behavior_timers"
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, db_adapter: Optional[AsyncDBAdapter] = None):
+        super().__init__(config, db_adapter)
+        self._table = self.config.get("table", self.DEFAULT_TABLE)
+        self._cache_name = self.config.get("cache_name")
+        self._client = None
+
+    async def get_client(self):
+        if self._client is None:
+            client = await self._db_adapter.get_client()
+            cache_name = self._cache_name or self._db_adapter.cache_name + self.DEFAULT_CACHE_SUFFIX
+            await self._execute(client, f"CREATE TABLE IF NOT EXISTS {self._table} ("
+                                        "callback_id VARCHAR PRIMARY KEY, shard VARCHAR, due_time DOUBLE, "
+                                        "message_ref VARCHAR, payload VARCHAR) "
+                                        f'WITH "template=partitioned,atomicity=atomic,cache_name={cache_name}"')
+            await self._execute(client, f"CREATE INDEX IF NOT EXISTS {self._table}_due_idx "
+                                        f"ON {self._table} (shard, due_time)")
+            await self._execute(client, f"CREATE INDEX IF NOT EXISTS {self._table}_message_idx "
+                                        f"ON {self._table} (message_ref)")
+            await self._execute(client, f"CREATE TABLE IF NOT EXISTS {self._table}_messages ("
+                                        "ref_id VARCHAR PRIMARY KEY, value VARCHAR) "
+                                        'WITH "template=partitioned,atomicity=atomic,'
+                                        f'cache_name={cache_name}_messages"')
+            self._client = client
+        return self._client
+
+    @staticmethod
+    async def _execute(client, query: str, *args: Any) -> List[List[Any]]:
+        async with client.sql(query, query_args=list(args)) as cursor:
+            return [row async for row in cursor]
+
+    async def _count(self, query: str, *args: Any) -> int:
+        # DML and COUNT return one row with the number of changed or matched rows
+        rows = await self._execute(await self.get_client(), query, *args)
+        return rows[0][0] if rows else 0
+
+    async def _add(self, timer: BehaviorTimer, value: bytes) -> None:
+        client = await self.get_client()
+        ref_id = message_ref_id(timer.message_ref)
+        # the timer is written first, so a concurrent release of the message sees it
+        await self._execute(client, f"MERGE INTO {self._table} (callback_id, shard, due_time, message_ref, payload) "
+                                    "VALUES (?, ?, ?, ?, ?)",
+                            timer.callback_id, timer.shard, timer.due_time, ref_id, timer_to_json(timer))
+        await self._execute(client, f"MERGE INTO {self._table}_messages (ref_id, value) VALUES (?, ?)",
+                            ref_id, _encode_bytes(value))
+
+    async def _release_message(self, ref_id: str) -> None:
+        if not await self._count(f"SELECT COUNT(*) FROM {self._table} WHERE message_ref = ?", ref_id):
+            await self._count(f"DELETE FROM {self._table}_messages WHERE ref_id = ?", ref_id)
+
+    async def _remove(self, callback_id: str) -> bool:
+        rows = await self._execute(await self.get_client(),
+                                   f"SELECT message_ref FROM {self._table} WHERE callback_id = ?", callback_id)
+        if not rows or not await self._count(f"DELETE FROM {self._table} WHERE callback_id = ?", callback_id):
+            return False
+        await self._release_message(rows[0][0])
+        return True
+
+    async def _pop_due(self, now: float, shards: Optional[Iterable[str]],
+                       limit: int) -> List[Tuple[BehaviorTimer, Optional[float]]]:
+        shards = list(shards or [])
+        if not shards:
+            return []
+        placeholders = ", ".join("?" * len(shards))
+        rows = await self._execute(await self.get_client(),
+                                   f"SELECT callback_id, due_time, payload FROM {self._table} "
+                                   f"WHERE shard IN ({placeholders}) AND due_time <= ? ORDER BY due_time LIMIT ?",
+                                   *shards, now, limit)
+        lease = now + self.lease
+        timers = []
+        for callback_id, due_time, payload in rows:
+            claimed = await self._count(f"UPDATE {self._table} SET due_time = ? "
+                                               "WHERE callback_id = ? AND due_time = ?", lease, callback_id, due_time)
+            if claimed:
+                timers.append((timer_from_json(payload), lease))
+        return timers
+
+    async def _get_message(self, ref_id: str) -> Optional[bytes]:
+        rows = await self._execute(await self.get_client(),
+                                   f"SELECT value FROM {self._table}_messages WHERE ref_id = ?", ref_id)
+        return _decode_bytes(rows[0][0]) if rows else None
+
+    async def _complete(self, timer: BehaviorTimer, lease: Optional[float]) -> None:
+        if await self._count(f"DELETE FROM {self._table} WHERE callback_id = ? AND due_time = ?",
+                                    timer.callback_id, lease):
+            await self._release_message(message_ref_id(timer.message_ref))
@@ -1,23 +1,29 @@
 from __future__ import annotations
 
+import asyncio
 from typing import TYPE_CHECKING
 
 from aiokafka.abc import ConsumerRebalanceListener
 
 if TYPE_CHECKING:
-    from typing import List, Callable
+    from typing import Any, List, Callable, Optional
     from kafka import TopicPartition
     from aiokafka import AIOKafkaConsumer
 
 
 class CoreConsumerRebalanceListener(ConsumerRebalanceListener):
     def __init__(self, consumer: AIOKafkaConsumer,
-                 on_assign_callback: Callable[[AIOKafkaConsumer, List[TopicPartition]], None]):
+                 on_assign_callback: Callable[[AIOKafkaConsumer, List[TopicPartition]], None],
+                 on_revoke_callback: Optional[Callable[[AIOKafkaConsumer, List[TopicPartition]], Any]] = None):
         self._consumer = consumer
         self._on_assign_callback = on_assign_callback
+        self._on_revoke_callback = on_revoke_callback
 
     def on_partitions_assigned(self, assigned: List[TopicPartition]):
         self._on_assign_callback(self._consumer, assigned)
 
-    def on_partitions_revoked(self, revoked):
-        pass
+    async def on_partitions_revoked(self, revoked: List[TopicPartition]):
+        if self._on_revoke_callback is not None:
+            result = self._on_revoke_callback(self._consumer, revoked)
+            if asyncio.iscoroutine(result):
+                await result
@@ -16,10 +16,11 @@ from core.logging.logger_utils import log
 from core.monitoring.monitoring import monitoring
 from core.mq.kafka.base_kafka_consumer import BaseKafkaConsumer
 from core.mq.kafka.consumer_rebalance_listener import CoreConsumerRebalanceListener
+from core.mq.kafka.offset_commit_manager import OffsetCommitManager
 
 if TYPE_CHECKING:
     from aiokafka import ConsumerRecord
-    from typing import Optional, Callable, Iterable, AsyncGenerator, Any, Dict, List
+    from typing import Optional, Callable, Iterable, AsyncGenerator, Any, Awaitable, Dict, List, Set
     from asyncio import AbstractEventLoop
 
 
@@ -32,6 +33,9 @@ class KafkaConsumer(BaseKafkaConsumer):
         self._setup_ssl(conf, self._config.get("ssl"))
         conf.setdefault("group_id", str(uuid.uuid1()))
         self.autocommit_enabled = conf.get("enable_auto_commit", True)
+        self.offset_commit_manager = self._create_offset_commit_manager(self._config.get("offset_commit", {}))
+        # awaited on rebalance before offsets of revoked partitions are committed
+        self.revoke_callbacks: List[Callable[[List[TopicPartition]], Awaitable[None]]] = []
         internal_log_path = self._config.get("internal_log_path")
         if internal_log_path:
             debug_logger = logging.getLogger("debug_consumer")  # TODO add debug logger to _consumer events
@@ -42,6 +46,19 @@ class KafkaConsumer(BaseKafkaConsumer):
         self._consumer = AIOKafkaConsumer(**conf, loop=loop)
         loop.run_until_complete(self._consumer.start())
 
+    def _create_offset_commit_manager(self, config: Dict[str, Any]) -> Optional[OffsetCommitManager]:
+        if self.autocommit_enabled or not config.get("enabled", False):
+            return None
+        return OffsetCommitManager(commit=self._commit, commit_interval=config.get("interval", 1.0),
+                                   commit_count=config.get("count", 1000))
+
+    def require_offset_commit_manager(self) -> None:
+        """Tracks offsets even if offset_commit is not enabled, so messages may be completed out of order"""
+        if self.autocommit_enabled:
+            log("Offsets are autocommitted regardless of the message processing", level="WARNING")
+        elif self.offset_commit_manager is None:
+            self.offset_commit_manager = OffsetCommitManager(commit=self._commit)
+
     def on_assign_log(self, consumer: AIOKafkaConsumer, partitions: List[TopicPartition]) -> None:
         log_level = "WARNING"
         params = {
@@ -62,7 +79,8 @@ class KafkaConsumer(BaseKafkaConsumer):
         try:
             self._consumer.subscribe(topics, listener=CoreConsumerRebalanceListener(
                 consumer=self._consumer,
-                on_assign_callback=self.on_assign_log
+                on_assign_callback=self.on_assign_log,
+                on_revoke_callback=self.on_revoke_flush_offsets
             ))
         except KafkaError as e:
             self._error_callback(e)
@@ -70,27 +88,67 @@ class KafkaConsumer(BaseKafkaConsumer):
     def unsubscribe(self) -> None:
         self._consumer.unsubscribe()
 
+    def assignment(self) -> Set[TopicPartition]:
+        return self._consumer.assignment()
+
+    async def on_revoke_flush_offsets(self, consumer: AIOKafkaConsumer, partitions: List[TopicPartition]) -> None:
+        for callback in self.revoke_callbacks:
+            await callback(partitions)
+        if self.offset_commit_manager is not None:
+            try:
+                await self.offset_commit_manager.revoke(partitions)
+            except KafkaError as e:
+                self._error_callback(e)
+
     async def poll(self) -> Optional[ConsumerRecord]:
         msg = await self._consumer.getone()
-        return self._process_message(msg)
+        return self._track_message(msg)
 
-    async def consume(self, num_messages: int = 1) -> AsyncGenerator[Optional[ConsumerRecord], None]:
-        timeout_ms = self._config["poll_timeout"] * 1000
+    async def consume(self, num_messages: int = 1,
+                      timeout_ms: Optional[int] = None) -> AsyncGenerator[Optional[ConsumerRecord], None]:
+        if timeout_ms is None:
+            timeout_ms = self._config["poll_timeout"] * 1000
         messages = await self._consumer.getmany(max_records=num_messages, timeout_ms=timeout_ms)
         for partition_messages in messages.values():
             for msg in partition_messages:
-                processed = self._process_message(msg)
+                processed = self._track_message(msg)
                 yield processed
 
+    def _track_message(self, msg: ConsumerRecord) -> Optional[ConsumerRecord]:
+        processed = self._process_message(msg)
+        if self.offset_commit_manager is not None:
+            self.offset_commit_manager.track(msg)
+            if processed is None:
+                # message is skipped and will never reach commit_offset
+                self.offset_commit_manager.complete(msg)
+        return processed
+
     async def commit_offset(self, msg: ConsumerRecord) -> None:
         if msg is not None:
-            if not self.autocommit_enabled:
+            if self.offset_commit_manager is not None:
+                self.offset_commit_manager.complete(msg)
+                await self.flush_offsets(force=False)
+            elif not self.autocommit_enabled:
                 tp = TopicPartition(msg.topic, msg.partition)
                 try:
-                    await self._consumer.commit({tp: msg.offset + 1})
+                    await self._commit({tp: msg.offset + 1})
                 except KafkaError as e:
                     self._error_callback(e)
 
+    async def flush_offsets(self, force: bool = True) -> None:
+        if self.offset_commit_manager is None:
+            return
+        try:
+            if force:
+                await self.offset_commit_manager.flush()
+            else:
+                await self.offset_commit_manager.maybe_commit()
+        except KafkaError as e:
+            self._error_callback(e)
+
+    async def _commit(self, offsets: Dict[TopicPartition, int]) -> None:
+        await self._consumer.commit(offsets)
+
     def get_msg_create_time(self, mq_message: ConsumerRecord) -> int:
         timestamp = mq_message.timestamp
         return timestamp
@@ -111,6 +169,7 @@ class KafkaConsumer(BaseKafkaConsumer):
             return msg
 
     async def close(self) -> None:
+        await self.flush_offsets()
         await self._consumer.stop()
         log(f"consumer to topics {self._config['topics']} closed.")
 
@@ -0,0 +1,109 @@
+# coding: utf-8
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+from kafka.errors import KafkaError
+
+from core.monitoring.monitoring import monitoring
+
+if TYPE_CHECKING:
+    from aiokafka import AIOKafkaProducer
+    from typing import Any, Callable, Optional, Sequence, Set, Tuple
+
+
+class KafkaDeliveryPipeline:
+    """Sends records without waiting for the broker ack and accounts acks in done callbacks.
+
+    `send` returns as soon as the record is in the producer buffer, so several answers of one turn are
+    produced concurrently. Failed deliveries are resent up to `retries` times, delivery latency is observed
+    in the `kafka_producer_delivery_time` histogram.
+    """
+    DELIVERY_TIME_METRIC = "kafka_producer_delivery_time"
+    RETRY_METRIC = "kafka_producer_retry"
+
+    def __init__(self, producer: AIOKafkaProducer, retries: int = 0,
+                 on_delivery: Optional[Callable[[Optional[BaseException], bytes], None]] = None):
+        self._producer = producer
+        self.retries = retries
+        self._on_delivery = on_delivery
+        self._in_flight: Set[asyncio.Future] = set()
+        # strong references, the loop keeps only weak ones to tasks
+        self._retries: Set[asyncio.Task] = set()
+
+    @property
+    def in_flight_count(self) -> int:
+        return len(self._in_flight)
+
+    async def send(self, topic: str, value: bytes, key: Any = None,
+                   headers: Optional[Sequence[Tuple[str, bytes]]] = None) -> asyncio.Future:
+        delivery = asyncio.get_running_loop().create_future()
+        self._in_flight.add(delivery)
+        delivery.add_done_callback(self._in_flight.discard)
+        try:
+            await self._send(delivery, self.retries, time.monotonic(), topic, value, key, headers)
+        except BaseException:
+            self._in_flight.discard(delivery)
+            raise
+        return delivery
+
+    async def _send(self, delivery: asyncio.Future, retries_left: int, start_time: float,
+                    topic: str, value: bytes, key: Any, headers: Optional[Sequence[Tuple[str, bytes]]]) -> None:
+        ack = await self._producer.send(topic=topic, value=value, key=key, headers=headers or list())
+        ack.add_done_callback(
+            lambda future: self._on_ack(future, delivery, retries_left, start_time, topic, value, key, headers)
+        )
+
+    def _on_ack(self, ack: asyncio.Future, delivery: asyncio.Future, retries_left: int, start_time: float,
+                topic: str, value: bytes, key: Any, headers: Optional[Sequence[Tuple[str, bytes]]]) -> None:
+        error = ack.exception() if not ack.cancelled() else asyncio.CancelledError()
+        if error is None:
+            monitoring.got_histogram_observe(self.DELIVERY_TIME_METRIC, time.monotonic() - start_time)
+            self._finish(delivery, None, value, ack.result())
+        elif isinstance(error, KafkaError) and retries_left > 0:
+            monitoring.got_counter(self.RETRY_METRIC)
+            task = asyncio.ensure_future(self._retry(delivery, retries_left - 1, start_time, topic, value, key,
+                                                     headers))
+            self._retries.add(task)
+            task.add_done_callback(lambda done: self._on_retry_done(done, delivery, value))
+        else:
+            self._finish(delivery, error, value)
+
+    async def _retry(self, delivery: asyncio.Future, retries_left: int, start_time: float,
+                     topic: str, value: bytes, key: Any, headers: Optional[Sequence[Tuple[str, bytes]]]) -> None:
+        try:
+            await self._send(delivery, retries_left, start_time, topic, value, key, headers)
+        except Exception as error:
+            self._finish(delivery, error, value)
+
+    def _on_retry_done(self, task: asyncio.Task, delivery: asyncio.Future, value: bytes) -> None:
+        self._retries.discard(task)
+        # a retry cancelled by close, possibly before it started
+        if task.cancelled():
+            self._finish(delivery, asyncio.CancelledError(), value)
+
+    def _finish(self, delivery: asyncio.Future, error: Optional[BaseException], value: bytes,
+                result: Any = None) -> None:
+        if self._on_delivery is not None:
+            self._on_delivery(error, value)
+        if delivery.done():
+            return
+        if error is None:
+            delivery.set_result(result)
+        else:
+            delivery.set_exception(error)
+            # nobody is obliged to await the delivery, error is already reported by on_delivery
+            delivery.exception()
+
+    async def flush(self) -> None:
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def close(self) -> None:
+        await self.flush()
+        for task in list(self._retries):
+            task.cancel()
+        if self._retries:
+            await asyncio.gather(*self._retries, return_exceptions=True)
@@ -14,9 +14,10 @@ import core.logging.logger_constants as log_const
 from core.logging.logger_utils import log
 from core.monitoring.monitoring import monitoring
 from core.mq.kafka.base_kafka_publisher import BaseKafkaPublisher
+from core.mq.kafka.kafka_delivery_pipeline import KafkaDeliveryPipeline
 
 if TYPE_CHECKING:
-    from asyncio import AbstractEventLoop
+    from asyncio import AbstractEventLoop, Future
     from typing import Optional, Tuple, Any, Dict, Sequence
 
 
@@ -35,17 +36,26 @@ class KafkaPublisher(BaseKafkaPublisher):
             ))
         self._producer = AIOKafkaProducer(**conf, loop=loop)
         loop.run_until_complete(self._producer.start())
+        self._delivery_pipeline = self._create_delivery_pipeline(self._config.get("delivery_pipeline", {}))
+
+    def _create_delivery_pipeline(self, config: Dict[str, Any]) -> Optional[KafkaDeliveryPipeline]:
+        if not config.get("enabled", False):
+            return None
+        return KafkaDeliveryPipeline(self._producer, retries=config.get("retries", 0),
+                                     on_delivery=self._on_pipeline_delivery)
 
     async def send(self, value: bytes, key: Any = None, topic_key: Optional[str] = None,
-                   headers: Optional[Sequence[Tuple[str, bytes]]] = None) -> None:
+                   headers: Optional[Sequence[Tuple[str, bytes]]] = None) -> Optional[Future]:
         topic = self._config["topic"]
         if topic_key is not None:
             topic = topic[topic_key]
         print("topic:", topic)
+        if self._delivery_pipeline is not None:
+            return await self._delivery_pipeline.send(topic=topic, value=value, headers=headers, key=key)
         await self._producer.send_and_wait(topic=topic, value=value, headers=headers or list(), key=key)
 
     async def send_to_topic(self, value: bytes, key: Any = None, topic: Optional[str] = None,
-                            headers: Optional[Sequence[Tuple[str, bytes]]] = None) -> None:
+                            headers: Optional[Sequence[Tuple[str, bytes]]] = None) -> Optional[Future]:
         if topic is None:
             params = {
                 "message": str(value),
@@ -53,6 +63,8 @@ class KafkaPublisher(BaseKafkaPublisher):
             }
             log("KafkaProducer: Failed sending message %{message}s. Topic is not defined", params=params,
                 level="ERROR")
+        if self._delivery_pipeline is not None:
+            return await self._delivery_pipeline.send(topic=topic, value=value, headers=headers, key=key)
         try:
             await self._producer.send_and_wait(topic=topic, value=value, headers=headers or list(), key=key)
             self._delivery_callback(None, value)
@@ -88,7 +100,14 @@ class KafkaPublisher(BaseKafkaPublisher):
                     exc_info=True)
             monitoring.got_counter("kafka_producer_exception")
 
+    def _on_pipeline_delivery(self, err: Optional[BaseException], msg_value: bytes) -> None:
+        if err:
+            self._error_callback(err)
+        self._delivery_callback(err, msg_value)
+
     async def close(self) -> None:
+        if self._delivery_pipeline is not None:
+            await self._delivery_pipeline.close()
         await self._producer.stop()
 
     def _setup_ssl(self, conf: Dict[str, Any], ssl_config: Optional[Dict[str, Any]] = None) -> None:
@@ -0,0 +1,103 @@
+# coding: utf-8
+from __future__ import annotations
+
+import asyncio
+import heapq
+import time
+from typing import TYPE_CHECKING
+
+from aiokafka import TopicPartition
+
+if TYPE_CHECKING:
+    from aiokafka import ConsumerRecord
+    from typing import Awaitable, Callable, Dict, Iterable, List, Set
+
+
+class _PartitionOffsets:
+    def __init__(self):
+        self.polled: List[int] = []  # heap of polled offsets, completed ones are popped lazily
+        self.in_flight: Set[int] = set()
+        self.next_offset = None  # offset to commit: everything below it is completed
+        self.committed_offset = None
+
+    def track(self, offset: int) -> None:
+        heapq.heappush(self.polled, offset)
+        self.in_flight.add(offset)
+
+    def complete(self, offset: int) -> bool:
+        if offset not in self.in_flight:
+            return False
+        self.in_flight.remove(offset)
+        while self.polled and self.polled[0] not in self.in_flight:
+            self.next_offset = heapq.heappop(self.polled) + 1
+        return True
+
+    @property
+    def has_uncommitted(self) -> bool:
+        return self.next_offset is not None and (self.committed_offset is None or
+                                                 self.next_offset > self.committed_offset)
+
+
+class OffsetCommitManager:
+    """Commits the highest contiguous completed offset of each partition by interval or by count.
+
+    Offsets are tracked when records are polled and completed when workers finish them, so a record that
+    finished ahead of an earlier one from the same partition is only committed once the earlier one is done.
+    Flushes are serialized, so a slow commit can't be overtaken by a later one and moved back by it.
+    """
+
+    def __init__(self, commit: Callable[[Dict[TopicPartition, int]], Awaitable[None]],
+                 commit_interval: float = 1.0, commit_count: int = 1000):
+        self._commit = commit
+        self.commit_interval = commit_interval
+        self.commit_count = commit_count
+        self._partitions: Dict[TopicPartition, _PartitionOffsets] = {}
+        self._completed_since_commit = 0
+        self._last_commit_time = time.monotonic()
+        self._flush_lock = asyncio.Lock()
+
+    def track(self, msg: ConsumerRecord) -> None:
+        tp = TopicPartition(msg.topic, msg.partition)
+        self._partitions.setdefault(tp, _PartitionOffsets()).track(msg.offset)
+
+    def complete(self, msg: ConsumerRecord) -> None:
+        partition = self._partitions.get(TopicPartition(msg.topic, msg.partition))
+        if partition is not None and partition.complete(msg.offset):
+            self._completed_since_commit += 1
+
+    def committable(self, partitions: Iterable[TopicPartition] = None) -> Dict[TopicPartition, int]:
+        tps = self._partitions if partitions is None else partitions
+        return {tp: self._partitions[tp].next_offset for tp in tps
+                if tp in self._partitions and self._partitions[tp].has_uncommitted}
+
+    def is_commit_due(self) -> bool:
+        if not self._completed_since_commit:
+            return False
+        return (self._completed_since_commit >= self.commit_count or
+                time.monotonic() - self._last_commit_time >= self.commit_interval)
+
+    async def maybe_commit(self) -> None:
+        if self.is_commit_due():
+            await self.flush()
+
+    async def flush(self, partitions: Iterable[TopicPartition] = None) -> None:
+        async with self._flush_lock:
+            offsets = self.committable(partitions)
+            if offsets:
+                await self._commit(offsets)
+                for tp, offset in offsets.items():
+                    partition = self._partitions.get(tp)
+                    if partition is not None and (partition.committed_offset is None or
+                                                  offset > partition.committed_offset):
+                        partition.committed_offset = offset
+            if partitions is None:
+                self._completed_since_commit = 0
+                self._last_commit_time = time.monotonic()
+
+    async def revoke(self, partitions: Iterable[TopicPartition]) -> None:
+        partitions = list(partitions)
+        try:
+            await self.flush(partitions)
+        finally:
+            for tp in partitions:
+                self._partitions.pop(tp, None)
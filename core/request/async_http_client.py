@@ -0,0 +1,77 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+import aiohttp
+
+from core.utils.deadline import deadline
+
+
+class AsyncHttpClient:
+    """Process wide aiohttp session for requests made from the event loop.
+
+    Connections are pooled by one connector and DNS answers are cached between requests, at most
+    max_concurrency requests are in flight, and each call has its own deadline covering the wait for a slot
+    and reading of the response, so a slow backend is cancelled instead of blocking the loop.
+    """
+
+    DEFAULT_LIMIT = 100
+    DEFAULT_LIMIT_PER_HOST = 0
+    DEFAULT_MAX_CONCURRENCY = 100
+    DEFAULT_TTL_DNS_CACHE = 10
+
+    def __init__(self, limit: int = DEFAULT_LIMIT, limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, ttl_dns_cache: Optional[int] = DEFAULT_TTL_DNS_CACHE):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.max_concurrency = max_concurrency
+        self.ttl_dns_cache = ttl_dns_cache
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def configure(self, limit: int = DEFAULT_LIMIT, limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+                  max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                  ttl_dns_cache: Optional[int] = DEFAULT_TTL_DNS_CACHE) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.max_concurrency = max_concurrency
+        self.ttl_dns_cache = ttl_dns_cache
+        # the session is created again with new limits on next request
+        self._loop = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        # a session and a semaphore belong to the loop they are created in
+        if self._loop is not loop or self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             ttl_dns_cache=self.ttl_dns_cache)
+            # the session is shared by users, cookies of one response must not be sent with another request
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None),
+                                                  cookie_jar=aiohttp.DummyCookieJar())
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._session
+
+    @asynccontextmanager
+    async def response(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Same as aiohttp.request made by the shared session, for callers reading more than the text"""
+        session = self._get_session()
+        async with self._semaphore:
+            async with session.request(method, url, **kwargs) as response:
+                yield response
+
+    async def request(self, method: str, url: str, timeout: Optional[float] = None, **kwargs: Any) -> str:
+        async with deadline(timeout):
+            async with self.response(method, url, **kwargs) as response:
+                return await response.text()
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._session = None
+        self._semaphore = None
+        self._loop = None
+
+
+async_http_client = AsyncHttpClient()
@@ -9,6 +9,7 @@ import core.logging.logger_constants as log_const
 if TYPE_CHECKING:
     from core.mq.kafka.kafka_publisher import KafkaPublisher
     from aiokafka import ConsumerRecord
+    from asyncio import Future
     from typing import Dict, Optional, Sequence, Tuple, Any
 
 
@@ -38,12 +39,14 @@ class KafkaRequest(BaseRequest):
         headers = source_mq_message.headers or []
         return headers
 
-    async def send(self, data: bytes, publisher: KafkaPublisher, source_mq_message: ConsumerRecord) -> None:
+    async def send(self, data: bytes, publisher: KafkaPublisher,
+                   source_mq_message: ConsumerRecord) -> Optional[Future]:
+        """Returns the delivery future if the publisher does not wait for the broker ack"""
         headers = self._get_new_headers(source_mq_message)
         if self.topic is not None:
-            await publisher.send_to_topic(data, source_mq_message.key, self.topic, headers=headers)
+            return await publisher.send_to_topic(data, source_mq_message.key, self.topic, headers=headers)
         elif self.topic_key is not None:
-            await publisher.send(data, source_mq_message.key, self.topic_key, headers=headers)
+            return await publisher.send(data, source_mq_message.key, self.topic_key, headers=headers)
         else:
             log_params = {
                 "data": str(data),
@@ -51,10 +54,10 @@ class KafkaRequest(BaseRequest):
             }
             log("KafkaRequest: got no topic and no topic_key", params=log_params, level="ERROR")
 
-    async def run(self, data: bytes, params: Dict[str, Any]) -> None:
+    async def run(self, data: bytes, params: Dict[str, Any]) -> Optional[Future]:
         publishers = params["publishers"]
         publisher = publishers[self.kafka_key]
-        await self.send(data=data, publisher=publisher, source_mq_message=params["mq_message"])
+        return await self.send(data=data, publisher=publisher, source_mq_message=params["mq_message"])
 
     def __str__(self) -> str:
         if self.topic_key is not None:
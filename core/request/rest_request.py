@@ -1,5 +1,13 @@
+import asyncio
+import os
+import ssl
+from functools import cached_property
+from urllib.parse import urlsplit
+
+import aiohttp
 import requests
 from timeout_decorator import timeout_decorator
+from core.request.async_http_client import async_http_client
 from core.request.base_request import BaseRequest
 from core.utils.exception_handlers import exc_handler
 from core.monitoring.monitoring import monitoring
@@ -10,17 +18,32 @@ class RestNoMethodSpecifiedException(Exception):
 
 
 class RestRequest(BaseRequest):
+    """REST request: run is made with requests, run_async with the process wide aiohttp client.
+
+    rest_args are requests keyword arguments, run_async translates them to aiohttp ones. Arguments that have no
+    translation are rejected when the request is created, instead of being dropped or failing on every call.
+    """
     on_exc_return = None
     BLOCKING_TIMEOUT = 0.2
     URL = "url"
     POST = "post"
     GET = "get"
+    # given as is to both requests and aiohttp
+    COMMON_REST_ARGS = frozenset(["headers", "cookies", "params", "json", "allow_redirects"])
+    # translated to aiohttp arguments by _async_rest_args
+    TRANSLATED_REST_ARGS = frozenset(["timeout", "verify", "cert", "proxies", "auth"])
 
     def __init__(self, items, id=None):
         super(RestRequest, self).__init__(items)
         self.url = items.get(self.URL)
         self.method = items.get("method", self.POST)
         self.rest_args = items.get("rest_args") or dict()
+        unsupported = set(self.rest_args) - self.COMMON_REST_ARGS - self.TRANSLATED_REST_ARGS
+        if unsupported:
+            raise ValueError(f"RestRequest: unsupported rest_args {sorted(unsupported)} for {self.url}")
+        auth = self.rest_args.get("auth")
+        if auth is not None and not (isinstance(auth, (list, tuple)) and len(auth) == 2):
+            raise ValueError(f"RestRequest: auth for {self.url} must be a (user, password) pair")
 
     @property
     def group_key(self):
@@ -36,9 +59,64 @@ class RestRequest(BaseRequest):
                 method = self.post
             return method(data)
 
+    async def run_async(self, data, params=None):
+        """Non-blocking run: the request is cancelled at the deadline, the event loop is never blocked."""
+        if self.check_enabled():
+            try:
+                if self.method == self.GET:
+                    return await self.get_async(data)
+                elif self.method == self.POST:
+                    return await self.post_async(data)
+            except asyncio.TimeoutError:
+                self.on_timeout_error()
+
     def on_timeout_error(self, *args, **kwarg):
         monitoring.got_counter("core_rest_run_timeout")
 
+    @cached_property
+    def _async_rest_args(self):
+        # rest_args are given for requests, the deadline replaces their timeout
+        rest_args = {key: value for key, value in self.rest_args.items() if key in self.COMMON_REST_ARGS}
+        verify = self.rest_args.get("verify", True)
+        cert = self.rest_args.get("cert")
+        if verify is False and not cert:
+            rest_args["ssl"] = False
+        elif isinstance(verify, str) or cert:
+            rest_args["ssl"] = self._ssl_context(verify, cert)
+        proxies = self.rest_args.get("proxies") or {}
+        proxy = proxies.get(urlsplit(self.url or "").scheme) or proxies.get("all")
+        if proxy:
+            rest_args["proxy"] = proxy
+        auth = self.rest_args.get("auth")
+        if auth is not None:
+            rest_args["auth"] = aiohttp.BasicAuth(*auth)
+        return rest_args
+
+    @staticmethod
+    def _ssl_context(verify, cert) -> ssl.SSLContext:
+        if isinstance(verify, str):
+            # requests takes a CA bundle file or a directory of certificates
+            context = ssl.create_default_context(**{"capath" if os.path.isdir(verify) else "cafile": verify})
+        else:
+            context = ssl.create_default_context()
+        if verify is False:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        if cert:
+            if isinstance(cert, str):
+                context.load_cert_chain(cert)
+            else:
+                context.load_cert_chain(*cert)
+        return context
+
+    async def get_async(self, data=None):
+        return await async_http_client.request("GET", self.url, timeout=self.timeout or self.BLOCKING_TIMEOUT,
+                                               params=data, **self._async_rest_args)
+
+    async def post_async(self, data=None):
+        return await async_http_client.request("POST", self.url, timeout=self.timeout or self.BLOCKING_TIMEOUT,
+                                               data=data, **self._async_rest_args)
+
     def _requests_get(self, params):
         return requests.get(self.url, params=params, **self.rest_args).text
 
@@ -82,7 +82,7 @@ class TextPreprocessingResult(BaseTextPreprocessingResult):
             app_config = get_app_config()
 
             normalized_words = [
-                app_config.NORMALIZER.morph.pymorphy_analyzer.parse(tokenized_word)[0].normalized.normal_form
+                app_config.NORMALIZER.morph.parse(tokenized_word)[0].normalized.normal_form
                 for tokenized_word in nltk.tokenize.word_tokenize(self.original_text)
             ]
             self._normalized_text_pymorphy = " ".join(normalized_words)
@@ -0,0 +1,124 @@
+import hashlib
+import os
+from collections import OrderedDict, namedtuple
+from typing import Dict, Iterable, Optional, Tuple
+
+import jinja2
+from jinja2 import meta, nodes
+
+# filters giving different results for the same input
+NON_DETERMINISTIC_FILTERS = {"random"}
+# globals known to give the same results for the same input, others like now() or uuid4() may not
+DETERMINISTIC_GLOBALS = {"range", "dict", "namespace"}
+
+# variables: top level names the template takes from params,
+# deterministic: the result depends on those variables only
+TemplateAnalysis = namedtuple("TemplateAnalysis", "variables, deterministic")
+
+
+class _InternedSourceLoader(jinja2.BaseLoader):
+    """Serves template sources by their hash, so templates are compiled through the bytecode cache.
+
+    A source is kept only while its template is compiled.
+    """
+
+    def __init__(self):
+        self.sources: Dict[str, str] = {}
+
+    def get_source(self, environment, template):
+        source = self.sources.get(template)
+        if source is None:
+            raise jinja2.TemplateNotFound(template)
+        return source, None, lambda: True
+
+
+class TemplateEnvironment:
+    """Process wide jinja2 environments, one per set of extensions, with compiled templates interned by source.
+
+    Equal template sources met in actions, requirements and fillers share one compiled template. At most cache_size
+    least recently used templates and analyses are kept, since templates may be built from runtime data too.
+    """
+
+    DEFAULT_CACHE_SIZE = 10000
+
+    def __init__(self, bytecode_cache_path: Optional[str] = None, cache_size: int = DEFAULT_CACHE_SIZE):
+        self._loader = _InternedSourceLoader()
+        self._bytecode_cache = None
+        self.cache_size = cache_size
+        self._environments: Dict[Tuple[str, ...], jinja2.Environment] = {}
+        self._templates: "OrderedDict[Tuple[str, Tuple[str, ...]], jinja2.Template]" = OrderedDict()
+        self._analyses: "OrderedDict[Tuple[str, Tuple[str, ...]], TemplateAnalysis]" = OrderedDict()
+        self.set_bytecode_cache_path(bytecode_cache_path)
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def set_bytecode_cache_path(self, path: Optional[str]) -> None:
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._bytecode_cache = jinja2.FileSystemBytecodeCache(path)
+        else:
+            self._bytecode_cache = None
+        for environment in self._environments.values():
+            environment.bytecode_cache = self._bytecode_cache
+
+    def set_cache_size(self, cache_size: int) -> None:
+        self.cache_size = cache_size
+        for cache in (self._templates, self._analyses):
+            self._trim(cache)
+
+    def _trim(self, cache: OrderedDict) -> None:
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def _store(self, cache: OrderedDict, key: Tuple[str, Tuple[str, ...]], value) -> None:
+        cache[key] = value
+        self._trim(cache)
+
+    def get_environment(self, extensions: Iterable[str] = ()) -> jinja2.Environment:
+        extensions = tuple(extensions)
+        environment = self._environments.get(extensions)
+        if environment is None:
+            # filters and globals of core.unified_template.jinja_filters are copied on creation
+            environment = jinja2.Environment(loader=self._loader, extensions=extensions,
+                                             bytecode_cache=self._bytecode_cache, cache_size=0)
+            self._environments[extensions] = environment
+        return environment
+
+    def get_template(self, source: str, extensions: Iterable[str] = ()) -> jinja2.Template:
+        extensions = tuple(extensions)
+        name = hashlib.sha1(source.encode()).hexdigest()
+        template = self._templates.get((name, extensions))
+        if template is not None:
+            self._templates.move_to_end((name, extensions))
+        else:
+            self._loader.sources[name] = source
+            try:
+                template = self.get_environment(extensions).get_template(name)
+            finally:
+                del self._loader.sources[name]
+            self._store(self._templates, (name, extensions), template)
+        return template
+
+    def analyze(self, source: str, extensions: Iterable[str] = ()) -> TemplateAnalysis:
+        extensions = tuple(extensions)
+        key = (hashlib.sha1(source.encode()).hexdigest(), extensions)
+        analysis = self._analyses.get(key)
+        if analysis is not None:
+            self._analyses.move_to_end(key)
+        else:
+            environment = self.get_environment(extensions)
+            ast = environment.parse(source)
+            # extensions may add tags with any behaviour
+            deterministic = (
+                not extensions and
+                not any(node.name in NON_DETERMINISTIC_FILTERS for node in ast.find_all(nodes.Filter)) and
+                not any(node.name in environment.globals and node.name not in DETERMINISTIC_GLOBALS
+                        for node in ast.find_all(nodes.Name))
+            )
+            analysis = TemplateAnalysis(frozenset(meta.find_undeclared_variables(ast)), deterministic)
+            self._store(self._analyses, key, analysis)
+        return analysis
+
+
+template_environment = TemplateEnvironment()
@@ -1,15 +1,18 @@
 import json
 import logging
 from copy import copy
-import jinja2
 from distutils.util import strtobool
 import os
 
 import core.logging.logger_constants as log_const
 from core.logging.logger_utils import log
 from core.monitoring.monitoring import monitoring
+from core.unified_template.template_environment import template_environment
 
 UNIFIED_TEMPLATE_TYPE_NAME = "unified_template"
+# values of params keying memoized renders, mutable params are never memoized
+MEMOIZABLE_PARAM_TYPES = (str, int, float, bool, type(None))
+_NOT_RENDERED = object()
 
 
 def bool_loader(val):
@@ -17,6 +20,13 @@ def bool_loader(val):
 
 
 class UnifiedTemplate:
+    """Jinja template with a loader of the rendered string.
+
+    Templates using no params render once. Renders of other deterministic templates are memoized by values
+    of their params while all of them are immutable.
+    """
+    MEMO_SIZE = 32
+
     loaders = {
         "str": str,
         "int": int,
@@ -28,18 +38,27 @@ class UnifiedTemplate:
     def __init__(self, input):
         self.input = input
         if isinstance(input, str):
-            self.template = jinja2.Template(input)
+            self.template = template_environment.get_template(input)
+            analysis = template_environment.analyze(input)
             self.loader = UnifiedTemplate.loaders["str"]
             self.support_templates = dict()
         elif isinstance(input, dict):
             if input.get("type") != UNIFIED_TEMPLATE_TYPE_NAME:
                 raise Exception("template must be string or dict with type='{}'".format(UNIFIED_TEMPLATE_TYPE_NAME))
-            self.template = jinja2.Template(input["template"],
-                                            extensions=input.get("extensions", ()))
+            self.template = template_environment.get_template(input["template"],
+                                                              extensions=input.get("extensions", ()))
+            analysis = template_environment.analyze(input["template"], extensions=input.get("extensions", ()))
             self.loader = UnifiedTemplate.loaders[input.get("loader", "str")]
             self.support_templates = {k: UnifiedTemplate(t) for k, t in input.get("support_templates", dict()).items()}
         else:
             raise Exception("template must be string or dict with type='{}'".format(UNIFIED_TEMPLATE_TYPE_NAME))
+        # support templates get their params too, so the params of the whole template are not known
+        self._memoizable = analysis.deterministic and not self.support_templates
+        self.is_constant = self._memoizable and not analysis.variables
+        self._variables = tuple(sorted(analysis.variables))
+        self._constant_rendered = False
+        self._constant_result = None
+        self._memo = {}
         self.is_logging_debug_mode = logging.getLogger(globals().get("__name__")).isEnabledFor(
             logging.getLevelName("DEBUG")
         )
@@ -69,6 +88,39 @@ class UnifiedTemplate:
         return result
 
     def silent_render(self, params_dict):
+        result = self._render_memoized(params_dict) if self._memoizable else self._render(params_dict)
+        if self.loader != str:
+            result = self.loader(result)
+        return result
+
+    def _render_memoized(self, params_dict):
+        if self.is_constant:
+            if not self._constant_rendered:
+                self._constant_result = self._render(params_dict)
+                self._constant_rendered = True
+            return self._constant_result
+        key = self._memo_key(params_dict)
+        if key is None:
+            return self._render(params_dict)
+        result = self._memo.get(key, _NOT_RENDERED)
+        if result is _NOT_RENDERED:
+            result = self._render(params_dict)
+            if len(self._memo) >= self.MEMO_SIZE:
+                self._memo.clear()
+            self._memo[key] = result
+        return result
+
+    def _memo_key(self, params_dict):
+        key = []
+        for name in self._variables:
+            value = params_dict.get(name, _NOT_RENDERED)
+            if not isinstance(value, MEMOIZABLE_PARAM_TYPES):
+                return None
+            # True == 1 == 1.0, but they are rendered differently
+            key.append((type(value), value))
+        return tuple(key)
+
+    def _render(self, params_dict):
         if self.support_templates:
             changed_params_dict = copy(params_dict)
             for support_key, support_template in self.support_templates.items():
@@ -79,8 +131,6 @@ class UnifiedTemplate:
             result = self.template.render(changed_params_dict)
         else:
             result = self.template.render()
-        if self.loader != str:
-            result = self.loader(result)
         return result
 
     def __str__(self):
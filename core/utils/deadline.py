@@ -0,0 +1,6 @@
+try:
+    from asyncio import timeout as deadline
+except ImportError:  # python < 3.11, async_timeout is installed with aiohttp there
+    from async_timeout import timeout as deadline
+
+__all__ = ["deadline"]
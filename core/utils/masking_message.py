@@ -1,4 +1,5 @@
-from typing import Optional, Union, Match, Dict, List
+from functools import lru_cache
+from typing import Optional, Union, Match, Dict, List, Tuple
 import re
 
 MASK = "***"
@@ -33,96 +34,137 @@ def luhn_checksum(card_number: str) -> bool:
     return checksum % 10 == 0
 
 
-def card_sub_func(x: Match[str]) -> str:
-    d_regular = re.compile(r"\d")
+digit_regular = re.compile(r"\d")
+
 
+def card_sub_func(x: Match[str]) -> str:
     g0 = x.group(0)
     is_last_not_digit = int(g0 and not g0[-1].isdigit())
     last_char = g0[-1]
 
-    mask = d_regular.sub("*", x.group(0))[:-(4 + is_last_not_digit)]
+    mask = digit_regular.sub("*", x.group(0))[:-(4 + is_last_not_digit)]
     digs = (x.group(0) or '').replace(' ', '')[-4:]
     return mask + digs + (last_char * is_last_not_digit)
 
 
-def masking(data: Union[Dict, List], masking_fields: Optional[Union[Dict, List]] = None,
-            depth_level: int = 2, mask_available_depth: int = -1,
-            white_list: Optional[List[str]] = None) -> Union[Dict, List]:
+class MaskingPlan:
     """
-    :param data: коллекция для маскирования приватных данных
-    :param masking_fields: поля для обязательной маскировки независимо от уровня
-    :param white_list: поля, которые не должны маскироваться
-    :param depth_level: глубина сохранения структуры маскируемого поля
-    :param mask_available_depth: глубина глубокой маскировки полей без сохранения структуры (см ниже)
+    Правила маскировки, подготовленные один раз для набора полей, глубины и белого списка.
+    Данные не изменяются: при share=True коллекции без маскируемых значений не копируются,
+    а попадают в результат как есть (копирование при изменении), при share=False копируются все коллекции.
+    Ключи, не требующие маскировки, определяются одной проверкой по множеству всех особых ключей.
     """
 
+    def __init__(self, masking_fields: Dict, depth_level: int = 2, mask_available_depth: int = -1,
+                 white_list: Optional[List[str]] = None):
+        self.masking_fields = masking_fields
+        self.depth_level = depth_level
+        self.mask_available_depth = mask_available_depth
+        self.white_list = frozenset(white_list) if white_list is not None else frozenset()
+        self.card_fields = frozenset(CARD_MASKING_FIELDS)
+        self.special_keys = frozenset(masking_fields) | self.card_fields | self.white_list
+
+    def apply(self, data: Union[Dict, List], share: bool = True) -> Union[Dict, List]:
+        return self._walk(data, self.depth_level, False, False, share)
+
+    def _walk(self, data, depth_level: int, masking_on: bool, card_masking_on: bool, share: bool):
+        # множества и кортежи в результате заменяются списками, в исходных данных остаются как были
+        if isinstance(data, dict):
+            items = data.items()
+            masked_data = {}
+        else:
+            items = enumerate(data)
+            masked_data = [None] * len(data)
+        changed = not share or not isinstance(data, (dict, list))
+        plain = not (masking_on or card_masking_on)
+        special_keys = self.special_keys
+
+        for key, value in items:
+            if plain and key not in special_keys:
+                # частый случай: обычный ключ вне маскируемых полей
+                if isinstance(value, (dict, list)):
+                    masked_value = self._walk(value, depth_level, False, False, share)
+                elif isinstance(value, (set, tuple)):
+                    masked_value = self._walk(list(value), depth_level, False, False, share)
+                else:
+                    masked_value = value
+            else:
+                masked_value = self._walk_value(key, value, depth_level, masking_on, card_masking_on, share)
+            masked_data[key] = masked_value
+            changed = changed or masked_value is not value
+        return masked_data if changed else data
+
+    def _walk_value(self, key, value, depth_level: int, masking_on: bool, card_masking_on: bool, share: bool):
+        if isinstance(value, (set, tuple)):
+            value = list(value)
+            value_is_collection = True
+        else:
+            value_is_collection = isinstance(value, (dict, list))
+
+        masking_fields = self.masking_fields
+        if key in self.white_list:
+            return value
+        if masking_on or key in masking_fields:
+            if value_is_collection:
+                # если глубина не превышена, идем внутрь с включенным флагом и уменьшаем глубину
+                if masking_on and depth_level > 0:
+                    return self._walk(value, depth_level - 1, True, False, share)
+                if key in masking_fields and masking_fields[key] > 0:
+                    return self._walk(value, masking_fields[key] - 1, True, False, share)
+                counter = structure_mask(value, depth=1, available_depth=self.mask_available_depth)
+                return f'*items-{counter.items}*collections-{counter.collections}*maxdepth-{counter.max_depth}*'
+            if value is not None:  # в случае простого элемента. маскируем как ***
+                return MASK
+            return value
+        if key in self.card_fields or card_masking_on:  # проверка на реквизиты карты
+            if value_is_collection:
+                return self._walk(value, depth_level, masking_on, True, share)
+            if isinstance(value, str):
+                masked_value = card_regular.sub(card_sub_func, value)
+                return value if masked_value == value else masked_value
+            if isinstance(value, int):
+                str_value = str(value)
+                masked_value = card_regular.sub(card_sub_func, str_value)
+                return masked_value if masked_value != str_value else value
+            return value
+        if value_is_collection:
+            # если маскировка не нужна уходим глубже без включенного флага
+            return self._walk(value, depth_level, False, card_masking_on, share)
+        return value
+
+
+@lru_cache(maxsize=64)
+def _compile(masking_fields: Tuple, depth_level: int, mask_available_depth: int,
+             white_list: Optional[Tuple]) -> MaskingPlan:
+    return MaskingPlan(dict(masking_fields), depth_level, mask_available_depth, white_list)
+
+
+def compile_masking(masking_fields: Optional[Union[Dict, List]] = None, depth_level: int = 2,
+                    mask_available_depth: int = -1, white_list: Optional[List[str]] = None) -> MaskingPlan:
+    """План маскировки, общий для одинаковых настроек, параметры как у masking"""
     if isinstance(masking_fields, list):
         masking_fields = {key: depth_level for key in masking_fields}
 
     if masking_fields is None:
         masking_fields = DEFAULT_MASKING_FIELDS
 
-    return _masking(data, masking_fields, depth_level, mask_available_depth,
-                    masking_on=False, card_masking_on=False, white_list=white_list)
-
+    return _compile(tuple(masking_fields.items()), depth_level, mask_available_depth,
+                    tuple(white_list) if white_list is not None else None)
 
-def _masking(data: Union[Dict, List], masking_fields: Union[Dict, List],
-             depth_level: int = 2, mask_available_depth: int = -1, masking_on: bool = False,
-             card_masking_on: bool = False, white_list: Optional[List[str]] = None) -> Union[Dict, List]:
 
-    # тут в зависимости от листа или словаря создаем итератор
-    if isinstance(data, dict):
-        key_gen = data.items()
-        masked_data = dict()
-    else:
-        key_gen = enumerate(data)
-        masked_data = [None for _ in range(len(data))]
-
-    for key, _ in key_gen:
-        value_is_collection = isinstance(data[key], (dict, list))
-        if isinstance(data[key], (set, tuple)):
-            data[key] = list(data[key])
-            value_is_collection = True
-        if white_list is not None and key in white_list:
-            masked_data[key] = data[key]
-        elif masking_on or key in masking_fields:
-            if value_is_collection:
-                # если глубина не превышена, идем внутрь с включенным флагом и уменьшаем глубину
-                if masking_on and depth_level > 0:
-                    masked_data[key] = _masking(data[key], masking_fields, depth_level - 1,
-                                                mask_available_depth, masking_on=True, white_list=white_list)
-                elif key in masking_fields and masking_fields[key] > 0:
-                    masked_data[key] = _masking(data[key], masking_fields, masking_fields[key] - 1,
-                                                mask_available_depth, masking_on=True, white_list=white_list)
-                else:
-                    counter = structure_mask(data[key], depth=1, available_depth=mask_available_depth)
-                    masked_data[key] = f'*items-{counter.items}*collections-{counter.collections}*maxdepth-{counter.max_depth}*'  # noqa
-            elif data[key] is not None:  # в случае простого элемента. маскируем как ***
-                masked_data[key] = '***'
-            else:
-                masked_data[key] = data[key]
-        elif key in CARD_MASKING_FIELDS or card_masking_on:  # проверка на реквизиты карты
-            if value_is_collection:
-                masked_data[key] = _masking(data[key], masking_fields, depth_level, mask_available_depth,
-                                            masking_on, card_masking_on=True, white_list=white_list)
-            elif isinstance(data[key], str):
-                masked_data[key] = card_regular.sub(card_sub_func, data[key])
-            elif isinstance(data[key], int):
-                str_value = str(data[key])
-                masked_value = card_regular.sub(card_sub_func, str_value)
-                if masked_value != str_value:
-                    masked_data[key] = masked_value
-                else:
-                    masked_data[key] = data[key]
-            else:
-                masked_data[key] = data[key]
-        elif value_is_collection:
-            # если маскировка не нужна уходим глубже без включенного флага
-            masked_data[key] = _masking(data[key], masking_fields, depth_level, mask_available_depth,
-                                        masking_on=False, card_masking_on=card_masking_on, white_list=white_list)
-        else:
-            masked_data[key] = data[key]
-    return masked_data
+def masking(data: Union[Dict, List], masking_fields: Optional[Union[Dict, List]] = None,
+            depth_level: int = 2, mask_available_depth: int = -1,
+            white_list: Optional[List[str]] = None, share: bool = False) -> Union[Dict, List]:
+    """
+    :param data: коллекция для маскирования приватных данных, не изменяется
+    :param masking_fields: поля для обязательной маскировки независимо от уровня
+    :param white_list: поля, которые не должны маскироваться
+    :param depth_level: глубина сохранения структуры маскируемого поля
+    :param mask_available_depth: глубина глубокой маскировки полей без сохранения структуры (см ниже)
+    :param share: не копировать коллекции, в которых нечего маскировать; результат тогда нельзя изменять
+    """
+    plan = compile_masking(masking_fields, depth_level, mask_available_depth, white_list)
+    return plan.apply(data, share=share)
 
 
 def structure_mask(data: Union[Dict, List], depth: int, available_depth: int = -1,
@@ -9,7 +9,7 @@
 from datetime import datetime
 from typing import Any, Callable, Dict, Optional, Tuple
 
-from core.logging.logger_utils import behaviour_log
+from core.logging.logger_utils import behaviour_log, lazy
 from core.text_preprocessing.preprocessing_result import TextPreprocessingResult
 from nlpf_statemachine.config import SMConfig
 from nlpf_statemachine.const import GLOBAL_NODE_NAME
@@ -983,7 +983,7 @@ class ContextManager(ScenarioContainer):
 
         if response:
             behaviour_log("ContextManager response.", level="INFO", user=user,
-                          params={"sm_response": response.model_dump()})
+                          params={"sm_response": lazy(response.model_dump)})
         else:
             behaviour_log("ContextManager response is None.", level="INFO", user=user)
 
@@ -1,5 +1,4 @@
 """# Переопределение объекта NLPF User."""
-import json
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Type
 
@@ -21,6 +20,7 @@ from nlpf_statemachine.models import (
 )
 from nlpf_statemachine.utils.base_utils import get_field_class
 from scenarios.user.parametrizer import Parametrizer
+from scenarios.user.user_codec import decode_user_data
 from scenarios.user.user_model import User
 from smart_kit.configs.settings import Settings
 
@@ -45,7 +45,7 @@ class SMUser(User):
         self.message_pd = self.build_message(message.as_dict)
 
         try:
-            user_values = json.loads(db_data) if db_data else None
+            user_values = decode_user_data(db_data) if db_data else None
         except ValueError:
             user_values = None
 
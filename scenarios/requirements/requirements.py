@@ -9,6 +9,7 @@ from typing import Optional, Dict, Any
 
 
 class AskAgainExistRequirement(Requirement):
+    cost = 10
 
     def check(self, text_preprocessing_result: BaseTextPreprocessingResult, user: User,
               params: Dict[str, Any] = None) -> bool:
@@ -18,6 +19,8 @@ class AskAgainExistRequirement(Requirement):
 
 
 class TemplateInArrayRequirement(Requirement):
+    cost = 10
+
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         super().__init__(items, id)
         self._template = UnifiedTemplate(items["template"])
@@ -33,6 +36,8 @@ class TemplateInArrayRequirement(Requirement):
 
 
 class ArrayItemInTemplateRequirement(Requirement):
+    cost = 10
+
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         super().__init__(items, id)
         self._template = UnifiedTemplate(items["template"])
@@ -51,6 +56,8 @@ class ArrayItemInTemplateRequirement(Requirement):
 
 
 class RegexpInTemplateRequirement(Requirement):
+    cost = 10
+
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         super().__init__(items, id)
         self._template = UnifiedTemplate(items["template"])
@@ -1,6 +1,7 @@
 # coding: utf-8
-from core.logging.logger_utils import log
+from core.logging.logger_utils import lazy, log
 from core.model.registered import Registered
+from core.model.state_version import next_state_version
 from core.utils.masking_message import masking
 
 import scenarios.logging.logger_constants as log_const
@@ -23,6 +24,7 @@ class BasicField:
         self._available = items.get("available", self.description.available)
         self._user = user
         self._lifetime = lifetime
+        self.version = 0
         self._masking_fields = user.settings["template_settings"].get("masking_fields") if user is not None else []
 
     @property
@@ -60,17 +62,20 @@ class BasicField:
 
     def _set_value(self, value):
         self._value = value
-        dict_value = {self.description.name: value}
-        masked_dict_value = masking(dict_value, self._masking_fields)
+        self.version = next_state_version()
         message = "%(class_name)s: %(description_id)s filled by value: %(field_value)s"
         params = {
             log_const.KEY_NAME: log_const.FILLER_RESULT_VALUE,
             "class_name": self.__class__.__name__,
             "description_id": self.description.id,
-            "field_value": str(masked_dict_value[self.description.name]),
+            "field_value": lazy(self._masked_value_str, value),
         }
         log(message, None, params)
 
+    def _masked_value_str(self, value):
+        masked_dict_value = masking({self.description.name: value}, self._masking_fields, share=True)
+        return str(masked_dict_value[self.description.name])
+
     def set_available(self):
         self._available = True
 
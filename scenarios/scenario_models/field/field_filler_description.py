@@ -24,6 +24,7 @@ from core.utils.exception_handlers import exc_handler
 from core.utils.pickle_copy import pickle_deepcopy
 from core.utils.stats_timer import StatsTimer
 from core.utils.period_determiner import extract_words_describing_period, period_determiner
+from scenarios.scenario_models.field.regexp_matches import regexp_matches
 from scenarios.user.user_model import User
 
 field_filler_description = Registered()
@@ -203,11 +204,16 @@ class RegexpFieldFiller(FieldFillerDescription):
         self.regexp = items["exp"]
         self.delimiter = items.get("delimiter", ",")
 
+    @cached_property
+    def compiled_regexp(self) -> Pattern:
+        # compiled once instead of a lookup in the re module cache, which apps with many patterns overflow
+        return re.compile(self.regexp)
+
     @exc_handler(on_error_obj_method_name="on_extract_error")
     def extract(self, text_preprocessing_result: BaseTextPreprocessingResult, user: User,
                 params: Dict[str, Any] = None) -> Optional[str]:
         original_text = text_preprocessing_result.original_text
-        match = re.findall(self.regexp, original_text)
+        match = regexp_matches.findall(self.compiled_regexp, original_text)
         if match:
             log_params = self._log_params()
             log_params["match"] = str(match)
@@ -269,7 +275,7 @@ class AllRegexpsFieldFiller(FieldFillerDescription):
             original_text = original_text.lower()
         matches = []
         for r in self.regexps:
-            matches.extend(r.findall(original_text))
+            matches.extend(regexp_matches.findall(r, original_text))
         if matches:
             result = self.delimiter.join(matches)
             log_params = self._log_params()
@@ -349,31 +355,63 @@ class IntersectionFieldFiller(FieldFillerDescription):
         from smart_kit.configs import get_app_config
         app_config = get_app_config()
 
+        # все фразы нормализуются одним вызовом, результаты раскладываются по ключам в порядке фраз
+        messages = iter(app_config.NORMALIZER.normalize_sequence(
+            [phrase for val in self.cases.values() for phrase in val]))
         self.normalized_cases = []
         for key, val in self.cases.items():
             tokens_list = []
-            for message in app_config.NORMALIZER.normalize_sequence(val):
+            for message in islice(messages, len(val)):
                 case = set()
                 for norm in message["tokenized_elements_list"]:
                     if norm.get("token_type") != "SENTENCE_ENDPOINT_TOKEN":
                         case.add(norm.get("lemma"))
                 tokens_list.append(case)
             self.normalized_cases.append((key, tokens_list))
+        self._build_index()
+
+    def _build_index(self):
+        # inverted index: lemma -> numbers of cases containing it, cases are numbered in declaration order
+        self._indexed_cases = [(key, tokens) for key, tokens_list in self.normalized_cases for tokens in tokens_list]
+        self._index: Dict[str, List[int]] = {}
+        for number, (_, tokens) in enumerate(self._indexed_cases):
+            for token in tokens:
+                self._index.setdefault(token, []).append(number)
+        self._first_empty_case = next((number for number, (_, tokens) in enumerate(self._indexed_cases)
+                                       if not tokens), None)
+
+    def _find_case(self, tpr_tokenized_set):
+        """Number of the first case matched by the message, looking up only cases sharing a lemma with it"""
+        strict = self.operator is operator.eq
+        found = None
+        if self._first_empty_case is not None and (not strict or not tpr_tokenized_set):
+            found = self._first_empty_case
+        hits: Dict[int, int] = {}
+        for token in tpr_tokenized_set:
+            for number in self._index.get(token, ()):
+                hits[number] = hits.get(number, 0) + 1
+        for number, count in hits.items():
+            if found is not None and number > found:
+                continue
+            tokens = self._indexed_cases[number][1]
+            if count == len(tokens) and (not strict or count == len(tpr_tokenized_set)):
+                found = number
+        return found
 
     @exc_handler(on_error_obj_method_name="on_extract_error")
     def extract(self, text_preprocessing_result: TextPreprocessingResult, user: User,
                 params: Dict[str, Any] = None) -> Optional[str]:
         tpr_tokenized_set = {norm.get("lemma") for norm in text_preprocessing_result.tokenized_elements_list_pymorphy if
                              norm.get("token_type") != "SENTENCE_ENDPOINT_TOKEN"}
-        for key, tokens_list in self.normalized_cases:
-            for tokens in tokens_list:
-                if self.operator(tpr_tokenized_set, tokens):
-                    log_params = self._log_params()
-                    log_params["words_tokenized_set"] = str(tpr_tokenized_set)
-                    log_params["tokens"] = str(tokens)
-                    message = "Filler: %(filler)s, words_normalized_set: %(words_tokenized_set)s, tokens: %(tokens)s"
-                    log(message, user, log_params)
-                    return key
+        number = self._find_case(tpr_tokenized_set)
+        if number is not None:
+            key, tokens = self._indexed_cases[number]
+            log_params = self._log_params()
+            log_params["words_tokenized_set"] = str(tpr_tokenized_set)
+            log_params["tokens"] = str(tokens)
+            message = "Filler: %(filler)s, words_normalized_set: %(words_tokenized_set)s, tokens: %(tokens)s"
+            log(message, user, log_params)
+            return key
         if self.default:
             return self.default
 
@@ -480,14 +518,11 @@ class ApproveFiller(FieldFillerDescription):
         self.no_words = items.get("no_words")
         self.set_yes_words: Set = set(self.yes_words or [])
         self.set_no_words: Set = set(self.no_words or [])
-        self.yes_words_normalized: Set = {
-            TextPreprocessingResult(result).tokenized_string for result in
-            app_config.NORMALIZER.normalize_sequence(list(self.set_yes_words))
-        }
-        self.no_words_normalized: Set = {
-            TextPreprocessingResult(result).tokenized_string for result in
-            app_config.NORMALIZER.normalize_sequence(list(self.set_no_words))
-        }
+        words = list(self.set_yes_words) + list(self.set_no_words)
+        normalized = [TextPreprocessingResult(result).tokenized_string
+                      for result in app_config.NORMALIZER.normalize_sequence(words)]
+        self.yes_words_normalized: Set = set(normalized[:len(self.set_yes_words)])
+        self.no_words_normalized: Set = set(normalized[len(self.set_yes_words):])
 
     @exc_handler(on_error_obj_method_name="on_extract_error")
     def extract(self, text_preprocessing_result: TextPreprocessingResult, user: User,
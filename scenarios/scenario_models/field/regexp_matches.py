@@ -0,0 +1,32 @@
+from typing import Dict, List, Pattern
+
+
+class RegexpMatches:
+    """`findall` results of the regexp fillers of the app for the last processed texts.
+
+    A filler is run both to check that its field can be filled and to fill it, and equal patterns are met in many
+    forms, so the same text is scanned by the same pattern many times while a message is processed.
+    """
+
+    TEXTS_CACHE_SIZE = 8
+
+    def __init__(self):
+        self._matches: Dict[str, Dict[Pattern, List]] = {}
+
+    def findall(self, regexp: Pattern, text: str) -> List:
+        """Returned list is shared between callers and must not be modified"""
+        matches = self._matches.get(text)
+        if matches is None:
+            if len(self._matches) >= self.TEXTS_CACHE_SIZE:
+                self._matches.clear()
+            matches = self._matches[text] = {}
+        result = matches.get(regexp)
+        if result is None:
+            result = matches[regexp] = regexp.findall(text)
+        return result
+
+    def clear(self) -> None:
+        self._matches.clear()
+
+
+regexp_matches = RegexpMatches()
@@ -15,6 +15,10 @@ class CompositeForm(BaseForm):
     def set_valid(self):
         self._valid = True
 
+    @property
+    def version(self) -> int:
+        return self.forms.version
+
     def get_fields_values(self):
         data = {}
         for form in self.description.forms.keys():
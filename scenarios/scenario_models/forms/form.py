@@ -33,6 +33,11 @@ class BaseForm:
     def raw(self):
         raise NotImplementedError
 
+    @property
+    def version(self) -> int:
+        """Changes when values of fields change"""
+        return 0
+
     def get_fields_values(self):
         raise NotImplementedError
 
@@ -57,6 +62,10 @@ class Form(BaseForm):
     def get_fields_values(self):
         return {self.description.id: self.fields.values}
 
+    @property
+    def version(self) -> int:
+        return self.fields.version
+
     @property
     def raw(self):
         raw = {}
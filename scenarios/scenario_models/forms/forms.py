@@ -2,6 +2,7 @@
 
 from scenarios.scenario_models.forms.form import form_model_factory
 from core.model.lazy_items import LazyItems
+from core.model.state_version import next_state_version
 
 
 class Forms(LazyItems):
@@ -31,12 +32,14 @@ class Forms(LazyItems):
             description = self._descriptions.get(descr_id)
             if description and description in self._items:
                 self._items.pop(description)
+        self._version = next_state_version()
 
     def new(self, descr_id):
         self.remove_item(descr_id)
         description = self._descriptions[descr_id]
         form = self._build_factory(description, {})
         self._items[description] = form
+        self._version = next_state_version()
         form.touch()
         return form
 
@@ -65,6 +68,7 @@ class Forms(LazyItems):
     def clear_all(self):
         self._raw_items.clear()
         self._items.clear()
+        self._version = next_state_version()
 
     def clear_form(self, scenario_name):
         scenario_descriptions = self._user.descriptions["scenarios"]
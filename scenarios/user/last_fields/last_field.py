@@ -1,12 +1,33 @@
 # coding: utf-8
 import time
 
+from core.model.state_version import next_state_version
+
 
 class LastField:
     def __init__(self, items):
         items = items or {}
-        self.value = items.get("value")
-        self.remove_time = items.get("remove_time")
+        self._value = items.get("value")
+        self._remove_time = items.get("remove_time")
+        self.version = 0
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self.version = next_state_version()
+
+    @property
+    def remove_time(self):
+        return self._remove_time
+
+    @remove_time.setter
+    def remove_time(self, remove_time):
+        self._remove_time = remove_time
+        self.version = next_state_version()
 
     def set_remove_time(self, lifetime):
         if lifetime:
@@ -1,6 +1,7 @@
 # coding: utf-8
 import time
 
+from core.model.state_version import next_state_version
 from scenarios.user.last_fields.last_field import LastField
 
 
@@ -9,6 +10,7 @@ class LastFields:
         self._raw_items = items or {}
         self._items = dict()
         self._factory = LastField
+        self._version = 0
 
     def __getitem__(self, id):
         existed_item = self._items.get(id)
@@ -20,6 +22,7 @@ class LastFields:
 
     def __setitem__(self, id, value):
         self._items[id] = value
+        self._version = next_state_version()
 
     def __iter__(self):
         return iter(self.raw)
@@ -37,10 +40,17 @@ class LastFields:
             self._raw_items.pop(key)
         if key in self._items:
             del self._items[key]
+        self._version = next_state_version()
 
     def clear_all(self):
         self._raw_items.clear()
         self._items.clear()
+        self._version = next_state_version()
+
+    @property
+    def version(self) -> int:
+        # values of last fields are changed in place by question fields, which change their own versions then
+        return max([self._version, *(getattr(item, "version", 0) for item in self._items.values())])
 
     @property
     def raw(self):
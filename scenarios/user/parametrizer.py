@@ -1,3 +1,6 @@
+import copy
+import time
+
 from core.basic_models.parametrizers.parametrizer import BasicParametrizer
 
 
@@ -5,6 +8,8 @@ class Parametrizer(BasicParametrizer):
 
     def __init__(self, user, items):
         super(Parametrizer, self).__init__(user, items)
+        # (state versions, valid until, forms, local_vars, variables)
+        self._snapshot = None
 
     def _get_scenario(self):
         scenario_id = self._user.last_scenarios.last_scenario_name
@@ -16,22 +21,49 @@ class Parametrizer(BasicParametrizer):
             return forms[scenario.form_type]
         return None
 
+    def _state_versions(self):
+        versions = tuple(getattr(getattr(self._user, name, None), "version", None)
+                         for name in ("forms", "last_fields", "local_vars", "variables"))
+        return None if None in versions else versions
+
+    def _valid_until(self):
+        return min(getattr(self._user.local_vars, "next_expire_time", 0),
+                   getattr(self._user.variables, "next_expire_time", 0))
+
+    def _get_state_data(self):
+        """Forms and variables collected for the previous template are reused until the user state changes.
+
+        Every call gets its own top level copies, values inside them are shared between calls and must not be modified.
+        """
+        versions = self._state_versions()
+        snapshot = self._snapshot
+        if versions is not None and snapshot is not None and snapshot[0] == versions and time.time() < snapshot[1]:
+            forms, local_vars, variables = snapshot[2:]
+        else:
+            forms = self._user.forms.collect_form_fields()
+            local_vars = self._user.local_vars.values
+            variables = self._user.variables.values
+            # expired variables are deleted while collected, so versions are taken after
+            versions = self._state_versions()
+            self._snapshot = (versions, self._valid_until(), forms, local_vars, variables) if versions else None
+        return copy.copy(forms), copy.copy(local_vars), copy.copy(variables)
+
     def _get_user_data(self, text_preprocessing_result=None):
         tpr_data = text_preprocessing_result.raw if text_preprocessing_result else {}
-        forms = self._user.forms.collect_form_fields()
+        forms, local_vars, variables = self._get_state_data()
         main_form = self._get_main_form(forms)
         data = {
             "counters": self._user.counters.raw,
             "forms": forms,
             "gender_sensitive_text": self._user.gender_selector.get_text_by_key,
-            "local_vars": self._user.local_vars.values,
+            "local_vars": local_vars,
             "main_form": main_form,
             "message": self._user.message,
             "payload": self._user.message.payload,
             "scenario_id": self._user.last_scenarios.last_scenario_name,
             "text_preprocessing_result": tpr_data,
             "uuid": self._user.message.uuid,
-            "variables": self._user.variables.values,
+            "variables": variables,
             "settings": self._user.settings
         }
         return data
@@ -0,0 +1,130 @@
+# coding: utf-8
+import importlib
+import json
+import zlib
+from typing import Any, Dict, Optional, Union
+
+from core.model.factory import build_factory
+from core.model.registered import Registered
+
+user_codecs = Registered()
+user_codec_factory = build_factory(user_codecs)
+
+# a json document never starts with a zero byte, so binary users are told apart from the json ones
+MAGIC_PREFIX = b"\x00SAF"
+MAGIC_LENGTH = len(MAGIC_PREFIX) + 1
+
+
+def _non_serializable(obj: Any) -> str:
+    # Attention: non-serializable objects will become str with error message
+    return f"<non-serializable: {type(obj).__qualname__}>"
+
+
+class UserCodec:
+    """Serialization of user values for the db. Binary codecs prefix the data with their MAGIC"""
+    MAGIC: Optional[bytes] = None
+    NAME = None
+
+    def __init__(self, items: Optional[Dict[str, Any]] = None):
+        self.items = items or {}
+
+    def encode(self, values: Dict[str, Any]) -> Union[str, bytes]:
+        raise NotImplementedError
+
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class JsonUserCodec(UserCodec):
+    NAME = "json"
+
+    def encode(self, values: Dict[str, Any]) -> str:
+        return json.dumps(values, default=_non_serializable)
+
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        return json.loads(data)
+
+
+class MsgpackUserCodec(UserCodec):
+    """Unlike json, msgpack keeps int keys of dicts as int"""
+    MAGIC = MAGIC_PREFIX + b"m"
+    NAME = "msgpack"
+
+    def __init__(self, items: Optional[Dict[str, Any]] = None):
+        super().__init__(items)
+        self._msgpack = importlib.import_module("msgpack")
+
+    def encode(self, values: Dict[str, Any]) -> bytes:
+        return self.MAGIC + self._compress(self._msgpack.packb(values, default=_non_serializable, use_bin_type=True))
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return self._msgpack.unpackb(self._decompress(data[MAGIC_LENGTH:]), raw=False, strict_map_key=False)
+
+    def _compress(self, packed: bytes) -> bytes:
+        return packed
+
+    def _decompress(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibMsgpackUserCodec(MsgpackUserCodec):
+    MAGIC = MAGIC_PREFIX + b"z"
+    NAME = "zlib_msgpack"
+
+    def __init__(self, items: Optional[Dict[str, Any]] = None):
+        super().__init__(items)
+        self.level = self.items.get("level", zlib.Z_DEFAULT_COMPRESSION)
+
+    def _compress(self, packed: bytes) -> bytes:
+        return zlib.compress(packed, self.level)
+
+    def _decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdMsgpackUserCodec(MsgpackUserCodec):
+    MAGIC = MAGIC_PREFIX + b"Z"
+    NAME = "zstd_msgpack"
+
+    def __init__(self, items: Optional[Dict[str, Any]] = None):
+        super().__init__(items)
+        zstandard = importlib.import_module("zstandard")
+        self._compressor = zstandard.ZstdCompressor(level=self.items.get("level", 3))
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def _compress(self, packed: bytes) -> bytes:
+        return self._compressor.compress(packed)
+
+    def _decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+BINARY_CODECS = (MsgpackUserCodec, ZlibMsgpackUserCodec, ZstdMsgpackUserCodec)
+_decoders: Dict[bytes, UserCodec] = {}
+
+
+def _get_decoder(magic: bytes) -> UserCodec:
+    decoder = _decoders.get(magic)
+    if decoder is None:
+        codec_classes = [*BINARY_CODECS, *(cls for cls in user_codecs.values() if isinstance(cls, type))]
+        codec_cls = next((cls for cls in codec_classes if cls.MAGIC == magic), None)
+        if codec_cls is None:
+            raise ValueError(f"Unknown user codec magic {magic!r}")
+        decoder = _decoders[magic] = codec_cls()
+    return decoder
+
+
+def decode_user_data(db_data: Union[str, bytes]) -> Dict[str, Any]:
+    """Decodes users of any codec: binary ones are detected by the magic header, the rest is json.
+
+    :raises ValueError: if the data can not be decoded
+    """
+    if isinstance(db_data, (bytearray, memoryview)):
+        db_data = bytes(db_data)
+    if isinstance(db_data, bytes) and db_data.startswith(MAGIC_PREFIX):
+        decoder = _get_decoder(db_data[:MAGIC_LENGTH])
+        try:
+            return decoder.decode(db_data)
+        except Exception as e:
+            raise ValueError(f"Failed to decode user with {decoder.NAME}: {e}") from e
+    return json.loads(db_data)
@@ -1,4 +1,3 @@
-import json
 from functools import cached_property
 
 from core.basic_models.variables.mid_variables import MidVariables
@@ -15,6 +14,7 @@ from scenarios.user.preprocessing_messages.prepricessing_messages_for_scenarios
 from scenarios.scenario_models.history import History
 from scenarios.behaviors.behaviors import Behaviors
 from scenarios.user.reply_selector.reply_selector import ReplySelector
+from scenarios.user.user_codec import decode_user_data
 from core.monitoring.monitoring import monitoring
 import scenarios.logging.logger_constants as log_const
 
@@ -32,7 +32,7 @@ class User(BaseUser):
     def __init__(self, id, message, db_data, settings, descriptions, parametrizer_cls, load_error=False):
         self.settings = settings
         try:
-            user_values = json.loads(db_data) if db_data else None
+            user_values = decode_user_data(db_data) if db_data else None
         except ValueError:
             user_values = None
             monitoring.counter_load_error(settings.app_name)
@@ -44,6 +44,8 @@ class User(BaseUser):
         self.__parametrizer_cls = parametrizer_cls
         self.do_not_save = False
         self.initial_db_data = db_data
+        # version of db_data when loaded by db_adapter.get_with_version
+        self.initial_db_version = None
 
     def _initialize(self):
         db_version = self.private_vars.get(self.USER_DB_VERSION, default=0)
@@ -72,9 +74,9 @@ class User(BaseUser):
 
     def expire(self):
         super().expire()
-        self.behaviors.expire()
-        self.forms.expire()
-        self.last_fields.expire()
-        self.last_scenarios.expire()
-        self.history.expire()
-        self.mid_variables.expire()
+        self.expire_field("behaviors")
+        self.expire_field("forms")
+        self.expire_field("last_fields")
+        self.expire_field("last_scenarios")
+        self.expire_field("history")
+        self.expire_field("mid_variables")
@@ -8,9 +8,10 @@ from aiohttp import ClientTimeout
 import core.logging.logger_constants as log_const
 from core.basic_models.actions.command import Command
 from core.basic_models.actions.string_actions import NodeAction
-from core.logging.logger_utils import log
+from core.logging.logger_utils import lazy, log
 from core.model.base_user import BaseUser
 from core.text_preprocessing.base import BaseTextPreprocessingResult
+from smart_kit.action.http_session_pool import http_session_pool
 
 
 class HTTPRequestAction(NodeAction):
@@ -74,14 +75,13 @@ class HTTPRequestAction(NodeAction):
 
     async def _make_response(self, request_parameters: dict, user: BaseUser):
         try:
-            async with aiohttp.request(**request_parameters) as response:
+            async with http_session_pool.request(**request_parameters) as response:
                 response.raise_for_status()
                 self._log_response(user, response)
                 try:
                     return await response.json()
                 except aiohttp.client_exceptions.ContentTypeError:
-                    return await response.content.read()
-                return None
+                    return await response.read()
         except (aiohttp.ServerTimeoutError, asyncio.TimeoutError):
             self.error = self.TIMEOUT
         except aiohttp.ClientError:
@@ -111,8 +111,8 @@ class HTTPRequestAction(NodeAction):
     def _log_response(self, user, response, additional_params=None):
         additional_params = additional_params or {}
         log(f"{self.__class__.__name__}.run get https response ", user=user, params={
-            'headers': dict(response.headers),
-            'cookie': {k: v.value for k, v in response.cookies.items()},
+            'headers': lazy(lambda: dict(response.headers)),
+            'cookie': lazy(lambda: {k: v.value for k, v in response.cookies.items()}),
             'status': response.status,
             log_const.KEY_NAME: "got_http_response",
             **additional_params,
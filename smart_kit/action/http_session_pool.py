@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import aiohttp
+from aiohttp import ClientResponseError, ContentTypeError
+
+from core.request.async_http_client import AsyncHttpClient, async_http_client
+
+JSON_CONTENT_TYPE = re.compile(r"^application/(?:[\w.+-]+?\+)?json")
+
+
+class BufferedResponse:
+    """Response read in full, so it may be given to every request waiting for it and kept in the cache"""
+
+    def __init__(self, response: aiohttp.ClientResponse, body: bytes):
+        self.method = response.method
+        self.url = response.url
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.cookies = response.cookies
+        self.request_info = response.request_info
+        self.history = response.history
+        self.charset = response.charset
+        self.body = body
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise ClientResponseError(self.request_info, self.history, status=self.status, message=self.reason,
+                                      headers=self.headers)
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def text(self, encoding: Optional[str] = None) -> str:
+        return self.body.decode(encoding or self.charset or "utf-8")
+
+    async def json(self) -> Any:
+        content_type = self.headers.get(aiohttp.hdrs.CONTENT_TYPE, "").lower()
+        if not JSON_CONTENT_TYPE.match(content_type):
+            raise ContentTypeError(self.request_info, self.history, status=self.status,
+                                   message=f"Attempt to decode JSON with unexpected mimetype: {content_type}",
+                                   headers=self.headers)
+        body = self.body.strip()
+        # every caller gets its own objects, the response may be shared
+        return json.loads(body.decode(self.charset or "utf-8")) if body else None
+
+
+class HTTPSessionPool:
+    """Requests of HTTPRequestAction made by the process wide AsyncHttpClient, the response is read in full.
+
+    Identical GET requests in flight are sent once and share the response. With cache_ttl responses
+    of cache_methods are cached for cache_ttl seconds. Requests are identified by method, url and hash
+    of params, headers and body, since headers may authorize different users.
+    """
+
+    DEFAULT_CACHE_SIZE = 1024
+    COALESCED_METHODS = ("GET",)
+
+    def __init__(self, client: AsyncHttpClient = async_http_client):
+        self.client = client
+        self.configure()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: Dict[Tuple[str, ...], asyncio.Task] = {}
+        self._cache: "OrderedDict[Tuple[str, str, str], Tuple[float, BufferedResponse]]" = OrderedDict()
+
+    def configure(self, coalesce: bool = True, cache_ttl: float = 0, cache_size: int = DEFAULT_CACHE_SIZE,
+                  cache_methods=COALESCED_METHODS) -> None:
+        self.coalesce = coalesce
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.cache_methods = {method.upper() for method in cache_methods}
+
+    @staticmethod
+    def _key(method: str, url: str, kwargs: Dict[str, Any]) -> Tuple[str, str, str]:
+        request = {key: value for key, value in kwargs.items() if key != "timeout"}
+        digest = hashlib.sha1(json.dumps(request, sort_keys=True, default=repr).encode()).hexdigest()
+        return method, url, digest
+
+    def _cached(self, key: Tuple[str, str, str]) -> Optional[BufferedResponse]:
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        expire_time, response = cached
+        if expire_time < time.monotonic():
+            del self._cache[key]
+            return None
+        return response
+
+    def _store(self, key: Tuple[str, str, str], response: BufferedResponse) -> None:
+        self._cache[key] = (time.monotonic() + self.cache_ttl, response)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _fetch(self, method: str, url: str, kwargs: Dict[str, Any]) -> BufferedResponse:
+        async with self.client.response(method, url, **kwargs) as response:
+            return BufferedResponse(response, await response.read())
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[BufferedResponse]:
+        """Same as aiohttp.request, the response is read before it is given"""
+        method = method.upper()
+        key = self._key(method, url, kwargs)
+        cacheable = self.cache_ttl > 0 and method in self.cache_methods
+        response = self._cached(key) if cacheable else None
+        if response is None:
+            if self.coalesce and method in self.COALESCED_METHODS:
+                response = await self._coalesced(key, method, url, kwargs)
+            else:
+                response = await self._fetch(method, url, kwargs)
+            if cacheable and response.ok:
+                self._store(key, response)
+        yield response
+
+    async def _coalesced(self, key: Tuple[str, str, str], method: str, url: str,
+                         kwargs: Dict[str, Any]) -> BufferedResponse:
+        # the shared request is sent with the timeout of its first caller, so only callers with the same one join
+        key = key + (repr(kwargs.get("timeout")),)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # requests in flight belong to the loop they are made in
+            self._in_flight = {}
+            self._loop = loop
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(self._fetch(method, url, kwargs))
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # the request is shared, a cancelled caller must not cancel it for others
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Tuple[str, ...], task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # every waiter may have given up before the error
+        if not task.cancelled():
+            task.exception()
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    async def close(self) -> None:
+        """Forgets requests in flight, the client is closed by its owner"""
+        self._in_flight = {}
+        self._loop = None
+
+
+http_session_pool = HTTPSessionPool()
@@ -2,12 +2,14 @@ from smart_kit.management.base import AppCommand
 import os
 
 from core.repositories.file_repository import FileRepository
+from smart_kit.utils.cache import ItemExpired
 
 import json
 
 
 class CreateCacheCommand(AppCommand):
-    """Create cache for normalization results by parsing static"""
+    """Create cache for normalization results by parsing static.
+    With --update only phrases missing in the existing cache are normalized and appended to it."""
 
     def __init__(self, app_config):
         self._normalize_key = "symbols_for_normalize"
@@ -16,13 +18,30 @@ class CreateCacheCommand(AppCommand):
         self.recognizer_client = app_config.NORMALIZER.with_cache(
             app_config,
             cache_lifetime=float("+inf"),
+            writable=True,
             verbose=True
         )
-        self.recognizer_client.cache.clear()
+
+    def _is_cached(self, item):
+        try:
+            self.recognizer_client.cache[item]
+        except (KeyError, ItemExpired):
+            return False
+        return True
 
     def execute(self, *args, **kwargs):
-        self.recognizer_client.normalize_sequence(self.items_for_normalized)
-        self.recognizer_client.cache.save(os.path.join(self.app_config.REFERENCES_PATH, ".normalization_cache.json"))
+        update = "--update" in args
+        items = self.items_for_normalized
+        if update:
+            items = [item for item in items if not self._is_cached(item)]
+        else:
+            self.recognizer_client.cache.clear()
+        try:
+            self.recognizer_client.normalize_sequence(items)
+        finally:
+            self.recognizer_client.close()
+        self.recognizer_client.cache.save(os.path.join(self.app_config.REFERENCES_PATH, ".normalization_cache.json"),
+                                          update=update)
 
     def _collect_items_for_normalized(self, data):
         if hasattr(data, 'items'):
@@ -59,8 +59,9 @@ class SmartAppToMessage:
     @cached_property
     def masked_value(self):
         mask_numbers_flag = settings.Settings()["template_settings"].get("mask_numbers", False)
-        masked_data = mask_numbers(masking(self.as_dict, self.masking_fields)) if mask_numbers_flag else \
-            masking(self.as_dict, self.masking_fields)
+        masked_data = masking(self.as_dict, self.masking_fields, share=True)
+        if mask_numbers_flag:
+            masked_data = mask_numbers(masked_data)
         if self.command.loader == "json.dumps":
             return json.dumps(masked_data, ensure_ascii=False)
 
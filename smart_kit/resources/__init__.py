@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 import core.basic_models.operators.comparators as cmp
 import core.basic_models.operators.operators as op
 import core.basic_models.requirement.device_requirements as dr
@@ -38,6 +41,7 @@ from core.basic_models.requirement.device_requirements import ChannelRequirement
 from core.basic_models.requirement.external_requirements import ExternalRequirement
 from core.basic_models.requirement.external_requirements import ExternalRequirements
 from core.basic_models.requirement.project_requirements import SettingsRequirement
+from core.basic_models.requirement.requirement_compiler import requirement_compiler
 from core.basic_models.requirement.user_text_requirements import AnySubstringInLoweredTextRequirement, \
     IntersectionWithTokensSetRequirement, NormalizedTextInSetRequirement, \
     PhoneNumberNumberRequirement, NumInRangeRequirement
@@ -52,10 +56,13 @@ from core.descriptions.descriptions import registered_description_factories
 from core.model.queued_objects.limited_queued_hashable_objects_description import \
     LimitedQueuedHashableObjectsDescriptionsItems
 from core.model.registered import registered_factories
+from core.model.timers.timer_store import timer_stores, MemoryTimerStore, RedisTimerStore, IgniteTimerStore
 from core.repositories.file_repository import FileRepository
 from core.repositories.folder_repository import FolderRepository
+from core.request.async_http_client import async_http_client
 from core.request.base_request import requests_registered
 from core.request.rest_request import RestRequest
+from core.unified_template.template_environment import template_environment
 from core.utils.loader import ordered_json
 from scenarios.actions.action import (
     BreakScenarioAction, ChoiceScenarioAction, ClearCurrentScenarioAction, ClearCurrentScenarioFormAction,
@@ -91,7 +98,10 @@ from scenarios.scenario_models.scenario_models import scenario_models, scenario_
 from scenarios.user.last_scenarios.last_scenarios_descriptions import LastScenariosDescriptionsItems
 from scenarios.user.preprocessing_messages.preprocessing_messages_description import \
     PreprocessingMessagesDescription
+from scenarios.user.user_codec import user_codecs, JsonUserCodec, MsgpackUserCodec, ZlibMsgpackUserCodec, \
+    ZstdMsgpackUserCodec
 from smart_kit.action.http import HTTPRequestAction
+from smart_kit.action.http_session_pool import http_session_pool
 from smart_kit.action.smart_geo_action import SmartGeoAction
 from smart_kit.message.get_to_message import to_messages
 from smart_kit.message.as_is_to_message import AsIsToMessage
@@ -104,6 +114,7 @@ class SmartAppResources(BaseConfig):
     def __init__(self, source, references_path, settings):
         super(SmartAppResources, self).__init__(source=source)
         self.references_path = references_path
+        self.settings = settings
         self.repositories = [
             FolderRepository(self.subfolder_path("forms"), loader=ordered_json, source=source,
                              key="forms"),
@@ -141,6 +152,10 @@ class SmartAppResources(BaseConfig):
     def _subfolder(self):
         return self.references_path
 
+    @property
+    def template_settings(self) -> dict:
+        return self.settings.get("template_settings", {}) if self.settings is not None else {}
+
     def override_repositories(self, repositories: list):
         """
         Метод предназначен для переопределения репозиториев в дочерних классах.
@@ -151,6 +166,10 @@ class SmartAppResources(BaseConfig):
 
     def init(self):
         super(SmartAppResources, self).init()
+        self.init_template_environment()
+        self.init_requirement_compiler()
+        self.init_async_http_client()
+        self.init_http_session_pool()
         self.init_factories()
         self.init_field_filler_description()
         self.init_scenarios()
@@ -168,6 +187,8 @@ class SmartAppResources(BaseConfig):
         self.init_sdk_items()
         self.init_history_formatters()
         self.init_db_adapters()
+        self.init_timer_stores()
+        self.init_user_codecs()
         self.init_classifiers()
         self.init_message_handlers()
 
@@ -401,6 +422,42 @@ class SmartAppResources(BaseConfig):
         requests_registered["kafka"] = SmartKitKafkaRequest
         requests_registered["rest"] = RestRequest
 
+    def init_template_environment(self):
+        template_environment.set_cache_size(self.template_settings.get("jinja_template_cache_size",
+                                                                       template_environment.DEFAULT_CACHE_SIZE))
+        bytecode_cache = self.template_settings.get("jinja_bytecode_cache", {})
+        if bytecode_cache.get("enabled", False):
+            path = bytecode_cache.get("path") or os.path.join(tempfile.gettempdir(),
+                                                              f"{self.settings.app_name}_jinja_bytecode_cache")
+            template_environment.set_bytecode_cache_path(path)
+
+    def init_requirement_compiler(self):
+        compiler_settings = self.template_settings.get("requirement_compiler", {})
+        requirement_compiler.configure(
+            reorder=compiler_settings.get("reorder_by_cost", False),
+            timing=compiler_settings.get("timing", False),
+            timing_log_interval=compiler_settings.get("timing_log_interval",
+                                                      requirement_compiler.DEFAULT_TIMING_LOG_INTERVAL)
+        )
+
+    def init_async_http_client(self):
+        client_settings = self.template_settings.get("async_http_client", {})
+        async_http_client.configure(
+            limit=client_settings.get("limit", async_http_client.DEFAULT_LIMIT),
+            limit_per_host=client_settings.get("limit_per_host", async_http_client.DEFAULT_LIMIT_PER_HOST),
+            max_concurrency=client_settings.get("max_concurrency", async_http_client.DEFAULT_MAX_CONCURRENCY),
+            ttl_dns_cache=client_settings.get("ttl_dns_cache", async_http_client.DEFAULT_TTL_DNS_CACHE)
+        )
+
+    def init_http_session_pool(self):
+        pool_settings = self.template_settings.get("http_session_pool", {})
+        http_session_pool.configure(
+            coalesce=pool_settings.get("coalesce", True),
+            cache_ttl=pool_settings.get("cache_ttl", 0),
+            cache_size=pool_settings.get("cache_size", http_session_pool.DEFAULT_CACHE_SIZE),
+            cache_methods=pool_settings.get("cache_methods", http_session_pool.COALESCED_METHODS)
+        )
+
     def init_db_adapters(self):
         db_adapters[None] = MemoryAdapter
         db_adapters["ignite"] = IgniteAdapter
@@ -408,6 +465,20 @@ class SmartAppResources(BaseConfig):
         db_adapters["aioredis"] = AIORedisAdapter
         db_adapters["aioredis_sentinel"] = AIORedisSentinelAdapter
 
+    def init_timer_stores(self):
+        timer_stores[None] = MemoryTimerStore
+        timer_stores["memory"] = MemoryTimerStore
+        timer_stores["aioredis"] = RedisTimerStore
+        timer_stores["aioredis_sentinel"] = RedisTimerStore
+        timer_stores["ignite"] = IgniteTimerStore
+
+    def init_user_codecs(self):
+        user_codecs[None] = JsonUserCodec
+        user_codecs["json"] = JsonUserCodec
+        user_codecs["msgpack"] = MsgpackUserCodec
+        user_codecs["zlib_msgpack"] = ZlibMsgpackUserCodec
+        user_codecs["zstd_msgpack"] = ZstdMsgpackUserCodec
+
     def init_classifiers(self):
         classifiers[None] = Classifier
         classifiers["external"] = ExternalClassifier
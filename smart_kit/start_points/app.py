@@ -19,6 +19,9 @@ def run(app_config):
     log("START MODEL CREATE", level="WARNING")
     model = app_config.MODEL(resource, app_config.DIALOGUE_MANAGER, settings)
     log("FINISHED MODEL CREATE", level="WARNING")
+    if app_config.NORMALIZER:
+        # phrases of the loaded resources are normalized, idle normalizer processes are not kept for the app life
+        app_config.NORMALIZER.close()
 
     log("START MAIN_LOOP CREATE", level="WARNING")
     loop = app_config.MAIN_LOOP(
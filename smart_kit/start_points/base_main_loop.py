@@ -5,6 +5,7 @@ import signal
 import scenarios.logging.logger_constants as log_const
 from core.db_adapter.db_adapter import DBAdapterException
 from core.db_adapter.db_adapter import db_adapter_factory
+from core.db_adapter.user_cache import WriteBehindUserCache
 from core.logging.logger_utils import log
 from core.message.from_message import SmartAppFromMessage
 from core.monitoring.monitoring import monitoring
@@ -12,6 +13,7 @@ from core.monitoring.healthcheck_handler import RootResource
 from core.monitoring.twisted_server import TwistedServer
 from core.basic_models.parametrizers.parametrizer import BasicParametrizer
 from core.message.msg_validator import MessageValidator
+from scenarios.user.user_codec import user_codec_factory
 from scenarios.user.user_model import User
 from smart_kit.start_points.postprocess import PostprocessMainLoop
 from smart_kit.models.smartapp_model import SmartAppModel
@@ -54,6 +56,14 @@ class BaseMainLoop:
 
             self.user_save_check_for_collisions = True if save_tries > 0 else False
             self.user_save_collisions_tries = max(save_tries, 1)
+            # collisions are detected by a stored version instead of comparing the whole previous user
+            self.user_save_versioned = template_settings.get("user_save_versioned", False)
+            if self.user_save_versioned:
+                self.loop.run_until_complete(self.db_adapter.enable_versioning())
+            # users are written with the codec, read with any codec detected by the magic header
+            user_codec_settings = template_settings.get("user_codec")
+            self.user_codec = user_codec_factory(user_codec_settings) if user_codec_settings else None
+            self.user_cache = self._create_user_cache(template_settings.get("user_cache", {}))
 
             self.health_check_server = self._create_health_check_server(template_settings)
             self._init_monitoring_config(template_settings)
@@ -75,6 +85,22 @@ class BaseMainLoop:
         self.loop.run_until_complete(db_adapter.connect())
         return db_adapter
 
+    def _create_user_cache(self, config) -> Optional[WriteBehindUserCache]:
+        if not config.get("enabled", False):
+            return None
+        return WriteBehindUserCache(self.db_adapter, self.app_name, config,
+                                    check_for_collisions=self.user_save_check_for_collisions,
+                                    versioned=self.user_save_versioned)
+
+    async def user_cache_flush_coro(self):
+        while self.is_work:
+            await asyncio.sleep(self.user_cache.flush_interval)
+            try:
+                await self.user_cache.flush()
+            except Exception:
+                log("Failed to flush user cache", params={log_const.KEY_NAME: "user_cache_flush_error"},
+                    level="ERROR", exc_info=True)
+
     def _generate_answers(self, user, commands, message, **kwargs):
         raise NotImplementedError
 
@@ -106,15 +132,27 @@ class BaseMainLoop:
         return await self._load_user(db_uid, message)
 
     async def _load_user(self, db_uid: str, message: SmartAppFromMessage) -> User:
+        if self.user_cache is not None:
+            cached = self.user_cache.get(db_uid)
+            if cached is not None:
+                return self.get_user(message, cached.data, load_error=False)
+        db_version = None
         try:
-            db_data = await self.db_adapter.get(db_uid)
+            if self.user_save_versioned:
+                db_data, db_version = await self.db_adapter.get_with_version(db_uid)
+            else:
+                db_data = await self.db_adapter.get(db_uid)
         except (DBAdapterException, ValueError):
             log("Failed to get user data", params={log_const.KEY_NAME: log_const.FAILED_DB_INTERACTION,
                                                    log_const.REQUEST_VALUE: message.as_str}, level="ERROR")
             monitoring.counter_load_error(self.app_name)
             # to skip message when load failed
             raise
-        return self.get_user(message, db_data, load_error=False)
+        if self.user_cache is not None:
+            self.user_cache.loaded(db_uid, db_data, db_version)
+        user = self.get_user(message, db_data, load_error=False)
+        user.initial_db_version = db_version
+        return user
 
     def get_user(self, message: SmartAppFromMessage, db_data: Optional[dict], load_error: bool) -> User:
         return self.user_cls(
@@ -145,13 +183,18 @@ class BaseMainLoop:
 
         no_collisions = True
         try:
-            str_data = user.raw_str
-            if user.initial_db_data and self.user_save_check_for_collisions:
+            db_data = user.raw_str if self.user_codec is None else user.serialize(self.user_codec)
+            if self.user_cache is not None:
+                # this process is the only writer of the user, flushed to db by user_cache_flush_coro
+                self.user_cache.save(db_uid, db_data)
+            elif user.initial_db_version is not None and self.user_save_check_for_collisions:
+                no_collisions = await self.db_adapter.compare_and_set(db_uid, user.initial_db_version, db_data)
+            elif user.initial_db_data and self.user_save_check_for_collisions:
                 no_collisions = await self.db_adapter.replace_if_equals(db_uid,
                                                                         sample=user.initial_db_data,
-                                                                        data=str_data)
+                                                                        data=db_data)
             else:
-                await self.db_adapter.save(db_uid, str_data)
+                await self.db_adapter.save(db_uid, db_data)
         except (DBAdapterException, ValueError):
             log("Failed to set user data", params={log_const.KEY_NAME: log_const.FAILED_DB_INTERACTION,
                                                    log_const.REQUEST_VALUE: message.as_str}, level="ERROR")
@@ -7,11 +7,13 @@ import aiohttp.web
 
 import scenarios.logging.logger_constants as log_const
 from core.db_adapter.db_adapter import DBAdapterException, db_adapter_factory
-from core.logging.logger_utils import log
+from core.logging.logger_utils import lazy, log
 from core.message.from_message import SmartAppFromMessage
 from core.monitoring.monitoring import monitoring
+from core.request.async_http_client import async_http_client
 from core.utils.stats_timer import StatsTimer
 from scenarios.user.user_model import User
+from smart_kit.action.http_session_pool import http_session_pool
 from smart_kit.message.smartapp_to_message import SmartAppToMessage
 from smart_kit.start_points.main_loop_http import BaseHttpMainLoop
 
@@ -23,6 +25,7 @@ class AIOHttpMainLoop(BaseHttpMainLoop):
         self.app.add_routes([aiohttp.web.route('*', '/health', self.get_health_check)])
         self.app.add_routes([aiohttp.web.route('*', '/health_db_adapter', self.get_health_db_adapter_check)])
         self.app.add_routes([aiohttp.web.route('*', '/{tail:.*}', self.iterate)])
+        self.app.on_cleanup.append(self.close_http_clients)
 
     async def async_init(self):
         await self.db_adapter.connect()
@@ -37,6 +40,11 @@ class AIOHttpMainLoop(BaseHttpMainLoop):
         app["database"].cancel()
         await app["database"]
 
+    # noinspection PyMethodMayBeStatic
+    async def close_http_clients(self, app):
+        await async_http_client.close()
+        await http_session_pool.close()
+
     @cached_property
     def masking_fields(self):
         return self.settings["template_settings"].get("masking_fields")
@@ -107,7 +115,7 @@ class AIOHttpMainLoop(BaseHttpMainLoop):
             answer = SmartAppToMessage(
                 self.BAD_REQUEST_COMMAND, message=message, request=None, masking_fields=self.masking_fields)
             code = 400
-            log(f"OUTGOING DATA: {answer.masked_value} with code: {code}",
+            log(lazy(lambda: f"OUTGOING DATA: {answer.masked_value} with code: {code}"),
                 params={log_const.KEY_NAME: "outgoing_policy_message", "msg_id": message.incremental_id})
             return code, "BAD REQUEST", answer
 
@@ -116,7 +124,7 @@ class AIOHttpMainLoop(BaseHttpMainLoop):
             answer = SmartAppToMessage(
                 self.NO_ANSWER_COMMAND, message=message, request=None, masking_fields=self.masking_fields)
             code = 204
-            log(f"OUTGOING DATA: {answer.masked_value} with code: {code}",
+            log(lazy(lambda: f"OUTGOING DATA: {answer.masked_value} with code: {code}"),
                 params={log_const.KEY_NAME: "outgoing_policy_message"}, user=user)
             monitoring.counter_outgoing(self.app_name, answer.command.name, answer.command, user)
             return code, "NO CONTENT", answer
@@ -126,8 +134,8 @@ class AIOHttpMainLoop(BaseHttpMainLoop):
         )
         if answer_message.validate():
             code = 200
-            log_answer = str(answer_message.masked_value).replace("%", "%%")
-            log(f"OUTGOING DATA: {log_answer} with code: {code}",
+            log(lazy(lambda: "OUTGOING DATA: {} with code: {}".format(
+                str(answer_message.masked_value).replace("%", "%%"), code)),
                 params={log_const.KEY_NAME: "outgoing_policy_message"}, user=user)
             monitoring.counter_outgoing(self.app_name, answer_message.command.name, answer_message.command, user)
             return code, "OK", answer_message
@@ -135,7 +143,7 @@ class AIOHttpMainLoop(BaseHttpMainLoop):
             code = 500
             answer = SmartAppToMessage(
                 self.BAD_ANSWER_COMMAND, message=message, request=None, masking_fields=self.masking_fields)
-            log(f"OUTGOING DATA: {answer.masked_value} with code: {code}",
+            log(lazy(lambda: f"OUTGOING DATA: {answer.masked_value} with code: {code}"),
                 params={log_const.KEY_NAME: "outgoing_policy_message"}, user=user)
             monitoring.counter_outgoing(self.app_name, answer.command.name, answer.command, user)
             return code, "BAD ANSWER", answer
@@ -143,7 +151,8 @@ class AIOHttpMainLoop(BaseHttpMainLoop):
     async def process_message(self, message: SmartAppFromMessage, *args, **kwargs):
         stats = ""
         log("INCOMING DATA: %(masked_message)s",
-            params={log_const.KEY_NAME: "incoming_policy_message", "masked_message": message.masked_value})
+            params={log_const.KEY_NAME: "incoming_policy_message",
+                    "masked_message": lazy(lambda: message.masked_value)})
         db_uid = message.db_uid
 
         with StatsTimer() as load_timer:
@@ -7,7 +7,7 @@ from wsgiref.simple_server import make_server
 import scenarios.logging.logger_constants as log_const
 from core.basic_models.actions.command import Command
 from core.configs.global_constants import CALLBACK_ID_HEADER
-from core.logging.logger_utils import log
+from core.logging.logger_utils import lazy, log
 from core.message.from_message import SmartAppFromMessage, basic_error_message
 from core.monitoring.monitoring import monitoring
 from core.utils.stats_timer import StatsTimer
@@ -26,6 +26,10 @@ class BaseHttpMainLoop(BaseMainLoop):
     def run(self):
         raise NotImplementedError
 
+    def _create_user_cache(self, config):
+        # requests of one user are not pinned to one process, cached users would get stale
+        return None
+
     def stop(self, signum, frame):
         raise NotImplementedError
 
@@ -64,7 +68,7 @@ class BaseHttpMainLoop(BaseMainLoop):
         log("INCOMING DATA: %(masked_message)s",
             params={
                 log_const.KEY_NAME: "incoming_policy_message",
-                "masked_message": message.masked_value,
+                "masked_message": lazy(lambda: message.masked_value),
                 "message_id": message.incremental_id,
             })
 
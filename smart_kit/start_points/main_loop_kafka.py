@@ -4,30 +4,32 @@ import asyncio
 import cProfile
 import gc
 import hashlib
-import json
 import os
 import pstats
 import signal
 import time
 import tracemalloc
-from collections import namedtuple
-from functools import lru_cache, cached_property
-from typing import Union, Dict, TYPE_CHECKING
+from functools import lru_cache, cached_property, partial
+from typing import Awaitable, Callable, Union, Dict, List, Optional, Set, TYPE_CHECKING
 from kafka.errors import KafkaError
 
 import scenarios.logging.logger_constants as log_const
 from core.basic_models.actions.command import Command
 from core.configs.global_constants import KAFKA_REPLY_TOPIC
-from core.logging.logger_utils import log, UID_STR, MESSAGE_ID_STR
+from core.logging.logger_utils import lazy, log, UID_STR, MESSAGE_ID_STR
 from core.message.from_message import SmartAppFromMessage
+from core.message.parsed_message import ParsedMessage
 from core.model.base_user import BaseUser
-from core.model.heapq.heapq_storage import HeapqKV
+from core.model.timers.timer_store import (BehaviorTimer, make_timer_message_ref, make_timer_shard,
+                                           timer_store_factory)
 from core.monitoring.monitoring import monitoring
 from core.mq.kafka.kafka_consumer import KafkaConsumer
 from core.mq.kafka.kafka_publisher import KafkaPublisher
+from core.request.async_http_client import async_http_client
 from core.utils.memstats import get_top_malloc
 from core.utils.pickle_copy import pickle_deepcopy
 from core.utils.stats_timer import StatsTimer, Stats
+from smart_kit.action.http_session_pool import http_session_pool
 from smart_kit.compatibility.commands import combine_commands
 from smart_kit.message.get_to_message import get_to_message
 from smart_kit.message.smartapp_to_message import SmartAppToMessage
@@ -64,8 +66,11 @@ class MainLoop(BaseMainLoop):
                                                         "class_name": self.__class__.__name__})
         self.health_check_server_future = None
         super().__init__(*args, **kwargs)
-        self._timers = dict()  # stores aio timers for callbacks
         self.template_settings = self.settings["template_settings"]
+        behavior_timers_settings = self.template_settings.get("behavior_timers", {})
+        self.behavior_timers = timer_store_factory(behavior_timers_settings.get("store", {}), self.db_adapter)
+        self.behavior_timers_poll_interval = behavior_timers_settings.get("poll_interval", 0.1)
+        self.behavior_timers_drain_limit = behavior_timers_settings.get("drain_limit", 100)
         self.profiling_settings = self.template_settings.get("profiling", {})
         self.profile_cpu = self.profiling_settings.get("cpu", False)
         self.profile_cpu_path = self.profiling_settings.get("cpu_path", "/tmp/dp.cpu.prof")
@@ -74,11 +79,18 @@ class MainLoop(BaseMainLoop):
         self.profile_memory_depth = self.profiling_settings.get("memory_depth", 4)
         self.behavior_timers_tear_down_delay = self.template_settings.get("behavior_timers_tear_down_delay", 15)
         self.no_kafka_messages_poll_time = self.template_settings.get("no_kafka_messages_poll_time", 0.01)
+        # batched polling via consumer.getmany: one broker fetch and one event loop wakeup for many records
+        self.kafka_batch_poll = self.template_settings.get("kafka_batch_poll", {})
+        self.kafka_batch_poll_enabled = self.kafka_batch_poll.get("enabled", False)
+        self.kafka_batch_max_records = self.kafka_batch_poll.get("max_records", 100)
+        self.kafka_batch_timeout_ms = self.kafka_batch_poll.get("timeout_ms")
         self.waiting_message_timeout = self.settings["template_settings"].get("waiting_message_timeout", {})
         self.kafka_broker_settings = self.settings["template_settings"].get("route_kafka_broker") or []
         self.warning_delay = self.waiting_message_timeout.get('warning', 200)
         self.skip_delay = self.waiting_message_timeout.get('skip', 8000)
         self.worker_tasks = []
+        # commits of processed messages waiting for their deliveries, workers do not wait for them
+        self.commit_tasks: Set[asyncio.Task] = set()
         self.max_concurrent_messages = self.template_settings.get("max_concurrent_messages", 10)
         if self.max_concurrent_messages < 1:
             raise ValueError(f"max_concurrent_messages must be greater than 0 (actual: {self.max_concurrent_messages})")
@@ -102,6 +114,14 @@ class MainLoop(BaseMainLoop):
                 if config.get("consumer"):
                     self.consumers.update({key: KafkaConsumer(config, self.loop)})
                     self.consumers[key].subscribe()
+                    if self.user_cache is not None:
+                        # offsets are committed when users are flushed, not in the order of messages
+                        self.consumers[key].require_offset_commit_manager()
+                        self.consumers[key].revoke_callbacks.append(self.on_revoke_invalidate_user_cache)
+                    elif not self.consumers[key].autocommit_enabled:
+                        # offsets are committed by background tasks, not in the order of messages
+                        self.consumers[key].require_offset_commit_manager()
+                    self.consumers[key].revoke_callbacks.append(self.on_revoke_wait_commits)
                 if config.get("publisher"):
                     self.publishers.update({key: KafkaPublisher(config, self.loop)})
             log(
@@ -110,9 +130,6 @@ class MainLoop(BaseMainLoop):
             )
 
             self.app_name = self.settings.app_name
-            self.behaviors_timeouts_value_cls = namedtuple('behaviors_timeouts_value',
-                                                           'db_uid, callback_id, mq_message, kafka_key')
-            self.behaviors_timeouts = HeapqKV(value_to_key_func=lambda val: val.callback_id)
             self.concurrent_messages = 0
 
             log("%(class_name)s.__init__ completed.", params={log_const.KEY_NAME: log_const.STARTUP_VALUE,
@@ -144,6 +161,8 @@ class MainLoop(BaseMainLoop):
             self.loop.run_until_complete(self.consumers[kafka_key].close())
         for kafka_key in self.publishers:
             self.loop.run_until_complete(self.publishers[kafka_key].close())
+        self.loop.run_until_complete(async_http_client.close())
+        self.loop.run_until_complete(http_session_pool.close())
         log("%(class_name)s EXIT.", level="WARNING", params={"class_name": self.__class__.__name__})
 
     async def general_coro(self):
@@ -179,25 +198,39 @@ class MainLoop(BaseMainLoop):
         for i, queue in enumerate(self.queues):
             task = asyncio.create_task(self.queue_worker(f'worker-{i}', queue))
             self.worker_tasks.append(task)
+        offsets_commit_task = asyncio.create_task(self.offsets_commit_coro(kafka_key))
+        user_cache_flush_task = None
+        if self.user_cache is not None:
+            user_cache_flush_task = asyncio.create_task(self.user_cache_flush_coro())
+        self.worker_tasks.append(asyncio.create_task(self.behavior_timers_coro(kafka_key)))
 
         await self.poll_kafka(kafka_key, self.queues)
 
         log("waiting for process unfinished tasks in queues")
         await asyncio.gather(*(queue.join() for queue in self.queues))
+        if user_cache_flush_task is not None:
+            user_cache_flush_task.cancel()
+            # users are written before the offsets of their messages are committed
+            await self.user_cache.flush()
+        await self.wait_commits()
+        offsets_commit_task.cancel()
+        await self.consumers[kafka_key].flush_offsets()
 
         time_delta = self.loop.time() - start_time
         log(f"Process Consumer exit: {self.total_messages} msg in {int(time_delta)} sec", level="DEBUG")
 
-        t = self.loop.time()
-        log(f"wait timers to do their jobs for {self.behavior_timers_tear_down_delay} secs...")
-        while self._timers and (self.loop.time() - t) < self.behavior_timers_tear_down_delay:
-            await asyncio.sleep(1)
+        if not self.behavior_timers.IS_DURABLE:
+            t = self.loop.time()
+            log(f"wait timers to do their jobs for {self.behavior_timers_tear_down_delay} secs...")
+            while len(self.behavior_timers) and (self.loop.time() - t) < self.behavior_timers_tear_down_delay:
+                await asyncio.sleep(1)
 
         for task in self.worker_tasks:
             cancell_status = task.cancel()
             log(f"{task} cancell status: {cancell_status} ")
 
-        log(f"Stop consuming messages. All workers closed, erasing {len(self._timers)} timers.")
+        log(f"Stop consuming messages. All workers closed, leaving {len(self.behavior_timers)} timers "
+            f"in {self.behavior_timers.__class__.__name__}.")
 
         if self.profile_memory:
             log(f"{get_top_malloc(trace_limit=16)}")
@@ -209,6 +242,31 @@ class MainLoop(BaseMainLoop):
             stats.print_stats(10)
             stats.dump_stats(filename=self.profile_cpu_path)
 
+    async def offsets_commit_coro(self, kafka_key):
+        offset_commit_manager = self.consumers[kafka_key].offset_commit_manager
+        if offset_commit_manager is None:
+            return
+        while self.is_work:
+            await asyncio.sleep(offset_commit_manager.commit_interval)
+            await self.consumers[kafka_key].flush_offsets(force=False)
+
+    async def on_revoke_invalidate_user_cache(self, partitions):
+        # users of revoked partitions may be processed by another pod from now on
+        await self.user_cache.invalidate()
+
+    async def on_revoke_wait_commits(self, partitions):
+        # processed messages are completed before offsets of revoked partitions are committed
+        await self.wait_commits()
+
+    async def wait_commits(self):
+        if self.commit_tasks:
+            await asyncio.gather(*self.commit_tasks, return_exceptions=True)
+
+    def _commit_in_background(self, commit: Callable[[], Awaitable[None]]) -> None:
+        task = asyncio.ensure_future(commit())
+        self.commit_tasks.add(task)
+        task.add_done_callback(self.commit_tasks.discard)
+
     async def queue_worker(self, worker_id, queue):
         message_value = None
         last_poll_begin_time = self.loop.time()
@@ -280,14 +338,17 @@ class MainLoop(BaseMainLoop):
             try:
                 with StatsTimer() as poll_timer:
                     # Max delay between polls configured in consumer.poll_timeout param
-                    mq_message = await consumer.poll()
+                    mq_messages = await self._poll_messages(consumer)
                 log_params["kafka_polling"] = poll_timer.msecs
                 if poll_timer.msecs > self.MAX_LOG_TIME:  # TODO align with new async interface
                     log("Long poll time: %(kafka_polling)s msecs\n", params=log_params, level="WARNING")
-                if mq_message:
-                    kwargs = {"kafka_key": kafka_key,
-                              "mq_message": mq_message}
-                    not_empty_queues_count = await self.put_to_queue(mq_message, self.do_incoming_handling, kwargs)
+                if mq_messages:
+                    log_params["kafka_batch_size"] = len(mq_messages)
+                    executables = [
+                        (mq_message, self.do_incoming_handling, {"kafka_key": kafka_key, "mq_message": mq_message})
+                        for mq_message in mq_messages
+                    ]
+                    not_empty_queues_count = await self.put_many_to_queue(executables)
                     log(f"Poll time: %(kafka_polling)s msecs\n, not_empty_queues count: {not_empty_queues_count}.",
                         params=log_params, level="INFO")
                 else:
@@ -300,19 +361,36 @@ class MainLoop(BaseMainLoop):
 
         log("Stop poll_kafka consumer.")
 
-    async def put_to_queue(self, mq_message, executable, kwargs):
+    async def _poll_messages(self, consumer: KafkaConsumer) -> List[ConsumerRecord]:
+        if self.kafka_batch_poll_enabled:
+            return [mq_message async for mq_message in consumer.consume(self.kafka_batch_max_records,
+                                                                        self.kafka_batch_timeout_ms)
+                    if mq_message]
+        mq_message = await consumer.poll()
+        return [mq_message] if mq_message else []
+
+    def _get_queue_index(self, mq_message: ConsumerRecord) -> int:
         key = mq_message.key
         if key:
-            queue_index = int(hashlib.sha256(key).hexdigest(), 16) % len(self.queues)
-        else:
-            queue_index = (len(self.queues) - 1)
+            return int(hashlib.sha256(key).hexdigest(), 16) % len(self.queues)
+        return len(self.queues) - 1
 
-        self.queues[queue_index].put_nowait((executable, kwargs))
+    async def _yield_to_workers(self) -> int:
         not_empty_cnt = sum(1 for queue in self.queues if not queue.empty())
         for _ in range(not_empty_cnt):
             await asyncio.sleep(0)
         return not_empty_cnt
 
+    async def put_to_queue(self, mq_message, executable, kwargs):
+        self.queues[self._get_queue_index(mq_message)].put_nowait((executable, kwargs))
+        return await self._yield_to_workers()
+
+    async def put_many_to_queue(self, executables):
+        """Fan out a polled batch to the worker queues in one pass, keeping per-key order"""
+        for mq_message, executable, kwargs in executables:
+            self.queues[self._get_queue_index(mq_message)].put_nowait((executable, kwargs))
+        return await self._yield_to_workers()
+
     async def do_incoming_handling(self, kwargs, worker_kwargs):
         mq_message, kafka_key = kwargs.get("mq_message"), kwargs.get("kafka_key")
         stats = worker_kwargs.get("stats")
@@ -412,7 +490,7 @@ class MainLoop(BaseMainLoop):
                     log_const.KEY_NAME: "waiting_message_timeout",
                     "waiting_message_time": waiting_message_time,
                     "mid": message.incremental_id,
-                    log_const.REQUEST_VALUE: message.masked_value,
+                    log_const.REQUEST_VALUE: lazy(lambda: message.masked_value),
                 },
                 level=log_level)
         return make_break
@@ -426,9 +504,12 @@ class MainLoop(BaseMainLoop):
         user = None
         db_uid = None
         message = None
+        # deliveries of answers not acked by the broker yet
+        deliveries = []
+        parsed_message = ParsedMessage(mq_message.value)
         while save_tries < self.user_save_collisions_tries and not user_save_no_collisions:
             save_tries += 1
-            message_value = json.loads(mq_message.value.decode())
+            message_value = parsed_message.value()
             message = SmartAppFromMessage(message_value,
                                           headers=mq_message.headers,
                                           masking_fields=self.masking_fields,
@@ -471,8 +552,10 @@ class MainLoop(BaseMainLoop):
                         level="WARNING")
                     if self.settings["template_settings"].get("wrong_key_resend", True):
                         dest_topic = mq_message.topic
-                        await self.publishers[kafka_key].send_to_topic(mq_message.value, valid_key, dest_topic,
-                                                                       mq_message.headers)
+                        delivery = await self.publishers[kafka_key].send_to_topic(mq_message.value, valid_key,
+                                                                                  dest_topic, mq_message.headers)
+                        if delivery is not None:
+                            deliveries.append(delivery)
                         skip_message = True
                         log("Kafka message %(message_name)s with invalid Kafka message key %(message_key)s "
                             f"resend again with a valid key: '{valid_key}' to '{dest_topic}'",
@@ -496,8 +579,8 @@ class MainLoop(BaseMainLoop):
                                 "message_key": (mq_message.key or b"").decode('utf-8', 'backslashreplace'),
                                 "message_id": message.incremental_id,
                                 "kafka_key": kafka_key,
-                                "incoming_data": str(message.masked_value),
-                                "length": len(message.as_str),
+                                "incoming_data": lazy(lambda: str(message.masked_value)),
+                                "length": lazy(lambda: len(parsed_message.as_str)),
                                 "headers": mq_message.headers,
                                 "waiting_message": waiting_message_time,
                                 "surface": message.device.surface,
@@ -548,10 +631,12 @@ class MainLoop(BaseMainLoop):
                         continue
 
                     if answers:
-                        self.save_behavior_timeouts(user, mq_message, kafka_key)
+                        await self.save_behavior_timeouts(user, mq_message, kafka_key)
                         for answer in answers:
                             with StatsTimer() as publish_timer:
-                                await self._send_request(user, answer, mq_message)
+                                delivery = await self._send_request(user, answer, mq_message)
+                            if delivery is not None:
+                                deliveries.append(delivery)
                             stats += "Publishing time: {} msecs\n".format(publish_timer.msecs)
                             log(stats, user=user)
             else:
@@ -579,10 +664,21 @@ class MainLoop(BaseMainLoop):
                 level="WARNING")
             await self.postprocessor.postprocess(user, message)
             monitoring.counter_save_collision_tries_left(self.app_name)
-        await consumer.commit_offset(mq_message)
+        commit = partial(self._commit_after_delivery, consumer, mq_message, deliveries)
+        # with the user cache the message is done when its user is written to db
+        if self.user_cache is None or db_uid is None or not self.user_cache.after_flush(db_uid, commit):
+            # the worker takes the next message while the deliveries are awaited
+            self._commit_in_background(commit)
 
         if user and message and message.callback_id:
-            self.remove_timer(message)
+            await self.remove_timer(message)
+
+    @staticmethod
+    async def _commit_after_delivery(consumer, mq_message: ConsumerRecord, deliveries: List[asyncio.Future]):
+        if deliveries:
+            # failed deliveries are logged by the publisher, the message is committed as after a worker exception
+            await asyncio.gather(*deliveries, return_exceptions=True)
+        await consumer.commit_offset(mq_message)
 
     def _get_valid_message_key(self, from_message: SmartAppFromMessage):
         return "_".join([i for i in [from_message.channel, from_message.sub, from_message.uid] if i])
@@ -601,7 +697,8 @@ class MainLoop(BaseMainLoop):
 
         return message_key
 
-    async def _send_request(self, user: BaseUser, answer: SmartAppToMessage, mq_message: ConsumerRecord):
+    async def _send_request(self, user: BaseUser, answer: SmartAppToMessage,
+                            mq_message: ConsumerRecord) -> Optional[asyncio.Future]:
         kafka_broker_settings = self.settings["template_settings"].get(
             "route_kafka_broker"
         ) or []
@@ -621,15 +718,18 @@ class MainLoop(BaseMainLoop):
         request_params["payload"] = answer.value
         request_params["masked_value"] = answer.masked_value
         monitoring.counter_outgoing(self.app_name, answer.command.name, answer.command, user)
-        await request.run(answer.value.encode(), request_params)
+        # rest requests are run without blocking the loop, only kafka requests give a delivery to wait for
+        run = getattr(request, "run_async", request.run)
+        delivery = await run(answer.value.encode(), request_params)
         self._log_request(user, request, answer, mq_message)
+        return delivery if isinstance(delivery, asyncio.Future) else None
 
     def _log_request(self, user, request, answer, original_mq_message):
         log("OUTGOING TO TOPIC_KEY: %(topic_key)s DATA: %(data)s",
             params={log_const.KEY_NAME: "outgoing_message",
                     "topic_key": request.topic_key,
-                    "headers": request._get_new_headers(original_mq_message),
-                    "data": answer.masked_value,
+                    "headers": lazy(request._get_new_headers, original_mq_message),
+                    "data": lazy(lambda: answer.masked_value),
                     "length": len(answer.value),
                     "message_key": (original_mq_message.key or b"").decode('utf-8', 'backslashreplace')},
             user=user)
@@ -646,13 +746,14 @@ class MainLoop(BaseMainLoop):
     def masking_fields(self):
         return self.settings["template_settings"].get("masking_fields")
 
-    def save_behavior_timeouts(self, user, mq_message: ConsumerRecord, kafka_key):
+    async def save_behavior_timeouts(self, user, mq_message: ConsumerRecord, kafka_key):
+        message_ref = None
         for i, (expire_time_us, callback_id) in enumerate(user.behaviors.get_behavior_timeouts()):
-            if callback_id in self._timers:
+            if callback_id in self.behavior_timers:
                 continue
-            # TODO: remove "- time()" when framework will be modified to asyncio only
             # если колбеков много, разносим их на 1 секунду друг от друга во избежание коллизий
-            when = expire_time_us - time.time() + i
+            due_time = expire_time_us + i
+            when = due_time - time.time()
             log(f"%(class_name)s: adding local_timeout on callback %({log_const.BEHAVIOR_CALLBACK_ID_VALUE})s"
                 " with timeout in %(when)s seconds.",
                 params={log_const.KEY_NAME: "adding_local_timeout",
@@ -661,14 +762,43 @@ class MainLoop(BaseMainLoop):
                         "when": when,
                         MESSAGE_ID_STR: user.message.incremental_id})
 
-            kwargs = {"kafka_key": kafka_key,
-                      "mq_message": mq_message,
-                      "callback_id": callback_id,
-                      "db_uid": user.message.db_uid}
+            # the timer keeps a reference to the original record, its value is stored once for all its timers
+            message_ref = message_ref or make_timer_message_ref(mq_message)
+            await self.behavior_timers.add(BehaviorTimer(
+                due_time=due_time, db_uid=user.message.db_uid, callback_id=callback_id, kafka_key=kafka_key,
+                shard=make_timer_shard(mq_message.topic, mq_message.partition), message_ref=message_ref
+            ), mq_message.value)
 
-            self._timers[callback_id] = self.loop.call_later(
-                when, self.loop.create_task, self.put_to_queue(mq_message, self.do_behavior_timeout, kwargs)
-            )
+    async def behavior_timers_coro(self, kafka_key):
+        consumer = self.consumers[kafka_key]
+        while True:
+            try:
+                shards = [make_timer_shard(tp.topic, tp.partition) for tp in consumer.assignment()]
+                timers = await self.behavior_timers.pop_due(time.time(), shards=shards,
+                                                            limit=self.behavior_timers_drain_limit)
+                for timer in timers:
+                    mq_message = await self.behavior_timers.get_message(timer)
+                    if mq_message is None:
+                        log("%(class_name)s: message of behavior timer %(callback_id)s is lost",
+                            params={log_const.KEY_NAME: "behavior_timers_error",
+                                    "class_name": self.__class__.__name__,
+                                    "callback_id": timer.callback_id},
+                            level="ERROR")
+                        await self._complete_timer(timer)
+                        continue
+                    kwargs = {"kafka_key": timer.kafka_key,
+                              "mq_message": mq_message,
+                              "callback_id": timer.callback_id,
+                              "db_uid": timer.db_uid,
+                              "timer": timer}
+                    await self.put_to_queue(mq_message, self.do_behavior_timeout, kwargs)
+            except Exception:
+                log("%(class_name)s behavior timers drain error. Kafka key %(kafka_key)s",
+                    params={log_const.KEY_NAME: "behavior_timers_error",
+                            "class_name": self.__class__.__name__,
+                            "kafka_key": kafka_key},
+                    level="ERROR", exc_info=True)
+            await asyncio.sleep(self.behavior_timers_poll_interval)
 
     async def do_behavior_timeout(self, kwargs, worker_kwargs):
         self.concurrent_messages += 1
@@ -682,10 +812,11 @@ class MainLoop(BaseMainLoop):
             user = None
             timeout_from_message = None
             callback_found = True
+            parsed_message = ParsedMessage(mq_message.value)
             while save_tries < self.user_save_collisions_tries and not user_save_ok:
                 callback_found = False
                 save_tries += 1
-                orig_message_raw = json.loads(mq_message.value.decode())
+                orig_message_raw = parsed_message.value()
                 orig_message_raw[SmartAppFromMessage.MESSAGE_NAME] = message_names.LOCAL_TIMEOUT
                 timeout_from_message = self._get_timeout_from_message(orig_message_raw, callback_id,
                                                                       headers=mq_message.headers)
@@ -722,7 +853,7 @@ class MainLoop(BaseMainLoop):
                 else:
                     break
 
-            self.remove_timer(timeout_from_message)
+            await self.remove_timer(timeout_from_message)
 
             if not user_save_ok and callback_found:
                 log("MainLoop.do_behavior_timeout: db_save collision all tries left on uid %(uid)s db_version "
@@ -739,7 +870,7 @@ class MainLoop(BaseMainLoop):
                 monitoring.counter_save_collision_tries_left(self.app_name)
 
             if user_save_ok:
-                self.save_behavior_timeouts(user, mq_message, kafka_key)
+                await self.save_behavior_timeouts(user, mq_message, kafka_key)
                 for answer in answers:
                     await self._send_request(user, answer, mq_message)
         except Exception:
@@ -749,14 +880,26 @@ class MainLoop(BaseMainLoop):
                 level="ERROR", exc_info=True)
         finally:
             self.concurrent_messages -= 1
+            await self._complete_timer(kwargs.get("timer"))
+
+    async def _complete_timer(self, timer: Optional[BehaviorTimer]):
+        # a claimed timer is leased until its timeout is handled, it is claimed again if the pod dies before
+        if timer is None:
+            return
+        try:
+            await self.behavior_timers.complete(timer)
+        except Exception:
+            log("%(class_name)s failed to complete behavior timer %(callback_id)s",
+                params={log_const.KEY_NAME: "behavior_timers_error",
+                        "class_name": self.__class__.__name__,
+                        "callback_id": timer.callback_id},
+                level="ERROR", exc_info=True)
 
-    def remove_timer(self, kafka_message):
+    async def remove_timer(self, kafka_message):
         if kafka_message and kafka_message.has_callback_id:
-            timer = self._timers.pop(kafka_message.callback_id, None)
-            if timer is not None:
-                log(f"Removing aio timer for callback {kafka_message.callback_id}. Have {len(self._timers)} running "
-                    f"timers.", level="DEBUG")
-                timer.cancel()
+            if await self.behavior_timers.remove(kafka_message.callback_id):
+                log(f"Removing behavior timer for callback {kafka_message.callback_id}. "
+                    f"Have {len(self.behavior_timers)} local running timers.", level="DEBUG")
 
     def stop(self, signum, frame):
         log("Stop signal handler!")
@@ -789,7 +932,7 @@ class MainLoop(BaseMainLoop):
 
     def _stats_for_outgoing(self, user: User):
         for time_left, callback_id in user.behaviors.get_behavior_timeouts():
-            if callback_id in self._timers:
+            if callback_id in self.behavior_timers:
                 continue
             callback = user.behaviors._callbacks.get(callback_id)
             if callback and not callback.action_params.get("stats_off"):
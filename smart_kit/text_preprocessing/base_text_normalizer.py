@@ -19,5 +19,8 @@ class BaseTextNormalizer:
     def normalize_sequence(self, texts: Sequence, batch_size) -> List:
         raise NotImplementedError
 
+    def close(self) -> None:
+        pass
+
     def __call__(self, text: str):
         raise NotImplementedError
@@ -31,14 +31,14 @@ class HttpTextNormalizer(BaseTextNormalizer):
         self.cache = self.CACHE(cache_lifetime)
 
     @classmethod
-    def with_cache(cls, app_config, **kwargs):
+    def with_cache(cls, app_config, writable=False, **kwargs):
         cache_impl = app_config.NORMALIZATION_CACHE
         cls.CACHE = cache_impl
         params = {"url": app_config.NORMALIZER_ADDRESS, "cache_lifetime": app_config.NORMALIZATION_CACHE_TTL}
         params.update(kwargs)
         inst = cls(**params)
         try:
-            inst.cache.load(os.path.join(app_config.REFERENCES_PATH, ".normalization_cache.json"))
+            inst.cache.load(os.path.join(app_config.REFERENCES_PATH, ".normalization_cache.json"), writable=writable)
         except FileNotFoundError:
             pass
         return inst
@@ -1,5 +1,7 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 from functools import cached_property
-from typing import List, Sequence
+from typing import Iterator, List, Optional, Sequence
 
 import nltk
 from rusenttokenize import ru_sent_tokenize
@@ -17,16 +19,34 @@ from smart_kit.text_preprocessing.utils import unmerge_numbers_and_letters, merg
     CurrencyTokensOneIterationMerger, reverse_json_dict, return_lemmas_only, Singleton
 
 
+# the normalizer whose pool is running, worker processes inherit it loaded from the parent on fork
+_pool_normalizer: Optional["LocalTextNormalizer"] = None
+
+
+def _normalize_chunk(texts: Sequence) -> List:
+    # runs in a worker process: without a forked normalizer the shared one is loaded on first call
+    normalizer = _pool_normalizer or LocalTextNormalizer()
+    return [normalizer(text) for text in texts]
+
+
 class LocalTextNormalizer(BaseTextNormalizer, metaclass=Singleton):
     """
     Упрощённая предобработка, соответствующая первым шагам платформенной
     Разбиение на слова, замена числительных и валют, морфология. Извлечение сущностей отсутствует
     При вызове нужно передавать параметр message_type="voice" или ="text" - для голоса и текста разный пайплайн
+    При workers > 1 длинные списки в normalize_sequence нормализуются пачками по chunk_size в пуле процессов,
+    простаивающий пул останавливается методом close, например после загрузки ресурсов
     """
 
-    def __init__(self):
+    DEFAULT_CHUNK_SIZE = 64
+
+    def __init__(self, workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE):
         self.__ready_to_use = False
         self._morph = None
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.cache = None
+        self._executor: Optional[ProcessPoolExecutor] = None
 
     @cached_property
     def morph(self):
@@ -100,9 +120,26 @@ class LocalTextNormalizer(BaseTextNormalizer, metaclass=Singleton):
             "Currency": CurrencyTokensOneIterationMerger(),
             "Grammemes": self.morph,
         }
+        self.morph.warm_up(self._cached_tokens(app_config))
 
         self.__ready_to_use = True
 
+    @staticmethod
+    def _cached_tokens(app_config) -> Iterator[str]:
+        """Токены результатов нормализации из кэша, созданного командой cache"""
+        references_path = getattr(app_config, "REFERENCES_PATH", None)
+        if not isinstance(references_path, str):
+            return
+        cache = app_config.NORMALIZATION_CACHE(float("+inf"))
+        try:
+            cache.load(os.path.join(references_path, ".normalization_cache.json"))
+        except FileNotFoundError:
+            return
+        for result in cache.values():
+            for token in result.get("tokenized_elements_list", []):
+                if token.get("text"):
+                    yield token["text"]
+
     def load_everything(self):
         if not self.__ready_to_use:
             self.__load_everything()
@@ -126,11 +163,53 @@ class LocalTextNormalizer(BaseTextNormalizer, metaclass=Singleton):
         }
 
     @classmethod
-    def with_cache(cls, app_config, **kwargs):
-        return cls()
+    def with_cache(cls, app_config, cache_lifetime=None, workers=None, writable=False, **kwargs):
+        """
+        Нормализатор для пакетной нормализации, результаты которой сохраняются в кэш.
+        По умолчанию нормализует во всех ядрах. С writable кэш сразу открывается на запись, как в команде cache.
+        Возвращает отдельный экземпляр, общий нормализатор приложения не меняется.
+        """
+        inst = cls.__new__(cls)
+        inst.__init__()
+        if cache_lifetime is None:
+            cache_lifetime = app_config.NORMALIZATION_CACHE_TTL
+        inst.cache = app_config.NORMALIZATION_CACHE(cache_lifetime)
+        try:
+            inst.cache.load(os.path.join(app_config.REFERENCES_PATH, ".normalization_cache.json"), writable=writable)
+        except FileNotFoundError:
+            pass
+        inst.workers = workers or os.cpu_count() or 1
+        return inst
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # workers forked after loading share the loaded dictionaries instead of loading their own
+            global _pool_normalizer
+            self.load_everything()
+            _pool_normalizer = self
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self) -> None:
+        """Останавливает процессы пула, при следующей параллельной нормализации пул создаётся заново"""
+        global _pool_normalizer
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if _pool_normalizer is self:
+            _pool_normalizer = None
 
     def normalize_sequence(self, texts: Sequence, batch_size=None) -> List:
-        normalized_texts = []
-        for text in texts:
-            normalized_texts.append(self(text))
+        chunk_size = batch_size or self.chunk_size
+        if self.workers > 1 and len(texts) > chunk_size:
+            chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+            normalized_texts = [result for chunk in self._get_executor().map(_normalize_chunk, chunks)
+                                for result in chunk]
+        else:
+            normalized_texts = []
+            for text in texts:
+                normalized_texts.append(self(text))
+        if self.cache is not None:
+            for text, normalized_text in zip(texts, normalized_texts):
+                self.cache[text] = normalized_text
         return normalized_texts
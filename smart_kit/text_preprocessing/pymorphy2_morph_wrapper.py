@@ -1,5 +1,11 @@
 import re
+from collections import Counter, OrderedDict
+from typing import Iterable, List, Optional
+
 import pymorphy2
+from pymorphy2.analyzer import Parse
+
+from core.monitoring.monitoring import monitoring
 from core.text_preprocessing.grammem.grammem_constants import GRAMMEM_INFO, PART_OF_SPEECH, LEMMA, TEXT, TOKEN_TYPE, \
     LIST_OF_TOKEN_TYPES_DATA, TOKEN_VALUE, VALUE, RAW_GRAM_INFO, OTHER, TRANSITIVITY, ANIMACY, ASPECT
 
@@ -30,13 +36,62 @@ class Pymorphy2MorphWrapper:
     Класс предназначен для получения граммемной информации о токенах.
     """
 
-    def __init__(self):
+    DEFAULT_CACHE_SIZE = 50000
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
         self.pymorphy_analyzer = pymorphy2.MorphAnalyzer()
         self.latin = re.compile("^[0-9]*[A-Za-z]+[0-9]*$")
         self.cyrillic = re.compile("[А-Яа-яЁе]+")
+        self.cache_size = cache_size
+        self._parse_cache: OrderedDict[str, List[Parse]] = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        requests = self.cache_hits + self.cache_misses
+        return self.cache_hits / requests if requests else 0.0
+
+    def parse(self, word: str) -> List[Parse]:
+        """
+        Разборы слова из LRU-кэша, общего для процесса.
+        Разбор pymorphy2 зависит только от самого слова, поэтому ключ кэша - слово.
+        Доля попаданий: morph_cache_hit / (morph_cache_hit + morph_cache_miss)
+        """
+        hypotheses = self._parse_cache.get(word)
+        if hypotheses is not None:
+            self._parse_cache.move_to_end(word)
+            self.cache_hits += 1
+            monitoring.got_counter("morph_cache_hit")
+            return hypotheses
+        self.cache_misses += 1
+        monitoring.got_counter("morph_cache_miss")
+        hypotheses = self._cache_parse(word)
+        return hypotheses
+
+    def _cache_parse(self, word: str) -> List[Parse]:
+        hypotheses = self._parse_cache[word] = self.pymorphy_analyzer.parse(word)
+        if len(self._parse_cache) > self.cache_size:
+            self._parse_cache.popitem(last=False)
+        return hypotheses
+
+    def warm_up(self, words: Iterable[str], limit: Optional[int] = None) -> int:
+        """
+        Заполнить кэш самыми частыми словами
+        :param words: слова, например, токены закэшированных результатов нормализации
+        :param limit: сколько слов разобрать, по умолчанию - размер кэша
+        :return: количество разобранных слов
+        """
+        limit = min(limit or self.cache_size, self.cache_size)
+        most_common = [word for word, _ in Counter(words).most_common(limit)]
+        # the most frequent words are put last to be evicted last
+        for word in reversed(most_common):
+            if word not in self._parse_cache:
+                self._cache_parse(word)
+        return len(most_common)
 
     def _choose_pymorphy_form(self, word, lemma, pos):
-        hypotheses = self.pymorphy_analyzer.parse(word)
+        hypotheses = self.parse(word)
         hyp = None
         tags_to_add = {}
         other = ""
@@ -104,7 +159,7 @@ class Pymorphy2MorphWrapper:
         :return: Список из словарей, обогащенный морфологической информацией
         """
         raw_token_list = [token[TEXT] for token in token_desc_list]
-        analyze_result = [self.pymorphy_analyzer.parse(word)[0] for word in raw_token_list]
+        analyze_result = [self.parse(word)[0] for word in raw_token_list]
 
         res = []
         for i in range(len(token_desc_list)):
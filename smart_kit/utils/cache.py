@@ -1,5 +1,13 @@
+import hashlib
+import os
+import sqlite3
 import time
 import json
+import urllib.parse
+from typing import Dict, Iterator, Optional, Tuple
+
+import core.logging.logger_constants as log_const
+from core.logging.logger_utils import log
 
 
 class ItemExpired(Exception):
@@ -36,9 +44,13 @@ class Cache:
     def clear(self):
         self.storage.clear()
 
+    def values(self) -> Iterator:
+        for _, value in self.storage.values():
+            yield value
+
 
 class JSONCache(Cache):  # Pathetic Non OOP Design, Sorry
-    def load(self, path):
+    def load(self, path, writable=False):
         with open(path) as file:
             self.storage = json.load(file)
 
@@ -51,3 +63,150 @@ class JSONCache(Cache):  # Pathetic Non OOP Design, Sorry
         self.invalidate()
         with open(path, "w+", encoding='utf-8') as file:
             json.dump(self.storage, file, ensure_ascii=False)
+
+
+class SQLiteCache(Cache):
+    """Cache in a sqlite database next to the path given to load and save, keyed by hash of the phrase.
+
+    Values are read from the database on demand, so processes share one file through the OS page cache instead of
+    holding their own copies, and memory does not grow with the size of the cache. Every process opens its own
+    connection, also after fork. A database loaded by serving processes is opened read only, items they write are
+    kept in memory, at most MEMORY_SIZE of them. A database loaded with writable, e.g. by the cache command, or
+    saved once is written in batches and on save and is created if missing, its items are never forgotten.
+    With read_only the database is never written.
+    """
+
+    SUFFIX = ".sqlite"
+    WRITE_BATCH_SIZE = 512
+    MEMORY_SIZE = 10000
+
+    def __init__(self, lifetime: float = 0, read_only: bool = False):
+        super().__init__(lifetime)
+        self.read_only = read_only
+        self.path: Optional[str] = None
+        self._writable = False
+        # a writer keeps every item until it is written, serving processes keep at most MEMORY_SIZE of them
+        self._writer = False
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        self._pending: Dict[bytes, Tuple[float, str]] = {}
+
+    @classmethod
+    def db_path(cls, path: str) -> str:
+        return os.path.splitext(path)[0] + cls.SUFFIX
+
+    @staticmethod
+    def _key(item) -> bytes:
+        return hashlib.sha1(str(item).encode()).digest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._connection is None or self._connection_pid != os.getpid():
+            if self._writable:
+                self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                                   check_same_thread=False)
+                self._connection.execute("CREATE TABLE IF NOT EXISTS cache "
+                                         "(key BLOB PRIMARY KEY, create_time REAL, value TEXT)")
+            else:
+                uri = "file:" + urllib.parse.quote(os.path.abspath(self.path)) + "?mode=ro"
+                self._connection = sqlite3.connect(uri, uri=True, timeout=30, isolation_level=None,
+                                                   check_same_thread=False)
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def _write(self, sql: str, parameters=()) -> bool:
+        if not self._writable:
+            return False
+        try:
+            connection = self._connect()
+            with connection:
+                connection.execute("BEGIN")
+                if isinstance(parameters, list):
+                    connection.executemany(sql, parameters)
+                else:
+                    connection.execute(sql, parameters)
+        except sqlite3.Error:
+            # read only file system or a database locked by another writer, the cache keeps working in memory
+            log("SQLiteCache: failed to write %(path)s, the cache is read only from now on",
+                params={log_const.KEY_NAME: "sqlite_cache_write_error", "path": self.path},
+                level="ERROR", exc_info=True)
+            self._writable = False
+            self._connection = None
+            return False
+        return True
+
+    def __getitem__(self, item):
+        key = self._key(item)
+        row = self._pending.get(key)
+        if row is None:
+            try:
+                connection = self._connect()
+                if connection is not None:
+                    row = connection.execute("SELECT create_time, value FROM cache WHERE key = ?",
+                                             (key,)).fetchone()
+            except sqlite3.Error:
+                # e.g. a database not saved yet, a miss is normalized again
+                row = None
+            if row is None:
+                raise KeyError(item)
+        create_time, value = row
+        if create_time + self.lifetime <= time.time():
+            raise ItemExpired
+        return json.loads(value)
+
+    def __setitem__(self, key, value):
+        key = self._key(key)
+        self._pending.pop(key, None)
+        self._pending[key] = time.time(), json.dumps(value, ensure_ascii=False)
+        if self._writable and len(self._pending) >= self.WRITE_BATCH_SIZE:
+            self._flush()
+        elif not self._writer and len(self._pending) > self.MEMORY_SIZE:
+            # the oldest item is forgotten
+            del self._pending[next(iter(self._pending))]
+
+    def _flush(self):
+        if not self._pending:
+            return
+        if self._write("INSERT OR REPLACE INTO cache (key, create_time, value) VALUES (?, ?, ?)",
+                       [(key, create_time, value) for key, (create_time, value) in self._pending.items()]):
+            self._pending.clear()
+
+    def load(self, path, writable=False):
+        """Opens the database read only or, with writable, for writing and creates it if missing"""
+        path = self.db_path(path)
+        writable = writable and not self.read_only
+        if not writable and not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self._writable = self._writer = writable
+        self._connection = None
+        self._connect()
+
+    def save(self, path, update=True):
+        """Appends written items to the database, clear() empties it"""
+        path = self.db_path(path)
+        if path != self.path or not self._writable:
+            self.path = path
+            self._writable = self._writer = not self.read_only
+            self._connection = None
+        self._flush()
+        self.invalidate()
+
+    def invalidate(self):
+        now = time.time()
+        for key in [key for key, (create_time, _) in self._pending.items() if create_time + self.lifetime <= now]:
+            del self._pending[key]
+        self._write("DELETE FROM cache WHERE create_time + ? <= ?", (self.lifetime, now))
+
+    def clear(self):
+        self._pending.clear()
+        self._write("DELETE FROM cache")
+
+    def values(self) -> Iterator:
+        self._flush()
+        yield from (json.loads(value) for _, value in self._pending.values())
+        connection = self._connect()
+        if connection is not None:
+            for (value,) in connection.execute("SELECT value FROM cache"):
+                yield json.loads(value)
@@ -582,7 +582,7 @@ class ActionTest(unittest.IsolatedAsyncioTestCase):
             __aexit__=AsyncMock()
         )
 
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_push_authentication_action_http_call(self, request_mock: Mock):
         user = Mock(
             parametrizer=Mock(collect=lambda *args, **kwargs: {}),
@@ -627,7 +627,7 @@ class ActionTest(unittest.IsolatedAsyncioTestCase):
             method='POST', timeout=ClientTimeout(total=4), json=request_body_parameters,
         )
 
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_push_action_http_call_with_apprequest_lite_type_request(self, request_mock: Mock):
         user = Mock(
             parametrizer=Mock(collect=lambda *args, **kwargs: {}),
@@ -701,7 +701,7 @@ class ActionTest(unittest.IsolatedAsyncioTestCase):
             method='POST', timeout=ClientTimeout(total=4), json=request_body_parameters,
         )
 
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_push_action_http_call_with_apprequest_type_request(self, request_mock: Mock):
         user = Mock(
             parametrizer=Mock(collect=lambda *args, **kwargs: {}),
@@ -26,7 +26,7 @@ class SmartPayActionTest(unittest.IsolatedAsyncioTestCase):
         }
 
     @patch("smart_kit.configs.settings.Settings")
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_create(self, request_mock: PicklableMock, settings_mock: MagicMock):
         items = {
             "behavior": "my_behavior",
@@ -153,7 +153,7 @@ class SmartPayActionTest(unittest.IsolatedAsyncioTestCase):
         self.user.variables.set.assert_called_with("smartpay_create_answer", {'data': 'value'})
 
     @patch("smart_kit.configs.settings.Settings")
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_perform(self, request_mock: PicklableMock, settings_mock: MagicMock):
         items = {
             "behavior": "my_behavior",
@@ -194,7 +194,7 @@ class SmartPayActionTest(unittest.IsolatedAsyncioTestCase):
         self.user.variables.set.assert_called_with("smartpay_perform_answer", {'data': 'value'})
 
     @patch("smart_kit.configs.settings.Settings")
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_get_status(self, request_mock: PicklableMock, settings_mock: MagicMock):
         items = {
             "behavior": "my_behavior",
@@ -214,7 +214,7 @@ class SmartPayActionTest(unittest.IsolatedAsyncioTestCase):
         self.user.variables.set.assert_called_with("smartpay_get_status_answer", {'data': 'value'})
 
     @patch("smart_kit.configs.settings.Settings")
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_partial_confirm(self, request_mock: PicklableMock, settings_mock: MagicMock):
         items = {
             "behavior": "my_behavior",
@@ -254,7 +254,7 @@ class SmartPayActionTest(unittest.IsolatedAsyncioTestCase):
         self.user.variables.set.assert_called_with("smartpay_confirm_answer", {'data': 'value'})
 
     @patch("smart_kit.configs.settings.Settings")
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_full_confirm(self, request_mock: PicklableMock, settings_mock: MagicMock):
         items = {
             "behavior": "my_behavior",
@@ -271,7 +271,7 @@ class SmartPayActionTest(unittest.IsolatedAsyncioTestCase):
         self.user.variables.set.assert_called_with("smartpay_confirm_answer", {'data': 'value'})
 
     @patch("smart_kit.configs.settings.Settings")
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_delete(self, request_mock: PicklableMock, settings_mock: MagicMock):
         items = {
             "behavior": "my_behavior",
@@ -288,7 +288,7 @@ class SmartPayActionTest(unittest.IsolatedAsyncioTestCase):
         self.user.variables.set.assert_called_with("smartpay_delete_answer", {'data': 'value'})
 
     @patch("smart_kit.configs.settings.Settings")
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_partial_refund(self, request_mock: PicklableMock, settings_mock: MagicMock):
         items = {
             "behavior": "my_behavior",
@@ -326,7 +326,7 @@ class SmartPayActionTest(unittest.IsolatedAsyncioTestCase):
         self.user.variables.set.assert_called_with("smartpay_refund_answer", {'data': 'value'})
 
     @patch("smart_kit.configs.settings.Settings")
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_full_refund(self, request_mock: PicklableMock, settings_mock: MagicMock):
         items = {
             "behavior": "my_behavior",
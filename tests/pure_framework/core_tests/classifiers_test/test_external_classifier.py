@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from core.basic_models.classifiers.basic_classifiers import ExternalClassifier, SkipClassifier
+
+
+class SlowClassifier(SkipClassifier):
+    def find_best_answer(self, text_preprocessing_result, mask=None, scenario_classifiers=None):
+        time.sleep(0.2)
+        return super().find_best_answer(text_preprocessing_result, mask, scenario_classifiers)
+
+
+class BlockedClassifier(SkipClassifier):
+    def __init__(self, settings, id=None):
+        super().__init__(settings, id)
+        self.release = threading.Event()
+
+    def find_best_answer(self, text_preprocessing_result, mask=None, scenario_classifiers=None):
+        self.release.wait(1)
+        return super().find_best_answer(text_preprocessing_result, mask, scenario_classifiers)
+
+
+class SlowAsyncClassifier(SkipClassifier):
+    async def find_best_answer_async(self, text_preprocessing_result, mask=None, scenario_classifiers=None):
+        await asyncio.sleep(1)
+        return super().find_best_answer(text_preprocessing_result, mask, scenario_classifiers)
+
+
+class ExternalClassifierAsyncTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.classifier = ExternalClassifier({"type": "external", "classifier": "slow", "timeout": 0.05})
+
+    async def test_sync_classifier_timeout(self):
+        scenario_classifiers = {"slow": SlowClassifier({"type": "skip", "intents": ["a"]})}
+        start = time.monotonic()
+        result = await self.classifier.find_best_answer_async(None, scenario_classifiers=scenario_classifiers)
+        self.assertEqual(result, [])
+        self.assertLess(time.monotonic() - start, 0.2)
+
+    async def test_async_classifier_timeout(self):
+        scenario_classifiers = {"slow": SlowAsyncClassifier({"type": "skip", "intents": ["a"]})}
+        result = await self.classifier.find_best_answer_async(None, scenario_classifiers=scenario_classifiers)
+        self.assertEqual(result, [])
+
+    async def test_answer_in_time(self):
+        classifier = ExternalClassifier({"type": "external", "classifier": "skip"})
+        scenario_classifiers = {"skip": SkipClassifier({"type": "skip", "intents": ["a"]})}
+        result = await classifier.find_best_answer_async(None, scenario_classifiers=scenario_classifiers)
+        self.assertEqual(result, SkipClassifier({"type": "skip", "intents": ["a"]}).find_best_answer(None))
+
+    async def test_abandoned_call_is_counted(self):
+        blocked = BlockedClassifier({"type": "skip", "intents": ["a"]})
+        with patch("core.monitoring.monitoring.monitoring") as monitoring:
+            result = await self.classifier.find_best_answer_async(None, scenario_classifiers={"slow": blocked})
+        self.assertEqual(result, [])
+        monitoring.got_counter.assert_called_once_with(ExternalClassifier.ABANDONED_COUNTER)
+        self.assertEqual(ExternalClassifier.abandoned_calls(), 1)
+        blocked.release.set()
+        await asyncio.sleep(0.05)
+        self.assertEqual(ExternalClassifier.abandoned_calls(), 0)
+
+
+class ExternalClassifierTest(unittest.TestCase):
+    def test_answer_in_time(self):
+        classifier = ExternalClassifier({"type": "external", "classifier": "skip"})
+        scenario_classifiers = {"skip": SkipClassifier({"type": "skip", "intents": ["a"]})}
+        result = classifier.find_best_answer(None, scenario_classifiers=scenario_classifiers)
+        self.assertEqual(result, SkipClassifier({"type": "skip", "intents": ["a"]}).find_best_answer(None))
+
+    def test_timeout_outside_main_thread(self):
+        classifier = ExternalClassifier({"type": "external", "classifier": "slow", "timeout": 0.05})
+        blocked = BlockedClassifier({"type": "skip", "intents": ["a"]})
+        results = []
+        thread = threading.Thread(target=lambda: results.append(
+            classifier.find_best_answer(None, scenario_classifiers={"slow": blocked})))
+        with patch("core.monitoring.monitoring.monitoring"):
+            thread.start()
+            thread.join(1)
+        blocked.release.set()
+        self.assertEqual(results, [[]])
+
+    def test_saturated_pool_fails_fast(self):
+        classifier = ExternalClassifier({"type": "external", "classifier": "slow", "timeout": 0.05})
+        blocked = BlockedClassifier({"type": "skip", "intents": ["a"]})
+        scenario_classifiers = {"slow": blocked}
+        with patch("core.monitoring.monitoring.monitoring") as monitoring, \
+                patch.object(ExternalClassifier, "MAX_ABANDONED_CALLS", 2):
+            for _ in range(2):
+                self.assertEqual(classifier.find_best_answer(None, scenario_classifiers=scenario_classifiers), [])
+            self.assertEqual(ExternalClassifier.abandoned_calls(), 2)
+            start = time.monotonic()
+            self.assertEqual(classifier.find_best_answer(None, scenario_classifiers=scenario_classifiers), [])
+            self.assertLess(time.monotonic() - start, 0.05)
+            monitoring.got_counter.assert_called_with(ExternalClassifier.REJECTED_COUNTER)
+            blocked.release.set()
+            for _ in range(20):
+                if not ExternalClassifier.abandoned_calls():
+                    break
+                time.sleep(0.01)
+            skip = {"slow": SkipClassifier({"type": "skip", "intents": ["a"]})}
+            self.assertEqual(classifier.find_best_answer(None, scenario_classifiers=skip),
+                             SkipClassifier({"type": "skip", "intents": ["a"]}).find_best_answer(None))
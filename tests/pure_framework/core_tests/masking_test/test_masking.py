@@ -1,7 +1,7 @@
 import copy
 from unittest import TestCase
 
-from core.utils.masking_message import masking
+from core.utils.masking_message import compile_masking, masking
 
 
 class MaskingTest(TestCase):
@@ -134,3 +134,31 @@ class MaskingTest(TestCase):
         expected = {"masked": ["***", "***", "***"]}
         masked_message = masking(input_message, masking_fields={"masked": 2})
         self.assertEqual(expected, masked_message)
+
+    def test_input_is_not_changed(self):
+        input_message = {"set": {12}, "tuple": (1, 2), "token": ("a", "b"), "message": ["1234567890123456"]}
+        expected = {"set": [12], "tuple": [1, 2], "token": "*items-2*collections-0*maxdepth-1*",
+                    "message": ["************3456"]}
+        masked_message = masking(input_message)
+        self.assertEqual(expected, masked_message)
+        self.assertEqual({"set": {12}, "tuple": (1, 2), "token": ("a", "b"), "message": ["1234567890123456"]},
+                         input_message)
+
+    def test_share(self):
+        input_message = {"payload": {"items": [{"text": "a"}], "token": "123"}, "uuid": {"userId": "1"}}
+        masked_message = masking(input_message, share=True)
+        self.assertEqual({"payload": {"items": [{"text": "a"}], "token": "***"}, "uuid": {"userId": "1"}},
+                         masked_message)
+        self.assertIs(input_message["uuid"], masked_message["uuid"])
+        self.assertIs(input_message["payload"]["items"], masked_message["payload"]["items"])
+        self.assertIsNot(input_message["payload"], masked_message["payload"])
+        # без share копируются все коллекции
+        self.assertIsNot(input_message["uuid"], masking(input_message)["uuid"])
+
+        input_message = {"a": [{"b": 1}]}
+        self.assertIs(input_message, masking(input_message, share=True))
+
+    def test_compile_masking(self):
+        self.assertIs(compile_masking(["a"]), compile_masking(["a"]))
+        self.assertIsNot(compile_masking(["a"]), compile_masking(["a"], depth_level=1))
+        self.assertEqual({"a": "***", "b": 1}, compile_masking({"a": 0}).apply({"a": 1, "b": 1}))
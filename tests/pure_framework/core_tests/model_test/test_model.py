@@ -7,9 +7,16 @@ from core.model.model import Model
 
 
 class MockField():
+    built = 0
+
     def __init__(self, value, description, *args):
+        MockField.built += 1
         self.value = value
         self.descr = description
+        self.expired = False
+
+    def expire(self):
+        self.expired = True
 
     @property
     def raw(self):
@@ -23,11 +30,12 @@ class MockField():
 class MockModel(Model):
     @property
     def fields(self):
-        return [Field("field1", MockField, "field1_descr")]
+        return [Field("field1", MockField, "field1_descr"), Field("field2", MockField, "field2_descr")]
 
 
 class ModelTest(unittest.TestCase):
     def setUp(self):
+        MockField.built = 0
         self.model = MockModel(values={"field1": "field1_data"}, user=None)
 
     def test_get_field(self):
@@ -45,3 +53,24 @@ class ModelTest(unittest.TestCase):
     def test_raw(self):
         raw = self.model.raw
         assert raw == dict(field1="field1_data")
+
+    def test_fields_are_built_on_access(self):
+        self.assertEqual(MockField.built, 0)
+        self.assertFalse(self.model.is_field_built("field1"))
+        field1 = self.model.field1
+        self.assertIs(self.model.field1, field1)
+        self.assertTrue(self.model.is_field_built("field1"))
+        self.assertEqual(MockField.built, 1)
+
+    def test_raw_of_built_field(self):
+        self.model.field1.value = "changed"
+        self.model.field2.value = "field2_data"
+        self.assertEqual(self.model.raw, dict(field1="changed", field2="field2_data"))
+
+    def test_expire_field(self):
+        field1 = self.model.field1
+        self.model.expire_field("field1")
+        self.model.expire_field("field2")
+        self.assertTrue(field1.expired)
+        self.assertEqual(MockField.built, 1)
+        self.assertTrue(self.model.field2.expired)
@@ -0,0 +1,177 @@
+# coding: utf-8
+import base64
+import unittest
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+from core.model.timers.timer_store import BehaviorTimer, IgniteTimerStore, MemoryTimerStore, RedisTimerStore, \
+    TimerMessage, make_timer_message_ref, make_timer_shard, timer_from_json, timer_to_json
+
+VALUE = b'{"messageName": "MESSAGE_TO_SKILL"}'
+
+
+def make_timer(callback_id, due_time, partition=0):
+    mq_message = Mock(topic="topic", partition=partition, offset=7, key=b"key", value=VALUE,
+                      headers=[("kafka_replyTopic", b"reply")])
+    return BehaviorTimer(due_time=due_time, db_uid="db_uid", callback_id=callback_id, kafka_key="main",
+                         shard=make_timer_shard("topic", partition), message_ref=make_timer_message_ref(mq_message))
+
+
+class MemoryTimerStoreTest(unittest.IsolatedAsyncioTestCase):
+    async def test_pop_due_in_due_time_order(self):
+        store = MemoryTimerStore()
+        for callback_id, due_time in [("c", 30), ("a", 10), ("b", 20)]:
+            await store.add(make_timer(callback_id, due_time), VALUE)
+        self.assertIn("a", store)
+        self.assertEqual(len(store), 3)
+        timers = await store.pop_due(now=25)
+        self.assertEqual([timer.callback_id for timer in timers], ["a", "b"])
+        await store.complete(timers[0])
+        self.assertNotIn("a", store)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(await store.pop_due(now=25), [])
+
+    async def test_pop_due_limit(self):
+        store = MemoryTimerStore()
+        for i in range(5):
+            await store.add(make_timer(str(i), i), VALUE)
+        self.assertEqual(len(await store.pop_due(now=10, limit=2)), 2)
+        self.assertEqual(len(await store.pop_due(now=10)), 3)
+
+    async def test_removed_timer_is_not_popped(self):
+        store = MemoryTimerStore()
+        await store.add(make_timer("a", 10), VALUE)
+        self.assertTrue(await store.remove("a"))
+        self.assertFalse(await store.remove("a"))
+        self.assertEqual(await store.pop_due(now=20), [])
+
+    async def test_readded_timer_uses_last_due_time(self):
+        store = MemoryTimerStore()
+        await store.add(make_timer("a", 10), VALUE)
+        await store.remove("a")
+        await store.add(make_timer("a", 30), VALUE)
+        self.assertEqual(await store.pop_due(now=20), [])
+        timers = await store.pop_due(now=40)
+        self.assertEqual([timer.due_time for timer in timers], [30])
+
+    async def test_message_is_kept_until_last_timer_is_handled(self):
+        store = MemoryTimerStore()
+        await store.add(make_timer("a", 10), VALUE)
+        await store.add(make_timer("b", 20), VALUE)
+        self.assertEqual(len(store._messages), 1)
+        [timer] = await store.pop_due(now=15)
+        self.assertEqual(await store.get_message(timer),
+                         TimerMessage(topic="topic", partition=0, offset=7, key=b"key", value=VALUE,
+                                      headers=[("kafka_replyTopic", b"reply")]))
+        await store.complete(timer)
+        self.assertEqual(len(store._messages), 1)
+        self.assertTrue(await store.remove("b"))
+        self.assertEqual(store._messages, {})
+
+    async def test_claimed_timer_is_not_added_again(self):
+        store = MemoryTimerStore()
+        await store.add(make_timer("a", 10), VALUE)
+        [timer] = await store.pop_due(now=20)
+        self.assertIn("a", store)
+        await store.complete(timer)
+        self.assertNotIn("a", store)
+
+
+class RedisTimerStoreTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.timer = make_timer("a", 10)
+        self.redis = Mock(get=AsyncMock(return_value=timer_to_json(self.timer)), zrem=AsyncMock(),
+                          delete=AsyncMock())
+        self.claim_script, self.remove_script, self.complete_script = \
+            AsyncMock(return_value=[b"a"]), AsyncMock(return_value=1), AsyncMock(return_value=1)
+        self.redis.register_script.side_effect = [self.claim_script, self.remove_script, self.complete_script]
+        self.keys = ["behavior_timers:shard:topic:0", "behavior_timers:timer:a",
+                     "behavior_timers:message_timers:topic:0:7", "behavior_timers:message:topic:0:7"]
+        self.store = RedisTimerStore({"lease": 30}, Mock(get_redis=AsyncMock(return_value=self.redis)))
+
+    async def test_claim_leases_timer(self):
+        timers = await self.store.pop_due(now=20, shards=["topic:0"])
+        self.assertEqual(timers, [self.timer])
+        self.claim_script.assert_awaited_once_with(keys=["behavior_timers:shard:topic:0"], args=[20, 50, 100])
+        await self.store.complete(timers[0])
+        self.complete_script.assert_awaited_once_with(keys=self.keys, args=["a", 50])
+
+    async def test_timer_claimed_again_is_not_handled_twice(self):
+        self.assertEqual(len(await self.store.pop_due(now=20, shards=["topic:0"])), 1)
+        self.assertEqual(await self.store.pop_due(now=60, shards=["topic:0"]), [])
+        await self.store.complete(self.timer)
+        self.complete_script.assert_awaited_once_with(keys=self.keys, args=["a", 90])
+
+    async def test_remove_releases_message(self):
+        self.redis.getdel = AsyncMock(return_value=timer_to_json(self.timer))
+        self.assertTrue(await self.store.remove("a"))
+        self.remove_script.assert_awaited_once_with(keys=self.keys, args=["a"])
+
+    async def test_removed_timer_is_dropped_from_shard(self):
+        self.redis.get.return_value = None
+        self.assertEqual(await self.store.pop_due(now=20, shards=["topic:0"]), [])
+        self.redis.zrem.assert_awaited_once_with("behavior_timers:shard:topic:0", "a")
+
+
+class IgniteTimerStoreTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.timer = make_timer("a", 10)
+        self.queries = []
+        self.results = {"SELECT callback_id": [["a", 10.0, timer_to_json(self.timer)]], "SELECT COUNT": [[0]],
+                        "UPDATE": [[1]], "DELETE": [[1]]}
+        client = Mock()
+        client.sql.side_effect = self.sql
+        db_adapter = Mock(get_client=AsyncMock(return_value=client), cache_name="users")
+        self.store = IgniteTimerStore({"lease": 30}, db_adapter)
+
+    def sql(self, query, query_args):
+        self.queries.append((query, query_args))
+        rows = next((rows for prefix, rows in self.results.items() if query.startswith(prefix)), [])
+
+        async def iterate():
+            for row in rows:
+                yield row
+
+        cursor = MagicMock()
+        cursor.__aenter__.return_value = iterate()
+        return cursor
+
+    async def test_due_timers_are_selected_by_index_and_leased(self):
+        timers = await self.store.pop_due(now=20, shards=["topic:0", "topic:1"])
+        self.assertEqual(timers, [self.timer])
+        create_table, create_index, _, create_messages_table, select, update = self.queries
+        self.assertIn("cache_name=users_behavior_timers", create_table[0])
+        self.assertIn("(shard, due_time)", create_index[0])
+        self.assertIn("cache_name=users_behavior_timers_messages", create_messages_table[0])
+        self.assertIn("shard IN (?, ?) AND due_time <= ? ORDER BY due_time", select[0])
+        self.assertEqual(select[1], ["topic:0", "topic:1", 20, 100])
+        self.assertEqual(update[1], [50, "a", 10.0])
+        await self.store.complete(timers[0])
+        complete, count, delete_message = self.queries[-3:]
+        self.assertEqual(complete[1], ["a", 50])
+        self.assertEqual(count[1], ["topic:0:7"])
+        self.assertTrue(delete_message[0].startswith("DELETE FROM behavior_timers_messages"))
+
+    async def test_message_is_stored_once_per_record(self):
+        self.results["SELECT value"] = [[base64.b64encode(VALUE).decode()]]
+        await self.store.add(self.timer, VALUE)
+        timer, message = self.queries[-2:]
+        self.assertEqual(timer[1][3], "topic:0:7")
+        self.assertNotIn(base64.b64encode(VALUE).decode(), timer[1][4])
+        self.assertEqual(message[1], ["topic:0:7", base64.b64encode(VALUE).decode()])
+        self.assertEqual((await self.store.get_message(self.timer)).value, VALUE)
+
+    async def test_timer_claimed_by_another_pod(self):
+        self.results["UPDATE"] = [[0]]
+        self.assertEqual(await self.store.pop_due(now=20, shards=["topic:0"]), [])
+        await self.store.complete(self.timer)
+        self.assertFalse(self.queries[-1][0].startswith("DELETE"))
+
+
+class TimerSerializationTest(unittest.TestCase):
+    def test_json_round_trip(self):
+        timer = make_timer("a", 10.5, partition=3)
+        restored = timer_from_json(timer_to_json(timer))
+        self.assertEqual(restored, timer)
+        self.assertEqual(restored.shard, "topic:3")
+        self.assertEqual(restored.message_ref.offset, 7)
+        self.assertNotIn("value", timer_to_json(timer))
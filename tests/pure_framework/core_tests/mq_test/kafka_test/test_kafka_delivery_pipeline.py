@@ -0,0 +1,94 @@
+# coding: utf-8
+import asyncio
+import unittest
+from unittest.mock import Mock
+
+from kafka.errors import KafkaTimeoutError
+
+from core.mq.kafka.kafka_delivery_pipeline import KafkaDeliveryPipeline
+
+
+class InMemoryProducer:
+    """Stand-in for AIOKafkaProducer: acks are resolved by the test"""
+
+    def __init__(self, errors=()):
+        self.acks = []
+        self.errors = list(errors)
+
+    async def send(self, topic, value, key=None, headers=None):
+        ack = asyncio.get_running_loop().create_future()
+        self.acks.append(ack)
+        return ack
+
+    def resolve_all(self):
+        for ack in self.acks:
+            if not ack.done():
+                if self.errors:
+                    ack.set_exception(self.errors.pop(0))
+                else:
+                    ack.set_result("record_metadata")
+
+
+class KafkaDeliveryPipelineTest(unittest.IsolatedAsyncioTestCase):
+    async def test_send_does_not_wait_for_ack(self):
+        producer = InMemoryProducer()
+        on_delivery = Mock()
+        pipeline = KafkaDeliveryPipeline(producer, on_delivery=on_delivery)
+        deliveries = [await pipeline.send("topic", f"answer_{i}".encode()) for i in range(3)]
+        self.assertEqual(len(producer.acks), 3)
+        self.assertEqual(pipeline.in_flight_count, 3)
+        self.assertFalse(any(delivery.done() for delivery in deliveries))
+        producer.resolve_all()
+        await pipeline.flush()
+        self.assertEqual([delivery.result() for delivery in deliveries], ["record_metadata"] * 3)
+        self.assertEqual(pipeline.in_flight_count, 0)
+        self.assertEqual(on_delivery.call_count, 3)
+
+    async def test_failed_delivery_is_retried(self):
+        producer = InMemoryProducer(errors=[KafkaTimeoutError()])
+        pipeline = KafkaDeliveryPipeline(producer, retries=1)
+        delivery = await pipeline.send("topic", b"answer")
+        producer.resolve_all()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.assertEqual(len(producer.acks), 2)
+        producer.resolve_all()
+        await pipeline.flush()
+        self.assertEqual(delivery.result(), "record_metadata")
+
+    async def test_delivery_error_is_reported(self):
+        error = KafkaTimeoutError()
+        producer = InMemoryProducer(errors=[error])
+        on_delivery = Mock()
+        pipeline = KafkaDeliveryPipeline(producer, on_delivery=on_delivery)
+        delivery = await pipeline.send("topic", b"answer")
+        producer.resolve_all()
+        await pipeline.flush()
+        self.assertIs(delivery.exception(), error)
+        on_delivery.assert_called_once_with(error, b"answer")
+
+    async def test_close_waits_for_retries(self):
+        producer = InMemoryProducer(errors=[KafkaTimeoutError()])
+        pipeline = KafkaDeliveryPipeline(producer, retries=1)
+        delivery = await pipeline.send("topic", b"answer")
+        producer.resolve_all()
+        await asyncio.sleep(0)
+        self.assertEqual(len(pipeline._retries), 1)
+        await asyncio.sleep(0)
+        producer.resolve_all()
+        await asyncio.wait_for(pipeline.close(), 1)
+        self.assertEqual(delivery.result(), "record_metadata")
+        self.assertEqual(len(pipeline._retries), 0)
+
+    async def test_cancelled_retry_fails_delivery(self):
+        producer = InMemoryProducer(errors=[KafkaTimeoutError()])
+        on_delivery = Mock()
+        pipeline = KafkaDeliveryPipeline(producer, retries=1, on_delivery=on_delivery)
+        delivery = await pipeline.send("topic", b"answer")
+        producer.resolve_all()
+        await asyncio.sleep(0)
+        for task in pipeline._retries:
+            task.cancel()
+        await asyncio.wait_for(pipeline.close(), 1)
+        self.assertIsInstance(delivery.exception(), asyncio.CancelledError)
+        on_delivery.assert_called_once()
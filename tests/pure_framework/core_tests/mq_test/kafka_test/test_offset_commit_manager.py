@@ -0,0 +1,116 @@
+# coding: utf-8
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+from aiokafka import TopicPartition
+
+from core.mq.kafka.offset_commit_manager import OffsetCommitManager
+
+
+def record(offset, partition=0, topic="topic"):
+    return Mock(topic=topic, partition=partition, offset=offset)
+
+
+class OffsetCommitManagerTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.commit = AsyncMock()
+        self.manager = OffsetCommitManager(commit=self.commit, commit_interval=3600, commit_count=3)
+        self.tp = TopicPartition("topic", 0)
+
+    async def test_out_of_order_completion_commits_contiguous_offset(self):
+        records = [record(offset) for offset in range(10, 15)]
+        for msg in records:
+            self.manager.track(msg)
+        self.manager.complete(records[1])
+        self.manager.complete(records[2])
+        self.assertEqual(self.manager.committable(), {})
+        self.manager.complete(records[0])
+        self.assertEqual(self.manager.committable(), {self.tp: 13})
+        self.manager.complete(records[4])
+        self.assertEqual(self.manager.committable(), {self.tp: 13})
+
+    async def test_commit_by_count(self):
+        records = [record(offset) for offset in range(4)]
+        for msg in records:
+            self.manager.track(msg)
+        for msg in records[:2]:
+            self.manager.complete(msg)
+            await self.manager.maybe_commit()
+        self.commit.assert_not_called()
+        self.manager.complete(records[2])
+        await self.manager.maybe_commit()
+        self.commit.assert_awaited_once_with({self.tp: 3})
+        await self.manager.flush()
+        self.commit.assert_awaited_once()
+
+    async def test_commit_by_interval(self):
+        manager = OffsetCommitManager(commit=self.commit, commit_interval=0, commit_count=1000)
+        msg = record(0)
+        manager.track(msg)
+        await manager.maybe_commit()
+        self.commit.assert_not_called()
+        manager.complete(msg)
+        await manager.maybe_commit()
+        self.commit.assert_awaited_once_with({self.tp: 1})
+
+    async def test_failed_commit_is_retried(self):
+        self.commit.side_effect = [RuntimeError, None]
+        msg = record(5)
+        self.manager.track(msg)
+        self.manager.complete(msg)
+        with self.assertRaises(RuntimeError):
+            await self.manager.flush()
+        await self.manager.flush()
+        self.assertEqual(self.commit.await_count, 2)
+        self.assertEqual(self.manager.committable(), {})
+
+    async def test_revoke_flushes_and_forgets_partition(self):
+        other_tp = TopicPartition("topic", 1)
+        first, second, late = record(0), record(7, partition=1), record(1)
+        for msg in (first, late, second):
+            self.manager.track(msg)
+        self.manager.complete(first)
+        self.manager.complete(second)
+        await self.manager.revoke([self.tp])
+        self.commit.assert_awaited_once_with({self.tp: 1})
+        self.manager.complete(late)
+        self.assertEqual(self.manager.committable(), {other_tp: 8})
+
+    async def test_concurrent_flushes_are_serialized(self):
+        records = [record(offset) for offset in range(3)]
+        for msg in records:
+            self.manager.track(msg)
+        release = asyncio.Event()
+        calls = []
+        committed = []
+
+        async def commit(offsets):
+            calls.append(offsets)
+            if len(calls) == 1:
+                await release.wait()
+            committed.append(dict(offsets))
+
+        self.manager._commit = commit
+        self.manager.complete(records[0])
+        first = asyncio.ensure_future(self.manager.flush())
+        await asyncio.sleep(0)
+        self.manager.complete(records[1])
+        self.manager.complete(records[2])
+        second = asyncio.ensure_future(self.manager.flush())
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, second)
+        self.assertEqual(committed, [{self.tp: 1}, {self.tp: 3}])
+        self.assertEqual(self.manager._partitions[self.tp].committed_offset, 3)
+
+    async def test_committed_offset_never_moves_back(self):
+        msg = record(5)
+        self.manager.track(msg)
+        self.manager.complete(msg)
+        partition = self.manager._partitions[self.tp]
+        partition.committed_offset = 10
+        self.assertEqual(self.manager.committable(), {})
+        await self.manager.flush()
+        self.commit.assert_not_called()
+        self.assertEqual(partition.committed_offset, 10)
@@ -0,0 +1,53 @@
+import json
+from unittest import TestCase
+from unittest.mock import patch
+
+from core.message.from_message import SmartAppFromMessage
+from core.message.parsed_message import ParsedMessage
+
+
+@patch("smart_kit.configs.settings.Settings", return_value={"template_settings": {}})
+class TestParsedMessage(TestCase):
+    def setUp(self):
+        self.value = {
+            "messageId": 1,
+            "messageName": "MESSAGE_TO_SKILL",
+            "uuid": {"userChannel": "B2C", "userId": "userId"},
+            "payload": {"device": {"surface": "SBOL"}, "app_info": {"projectId": "project"}, "token": "secret"},
+            "sessionId": "session",
+        }
+        self.raw = json.dumps(self.value, ensure_ascii=False).encode()
+
+    def test_value_is_parsed_once(self, settings_mock):
+        parsed = ParsedMessage(self.raw)
+        with patch("core.message.parsed_message.json.loads", wraps=json.loads) as loads:
+            first = parsed.value()
+            self.assertEqual(first, self.value)
+            self.assertEqual(parsed.as_str, self.raw.decode())
+            self.assertEqual(loads.call_count, 1)
+
+    def test_retry_gets_fresh_value(self, settings_mock):
+        parsed = ParsedMessage(self.raw)
+        first = parsed.value()
+        first["messageName"] = "LOCAL_TIMEOUT"
+        first["payload"]["device"]["surface"] = "changed"
+        second = parsed.value()
+        self.assertEqual(second, self.value)
+        self.assertIsNot(second, first)
+
+    def test_derived_views_are_memoized(self, settings_mock):
+        message = SmartAppFromMessage(ParsedMessage(self.raw).value(), headers=[], masking_fields=["token"])
+        self.assertIs(message.device, message.device)
+        self.assertIs(message.app_info, message.app_info)
+        masked_value = message.masked_value
+        self.assertNotIn("secret", masked_value)
+        self.assertIs(message.masked_value, masked_value)
+
+    def test_derived_views_are_reset_by_setters(self, settings_mock):
+        message = SmartAppFromMessage(ParsedMessage(self.raw).value(), headers=[])
+        device = message.device
+        masked_value = message.masked_value
+        message.payload = {"device": {"surface": "STARGATE"}}
+        self.assertIsNot(message.device, device)
+        self.assertEqual(message.device.surface, "STARGATE")
+        self.assertNotEqual(message.masked_value, masked_value)
@@ -1,6 +1,14 @@
+import asyncio
+import ssl
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+import aiohttp
+import certifi
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from core.request.async_http_client import async_http_client
 from core.request.rest_request import RestRequest
 
 
@@ -37,3 +45,70 @@ class RestRequestTest(unittest.TestCase):
         data = ["text"]
         result = self.rr.run(data)
         self.assertIsNone(result)
+
+    def test_async_rest_args(self):
+        rr = RestRequest({"url": "https://localhost/post", "rest_args": {
+            "headers": {"a": "b"}, "timeout": 5, "verify": False, "auth": ("user", "password"),
+            "proxies": {"https": "http://proxy:3128"}}})
+        self.assertEqual(rr._async_rest_args, {"headers": {"a": "b"}, "ssl": False, "proxy": "http://proxy:3128",
+                                               "auth": aiohttp.BasicAuth("user", "password")})
+
+    def test_async_rest_args_ca_bundle(self):
+        rr = RestRequest({"url": "https://localhost/post", "rest_args": {"verify": certifi.where()}})
+        context = rr._async_rest_args["ssl"]
+        self.assertIsInstance(context, ssl.SSLContext)
+        self.assertEqual(context.verify_mode, ssl.CERT_REQUIRED)
+
+    def test_unsupported_rest_args(self):
+        with self.assertRaises(ValueError):
+            RestRequest({"url": "https://localhost/post", "rest_args": {"stream": True}})
+        with self.assertRaises(ValueError):
+            RestRequest({"url": "https://localhost/post", "rest_args": {"auth": "token"}})
+
+
+class RestRequestAsyncTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        app = web.Application()
+        app.add_routes([web.get("/echo", self.echo), web.post("/echo", self.echo), web.get("/slow", self.slow)])
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await async_http_client.close()
+        await self.server.close()
+
+    @staticmethod
+    async def echo(request):
+        return web.Response(text=f"{request.query.get('text', '')}{await request.text()}")
+
+    @staticmethod
+    async def slow(request):
+        await asyncio.sleep(1)
+        return web.Response(text="late")
+
+    async def test_get(self):
+        rr = RestRequest({"method": "get", "url": str(self.server.make_url("/echo"))})
+        self.assertEqual(await rr.run_async({"text": "hello"}), "hello")
+
+    async def test_post(self):
+        rr = RestRequest({"url": str(self.server.make_url("/echo"))})
+        self.assertEqual(await rr.run_async("hello"), "hello")
+
+    async def test_disabled(self):
+        rr = RestRequest({"url": str(self.server.make_url("/echo")), "enabled": False})
+        self.assertIsNone(await rr.run_async("hello"))
+
+    async def test_timeout_does_not_block_loop(self):
+        rr = RestRequest({"method": "get", "url": str(self.server.make_url("/slow")), "timeout": 0.05})
+        ticks = []
+
+        async def tick():
+            for _ in range(5):
+                ticks.append(1)
+                await asyncio.sleep(0.005)
+
+        with patch("core.request.rest_request.monitoring") as monitoring:
+            result, _ = await asyncio.gather(rr.run_async(None), tick())
+        self.assertIsNone(result)
+        self.assertEqual(len(ticks), 5)
+        monitoring.got_counter.assert_called_once_with("core_rest_run_timeout")
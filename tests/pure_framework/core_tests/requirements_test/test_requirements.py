@@ -13,10 +13,12 @@ from core.basic_models.requirement.basic_requirements import Requirement, Compos
     EnvironmentRequirement, CharacterIdRequirement, FeatureToggleRequirement
 from core.basic_models.requirement.counter_requirements import CounterValueRequirement, CounterUpdateTimeRequirement
 from core.basic_models.requirement.device_requirements import ChannelRequirement
+from core.basic_models.requirement.requirement_compiler import requirement_compiler
 from core.basic_models.requirement.user_text_requirements import AnySubstringInLoweredTextRequirement, \
     PhoneNumberNumberRequirement, NumInRangeRequirement, IntersectionWithTokensSetRequirement, \
     NormalizedTextInSetRequirement
 from core.basic_models.variables.variables import Variables
+from core.descriptions.descriptions_items import DescriptionsItems
 from core.model.registered import registered_factories
 from smart_kit import configs
 from smart_kit.text_preprocessing.local_text_normalizer import LocalTextNormalizer
@@ -801,3 +803,88 @@ class RequirementTest(unittest.TestCase):
         res1 = requirement.check(text_normalization_result, user)
         self.assertEqual(res1, 1)
         self.assertEqual(res2, 2)
+
+
+class ExpensiveRequirement(MockRequirement):
+    cost = 100
+
+
+class RequirementCompilerTest(unittest.TestCase):
+
+    def setUp(self):
+        registered_factories[Requirement] = MockRequirement
+        requirement_compiler.clear()
+
+    def tearDown(self):
+        registered_factories[Requirement] = Requirement
+        requirement_compiler.configure()
+        requirement_compiler.clear()
+
+    def test_equal_requirements_are_shared(self):
+        with requirement_compiler.scope():
+            first = AndRequirement({"requirements": [{"cond": True}, {"cond": False}]})
+            second = OrRequirement({"requirements": [{"cond": False}]})
+            not_requirement = NotRequirement({"requirement": {"cond": True}})
+        self.assertIs(first.requirements[1], second.requirements[0])
+        self.assertIs(first.requirements[0], not_requirement.requirement)
+
+    def test_requirements_are_shared_within_scope(self):
+        first = NotRequirement({"requirement": {"cond": True}})
+        second = NotRequirement({"requirement": {"cond": True}})
+        self.assertIsNot(first.requirement, second.requirement)
+        with requirement_compiler.scope():
+            first = NotRequirement({"requirement": {"cond": True}})
+        with requirement_compiler.scope():
+            second = NotRequirement({"requirement": {"cond": True}})
+        self.assertIsNot(first.requirement, second.requirement)
+
+    def test_requirements_with_different_ids_are_not_shared(self):
+        with requirement_compiler.scope():
+            first = requirement_compiler.intern(MockRequirement({"cond": True}, id="first"))
+            second = requirement_compiler.intern(MockRequirement({"cond": True}, id="second"))
+            same = requirement_compiler.intern(MockRequirement({"cond": True}, id="first"))
+        self.assertIsNot(first, second)
+        self.assertIs(first, same)
+
+    def test_descriptions_reload_scope(self):
+        items = DescriptionsItems(lambda id, items: NotRequirement(items, id), {"not": {"requirement": {"cond": True}}})
+        loaded = items["not"].requirement
+        items.update_data({"not": {"requirement": {"cond": True}}, "other": {"requirement": {"cond": True}}})
+        self.assertIs(items["not"].requirement, items["other"].requirement)
+        self.assertIsNot(items["not"].requirement, loaded)
+
+    def test_reorder_by_cost(self):
+        expensive = ExpensiveRequirement({"cond": True})
+        cheap = MockRequirement({"cond": False})
+        expensive._check = Mock(return_value=True)
+        with patch.object(AndRequirement, "build_requirements", return_value=[expensive, cheap]):
+            requirement_compiler.configure(reorder=True)
+            requirement = AndRequirement({"requirements": []})
+        self.assertEqual(requirement.requirements, [cheap, expensive])
+        self.assertEqual(requirement.cost, 101)
+        self.assertFalse(requirement.check(None, None))
+        expensive._check.assert_not_called()
+
+    def test_declaration_order_is_kept_by_default(self):
+        requirement = AndRequirement({"requirements": [{"cond": True, "cost": 1}, {"cond": True}]})
+        self.assertEqual([child.items for child in requirement.requirements],
+                         [{"cond": True, "cost": 1}, {"cond": True}])
+
+    def test_timing(self):
+        requirement_compiler.configure(timing=True)
+        requirement = OrRequirement({"requirements": [{"cond": False}, {"cond": True}]}, id="or")
+        self.assertTrue(requirement.check(None, None))
+        self.assertTrue(requirement.check(None, None))
+        timings = list(requirement_compiler.timings.values())
+        self.assertEqual([timing.calls for timing in timings], [2, 2])
+        self.assertEqual(timings[0].raw()["cost"], 1)
+
+    @patch("core.basic_models.requirement.requirement_compiler.log")
+    def test_timings_are_logged(self, log):
+        requirement_compiler.configure(timing=True, timing_log_interval=0)
+        requirement = OrRequirement({"requirements": [{"cond": True}]}, id="or")
+        self.assertTrue(requirement.check(None, None))
+        log.assert_called_once()
+        [timing] = log.call_args.kwargs["params"]["timings"]
+        self.assertEqual(timing["calls"], 1)
+        self.assertEqual(requirement_compiler.timings, {})
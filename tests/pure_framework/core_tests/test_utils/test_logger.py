@@ -1,8 +1,9 @@
+import io
 import logging
 from unittest import TestCase
 from unittest.mock import Mock
 
-from core.logging.logger_utils import log
+from core.logging.logger_utils import lazy, log
 
 
 class TestLogger(TestCase):
@@ -25,3 +26,29 @@ class TestLogger(TestCase):
         fh.stream.write = Mock()
         log("%(p)s %p %p", level="ERROR", params={'p': 'value'})
         self.assertEqual(fh.stream.write.call_args[0][0], 'value %p %p\n')
+
+    def test_lazy_params_disabled_level(self):
+        logging.root.handlers = []
+        self.addCleanup(logging.root.setLevel, logging.root.level)
+        logging.root.setLevel(logging.INFO)
+        func = Mock(return_value="value")
+        log(lazy(func), level="DEBUG", params={"p": lazy(func)})
+        func.assert_not_called()
+
+    def test_lazy_params_enabled_level(self):
+        stream = io.StringIO()
+        logging.root.handlers = []
+        logging.root.addHandler(logging.StreamHandler(stream))
+        log(lazy(lambda: "%(p)s %(n)s"), level="ERROR", params={"p": lazy(str.upper, "value"), "n": 1})
+        self.assertEqual(stream.getvalue(), 'VALUE 1\n')
+
+    def test_logger_name(self):
+        stream = io.StringIO()
+        logging.root.handlers = []
+        logging.root.addHandler(logging.StreamHandler(stream))
+        logging.getLogger("test_logger_name").setLevel(logging.CRITICAL)
+        self.addCleanup(logging.getLogger("test_logger_name").setLevel, logging.NOTSET)
+        log("message", level="ERROR", logger_name="test_logger_name")
+        self.assertEqual(stream.getvalue(), '')
+        log("message", level="CRITICAL", logger_name="test_logger_name")
+        self.assertEqual(stream.getvalue(), 'message\n')
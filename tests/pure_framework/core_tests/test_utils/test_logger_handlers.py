@@ -0,0 +1,100 @@
+import logging
+import logging.config
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from core.logging.logger_handlers import QueueListenerHandler
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self, gate=None):
+        super().__init__()
+        self.gate = gate
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait()
+        self.messages.append(self.format(record))
+        self.threads.add(threading.current_thread().name)
+
+
+class QueueListenerHandlerTest(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("queue_listener_handler_test")
+        self.logger.propagate = False
+        self.addCleanup(setattr, self.logger, "propagate", True)
+        self.addCleanup(self.logger.handlers.clear)
+
+    def test_dict_config(self):
+        logging.config.dictConfig({
+            "version": 1,
+            "disable_existing_loggers": False,
+            "formatters": {"args": {"format": "%(message)s %(args)s"}},
+            "handlers": {
+                "memory": {"()": RecordingHandler, "formatter": "args"},
+                "queue": {"class": "core.logging.logger_handlers.QueueListenerHandler", "handlers": ["memory"]},
+            },
+            "loggers": {"queue_listener_handler_test": {"handlers": ["queue"], "level": "INFO"}},
+        })
+        queue_handler = self.logger.handlers[0]
+        recording = queue_handler.handlers[0]
+        self.logger.info("message", {"key": "value"})
+        queue_handler.close()
+        self.assertEqual(recording.messages, ["message {'key': 'value'}"])
+        self.assertNotIn(threading.current_thread().name, recording.threads)
+
+    def test_drop(self):
+        gate = threading.Event()
+        recording = RecordingHandler(gate)
+        queue_handler = QueueListenerHandler([recording], queue_size=1)
+        self.logger.addHandler(queue_handler)
+        with patch("core.monitoring.monitoring.monitoring") as monitoring:
+            for i in range(5):
+                self.logger.error("message %s", i)
+        gate.set()
+        queue_handler.close()
+        # the listener may take one record off the queue before the gate opens
+        self.assertIn(queue_handler.dropped, (3, 4))
+        self.assertEqual(len(recording.messages), 5 - queue_handler.dropped)
+        monitoring.got_counter.assert_called_with(QueueListenerHandler.DROPPED_COUNTER)
+
+    def test_block(self):
+        recording = RecordingHandler()
+        queue_handler = QueueListenerHandler([recording], queue_size=1, policy=QueueListenerHandler.BLOCK)
+        self.logger.addHandler(queue_handler)
+        for i in range(20):
+            self.logger.error("message %s", i)
+        queue_handler.close()
+        self.assertEqual(queue_handler.dropped, 0)
+        self.assertEqual(recording.messages, [f"message {i}" for i in range(20)])
+
+    def test_unknown_handler(self):
+        with self.assertRaises(ValueError):
+            QueueListenerHandler(["not_configured_handler"])
+
+    @unittest.skipUnless(hasattr(os, "fork"), "fork is not available")
+    def test_fork(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "log")
+            file_handler = logging.FileHandler(filename)
+            queue_handler = QueueListenerHandler([file_handler])
+            self.logger.addHandler(queue_handler)
+            self.addCleanup(file_handler.close)
+            self.addCleanup(queue_handler.close)
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    self.logger.error("child")
+                    queue_handler.close()
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+            self.logger.error("parent")
+            queue_handler.close()
+            with open(filename) as log_file:
+                self.assertEqual(sorted(log_file.read().split()), ["child", "parent"])
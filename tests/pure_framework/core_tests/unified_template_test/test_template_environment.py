@@ -0,0 +1,49 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import core.unified_template.jinja_filters  # noqa: F401
+from core.unified_template.template_environment import TemplateEnvironment, template_environment
+from core.unified_template.unified_template import UnifiedTemplate, UNIFIED_TEMPLATE_TYPE_NAME
+
+
+class TestTemplateEnvironment(TestCase):
+    def test_equal_sources_share_template(self):
+        environment = TemplateEnvironment()
+        template = environment.get_template("abc {{ input }}")
+        self.assertIs(environment.get_template("abc {{ input }}"), template)
+        self.assertIsNot(environment.get_template("abc {{ input }}", extensions=["jinja2.ext.do"]), template)
+        self.assertEqual(len(environment), 2)
+        self.assertEqual(template.render(input="def"), "abc def")
+
+    def test_least_recently_used_templates_are_evicted(self):
+        environment = TemplateEnvironment(cache_size=2)
+        first = environment.get_template("first")
+        environment.get_template("second")
+        self.assertIs(environment.get_template("first"), first)
+        environment.get_template("third")
+        self.assertEqual(len(environment), 2)
+        self.assertIs(environment.get_template("first"), first)
+        self.assertEqual(environment._loader.sources, {})
+        for source in ["{{ a }}", "{{ b }}", "{{ c }}"]:
+            environment.analyze(source)
+        self.assertEqual(len(environment._analyses), 2)
+        environment.set_cache_size(1)
+        self.assertEqual(len(environment), 1)
+        self.assertEqual(len(environment._analyses), 1)
+
+    def test_unified_templates_share_template(self):
+        template = UnifiedTemplate("{{ input | num2text }}")
+        other = UnifiedTemplate({"type": UNIFIED_TEMPLATE_TYPE_NAME, "template": "{{ input | num2text }}"})
+        self.assertIs(template.template, other.template)
+        self.assertIs(template.template.environment, template_environment.get_environment())
+        self.assertEqual(template.render({"input": 2}), other.render({"input": 2}))
+
+    def test_bytecode_cache(self):
+        with tempfile.TemporaryDirectory() as path:
+            environment = TemplateEnvironment(path)
+            environment.get_template("{% for i in items %}{{ i }}{% endfor %}")
+            self.assertEqual(len(os.listdir(path)), 1)
+            other = TemplateEnvironment(path)
+            template = other.get_template("{% for i in items %}{{ i }}{% endfor %}")
+            self.assertEqual(template.render(items=[1, 2]), "12")
@@ -1,5 +1,6 @@
 import asyncio
 from unittest import TestCase
+from unittest.mock import patch
 
 from core.unified_template.unified_template import UnifiedTemplate, UNIFIED_TEMPLATE_TYPE_NAME
 
@@ -84,3 +85,39 @@ class TestUnifiedTemplate(TestCase):
         }
         rendered = await template.render(**params)
         self.assertEqual(rendered, 43)
+
+
+class TestUnifiedTemplateMemoization(TestCase):
+    def test_constant_template_renders_once(self):
+        template = UnifiedTemplate("{{ 'a' * 3 }}")
+        self.assertTrue(template.is_constant)
+        with patch.object(template.template, "render", wraps=template.template.render) as render:
+            self.assertEqual(template.render({"input": 1}), "aaa")
+            self.assertEqual(template.render({"input": 2}), "aaa")
+        render.assert_called_once()
+
+    def test_constant_json_result_is_not_shared(self):
+        template = UnifiedTemplate({"type": UNIFIED_TEMPLATE_TYPE_NAME, "loader": "json", "template": "[1, 2]"})
+        result = template.render({})
+        result.append(3)
+        self.assertEqual(template.render({}), [1, 2])
+
+    def test_render_memoized_by_immutable_params(self):
+        template = UnifiedTemplate("abc {{ input }}")
+        self.assertFalse(template.is_constant)
+        with patch.object(template.template, "render", wraps=template.template.render) as render:
+            self.assertEqual(template.render({"input": 1}), "abc 1")
+            self.assertEqual(template.render({"input": 1, "other": [1]}), "abc 1")
+            self.assertEqual(template.render({"input": True}), "abc True")
+        self.assertEqual(render.call_count, 2)
+
+    def test_render_not_memoized(self):
+        for source, params in [("{{ input }}", {"input": [1]}), ("{{ [1, 2, 3] | random }}", {}),
+                               ("{{ uuid4() }}", {})]:
+            with self.subTest(source=source):
+                template = UnifiedTemplate(source)
+                self.assertFalse(template.is_constant)
+                with patch.object(template.template, "render", wraps=template.template.render) as render:
+                    template.render(params)
+                    template.render(params)
+                self.assertEqual(render.call_count, 2)
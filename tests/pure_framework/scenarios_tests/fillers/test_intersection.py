@@ -148,6 +148,62 @@ class TestIntersectionFieldFiller(unittest.TestCase):
         self.assertEqual(expected, result)
 
 
+class SplittingNormalizer:
+    def normalize_sequence(self, texts):
+        return [{"tokenized_elements_list": [{"lemma": word} for word in text.split()]} for text in texts]
+
+
+class TestIntersectionFieldFillerIndex(unittest.TestCase):
+    def setUp(self):
+        self.cases = {
+            "first": ["a b", "c"],
+            "second": ["a", "d e f"],
+            "empty": [""],
+            "third": ["b"],
+        }
+
+    def _filler(self, items):
+        with patch('smart_kit.configs.get_app_config') as mock_get_app_config:
+            mock_get_app_config.return_value.NORMALIZER = SplittingNormalizer()
+            return IntersectionFieldFiller(items)
+
+    def _extract(self, filler, lemmas):
+        text_preprocessing_result = PicklableMock()
+        text_preprocessing_result.tokenized_elements_list_pymorphy = [{"lemma": lemma} for lemma in lemmas]
+        return filler.extract(text_preprocessing_result, None)
+
+    def _scan(self, filler, lemmas):
+        for key, tokens_list in filler.normalized_cases:
+            for tokens in tokens_list:
+                if filler.operator(set(lemmas), tokens):
+                    return key
+
+    def test_index_matches_scan(self):
+        messages = [[], ["a"], ["b", "a"], ["f", "e", "d"], ["e", "d"], ["c", "x"], ["b"], ["x"]]
+        for strict in [False, True]:
+            cases = self.cases if strict else {key: value for key, value in self.cases.items() if key != "empty"}
+            filler = self._filler({"cases": cases, "strict": strict})
+            for lemmas in messages:
+                with self.subTest(strict=strict, lemmas=lemmas):
+                    self.assertEqual(self._extract(filler, lemmas), self._scan(filler, lemmas))
+
+    def test_cases_are_normalized_in_one_call(self):
+        normalizer = SplittingNormalizer()
+        with patch('smart_kit.configs.get_app_config') as mock_get_app_config, \
+                patch.object(normalizer, "normalize_sequence", wraps=normalizer.normalize_sequence) as normalize:
+            mock_get_app_config.return_value.NORMALIZER = normalizer
+            filler = IntersectionFieldFiller({"cases": self.cases})
+        normalize.assert_called_once_with(["a b", "c", "a", "d e f", "", "b"])
+        self.assertEqual(filler.normalized_cases, [("first", [{"a", "b"}, {"c"}]), ("second", [{"a"}, {"d", "e", "f"}]),
+                                                   ("empty", [set()]), ("third", [{"b"}])])
+
+    def test_first_declared_case_wins(self):
+        filler = self._filler({"cases": self.cases})
+        self.assertEqual(self._extract(filler, ["a", "b"]), "first")
+        self.assertEqual(self._extract(filler, ["d", "e", "f", "a"]), "second")
+        self.assertEqual(self._extract(filler, ["x"]), "empty")
+
+
 class TestIntersectionOriginalTextFiller(unittest.TestCase):
     @patch('smart_kit.configs.get_app_config')
     def test_1(self, mock_get_app_config):
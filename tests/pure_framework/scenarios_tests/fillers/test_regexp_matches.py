@@ -0,0 +1,31 @@
+import re
+import unittest
+from unittest.mock import Mock
+
+from scenarios.scenario_models.field.regexp_matches import RegexpMatches
+
+
+class TestRegexpMatches(unittest.TestCase):
+    def setUp(self):
+        self.matches = RegexpMatches()
+
+    def test_text_is_scanned_once_per_pattern(self):
+        regexp = Mock(wraps=re.compile(r"\d+"))
+        self.assertEqual(self.matches.findall(regexp, "1 и 22"), ["1", "22"])
+        self.assertEqual(self.matches.findall(regexp, "1 и 22"), ["1", "22"])
+        self.assertEqual(self.matches.findall(regexp, "333"), ["333"])
+        self.assertEqual(regexp.findall.call_count, 2)
+
+    def test_equal_patterns_share_matches(self):
+        self.matches.findall(re.compile(r"\d+"), "1")
+        regexp = Mock(wraps=re.compile(r"[a-z]+"))
+        self.assertEqual(self.matches.findall(re.compile(r"\d+"), "1"), ["1"])
+        self.assertEqual(self.matches.findall(regexp, "1"), [])
+        self.assertEqual(self.matches.findall(regexp, "1"), [])
+        regexp.findall.assert_called_once()
+
+    def test_texts_cache_is_bounded(self):
+        regexp = re.compile(r"\d+")
+        for number in range(RegexpMatches.TEXTS_CACHE_SIZE * 2):
+            self.matches.findall(regexp, str(number))
+        self.assertLessEqual(len(self.matches._matches), RegexpMatches.TEXTS_CACHE_SIZE)
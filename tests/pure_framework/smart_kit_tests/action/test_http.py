@@ -32,7 +32,7 @@ class HttpRequestActionTest(unittest.IsolatedAsyncioTestCase):
             __aexit__=AsyncMock()
         )
 
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_simple_request(self, request_mock: Mock):
         self.set_request_mock_attribute(request_mock, return_value={'data': 'value'})
         items = {
@@ -49,7 +49,7 @@ class HttpRequestActionTest(unittest.IsolatedAsyncioTestCase):
         self.assertTrue(self.user.variables.set.called)
         self.user.variables.set.assert_called_with("user_variable", {'data': 'value'})
 
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_render_params(self, request_mock: Mock):
         self.set_request_mock_attribute(request_mock)
         items = {
@@ -73,7 +73,7 @@ class HttpRequestActionTest(unittest.IsolatedAsyncioTestCase):
             url="https://my.url.com", method='POST', timeout=ClientTimeout(3), json={"param": "my_value"}
         )
 
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_headers_fix(self, request_mock):
         self.set_request_mock_attribute(request_mock)
         items = {
@@ -96,7 +96,7 @@ class HttpRequestActionTest(unittest.IsolatedAsyncioTestCase):
             "header_3": b"d32"
         }, method=HTTPRequestAction.DEFAULT_METHOD, timeout=ClientTimeout(self.TIMEOUT))
 
-    @patch('aiohttp.request')
+    @patch('smart_kit.action.http.http_session_pool.request')
     async def test_behavior_is_none(self, request_mock):
         self.set_request_mock_attribute(request_mock)
         items = {
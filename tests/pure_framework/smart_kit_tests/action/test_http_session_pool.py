@@ -0,0 +1,117 @@
+import asyncio
+import unittest
+
+from aiohttp import ClientResponseError, ClientTimeout, ContentTypeError, DummyCookieJar, web
+from aiohttp.test_utils import TestServer
+
+from core.request.async_http_client import AsyncHttpClient
+from smart_kit.action.http_session_pool import HTTPSessionPool
+
+
+class HTTPSessionPoolTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.calls = []
+        app = web.Application()
+        app.add_routes([web.get("/json", self.json), web.post("/json", self.json), web.get("/text", self.text),
+                        web.get("/error", self.error)])
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.client = AsyncHttpClient()
+        self.pool = HTTPSessionPool(self.client)
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+        await self.client.close()
+        await self.server.close()
+
+    async def json(self, request):
+        self.calls.append(request.path)
+        await asyncio.sleep(0.05)
+        return web.json_response({"calls": len(self.calls), "body": await request.text()})
+
+    async def text(self, request):
+        self.calls.append(request.path)
+        return web.Response(text="plain")
+
+    async def error(self, request):
+        self.calls.append(request.path)
+        return web.Response(status=500)
+
+    async def _get(self, path, method="GET", **kwargs):
+        async with self.pool.request(method=method, url=str(self.server.make_url(path)), **kwargs) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def test_connection_is_reused(self):
+        await self._get("/json")
+        await self._get("/json")
+        session = self.client._session
+        self.assertEqual(len(session.connector._conns), 1)
+
+    async def test_shared_client_session(self):
+        session = self.client._get_session()
+        self.assertIsInstance(session.cookie_jar, DummyCookieJar)
+        self.assertEqual(session.connector.limit, AsyncHttpClient.DEFAULT_LIMIT)
+        await self._get("/json")
+        self.assertIs(self.client._session, session)
+
+    async def test_identical_gets_are_coalesced(self):
+        results = await asyncio.gather(*(self._get("/json") for _ in range(5)))
+        self.assertEqual(len(self.calls), 1)
+        self.assertTrue(all(result == {"calls": 1, "body": ""} for result in results))
+        # shared response gives every caller its own objects
+        self.assertIsNot(results[0], results[1])
+
+    async def test_different_headers_are_not_coalesced(self):
+        await asyncio.gather(self._get("/json", headers={"Authorization": "a"}),
+                             self._get("/json", headers={"Authorization": "b"}))
+        self.assertEqual(len(self.calls), 2)
+
+    async def test_posts_are_not_coalesced(self):
+        await asyncio.gather(self._get("/json", method="POST", json={"a": 1}),
+                             self._get("/json", method="POST", json={"a": 1}))
+        self.assertEqual(len(self.calls), 2)
+
+    async def test_cache(self):
+        self.pool.configure(cache_ttl=60)
+        self.assertEqual(await self._get("/json"), {"calls": 1, "body": ""})
+        self.assertEqual(await self._get("/json"), {"calls": 1, "body": ""})
+        self.assertEqual(len(self.calls), 1)
+        self.pool.clear_cache()
+        self.assertEqual(await self._get("/json"), {"calls": 2, "body": ""})
+
+    async def test_cache_expires(self):
+        self.pool.configure(cache_ttl=0.01)
+        await self._get("/json")
+        await asyncio.sleep(0.02)
+        await self._get("/json")
+        self.assertEqual(len(self.calls), 2)
+
+    async def test_errors_are_not_cached(self):
+        self.pool.configure(cache_ttl=60)
+        for _ in range(2):
+            with self.assertRaises(ClientResponseError):
+                await self._get("/error")
+        self.assertEqual(len(self.calls), 2)
+
+    async def test_not_json(self):
+        async with self.pool.request(method="GET", url=str(self.server.make_url("/text"))) as response:
+            with self.assertRaises(ContentTypeError):
+                await response.json()
+            self.assertEqual(await response.read(), b"plain")
+
+    async def test_cancelled_waiter_does_not_cancel_request(self):
+        first = asyncio.ensure_future(self._get("/json"))
+        second = asyncio.ensure_future(self._get("/json"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        self.assertEqual(await second, {"calls": 1, "body": ""})
+        self.assertTrue(first.cancelled())
+
+    async def test_different_timeouts_are_not_coalesced(self):
+        impatient = self._get("/json", timeout=ClientTimeout(0.01))
+        patient = self._get("/json", timeout=ClientTimeout(5))
+        results = await asyncio.gather(impatient, patient, return_exceptions=True)
+        self.assertIsInstance(results[0], asyncio.TimeoutError)
+        # the patient caller did not join the request made with the short timeout
+        self.assertEqual(results[1]["body"], "")
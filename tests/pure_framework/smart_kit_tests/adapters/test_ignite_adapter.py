@@ -0,0 +1,83 @@
+# coding: utf-8
+import unittest
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+from pyignite.datatypes.cache_config import CacheAtomicityMode
+from pyignite.datatypes.prop_codes import PROP_CACHE_ATOMICITY_MODE
+
+from core.db_adapter.db_adapter import DBAdapterException
+from core.db_adapter.ignite_adapter import IgniteAdapter
+
+
+class IgniteCache:
+    """Stand-in for AioCache, writes are applied on commit of the transaction"""
+
+    def __init__(self, atomicity_mode):
+        self.data = {}
+        self.atomicity_mode = atomicity_mode
+
+    async def settings(self):
+        return {PROP_CACHE_ATOMICITY_MODE: self.atomicity_mode}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def get_all(self, keys):
+        return {key: self.data[key] for key in keys if key in self.data}
+
+    async def put(self, key, value):
+        self.data[key] = value
+
+    async def replace_if_equals(self, key, sample, value):
+        if self.data.get(key) != sample:
+            return False
+        self.data[key] = value
+        return True
+
+
+class IgniteAdapterTest(unittest.IsolatedAsyncioTestCase):
+    def make_adapter(self, atomicity_mode=CacheAtomicityMode.TRANSACTIONAL):
+        adapter = IgniteAdapter({"url": ["localhost:10800"], "cache_name": "users"})
+        self.cache = IgniteCache(atomicity_mode)
+        self.tx = Mock(commit=AsyncMock())
+        tx_context = MagicMock()
+        tx_context.__aenter__.return_value = self.tx
+        adapter._client = Mock(tx_start=Mock(return_value=tx_context))
+        adapter._cache = self.cache
+        return adapter
+
+    async def test_compare_and_set_in_transaction(self):
+        adapter = self.make_adapter()
+        self.assertTrue(await adapter.compare_and_set("uid", 0, "v1"))
+        self.assertEqual(await adapter.get_with_version("uid"), ("v1", 1))
+        self.tx.commit.assert_awaited_once()
+        self.assertFalse(await adapter.compare_and_set("uid", 0, "v2"))
+        self.assertEqual(self.tx.commit.await_count, 1)
+
+    async def test_writes_increment_version(self):
+        adapter = self.make_adapter()
+        await adapter.enable_versioning()
+        await adapter.save("uid", "v1")
+        self.assertTrue(await adapter.replace_if_equals("uid", "v1", "v2"))
+        self.assertFalse(await adapter.replace_if_equals("uid", "v1", "v3"))
+        self.assertEqual(await adapter.get_with_version("uid"), ("v2", 2))
+        self.assertFalse(await adapter.compare_and_set("uid", 0, "v3"))
+
+    async def test_writes_without_versioning(self):
+        adapter = self.make_adapter()
+        await adapter.save("uid", "v1")
+        self.assertTrue(await adapter.replace_if_equals("uid", "v1", "v2"))
+        self.assertFalse(await adapter.replace_if_equals("uid", "v1", "v3"))
+        self.assertEqual(self.cache.data, {"uid": "v2"})
+        adapter._client.tx_start.assert_not_called()
+
+    async def test_atomic_cache(self):
+        adapter = self.make_adapter(CacheAtomicityMode.ATOMIC)
+        with self.assertRaises(DBAdapterException):
+            await adapter.enable_versioning()
+        self.assertFalse(adapter.versioned)
+        with self.assertRaises(DBAdapterException):
+            await adapter.compare_and_set("uid", 0, "v1")
+        await adapter.save("uid", "v1")
+        self.assertEqual(self.cache.data, {"uid": "v1"})
+        adapter._client.tx_start.assert_not_called()
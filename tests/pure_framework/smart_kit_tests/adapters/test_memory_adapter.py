@@ -46,6 +46,41 @@ class AdapterTest1(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(await obj1._get(11), 'any_data')
         self.assertIsNone(await obj1._get(12))
 
+    async def test_memory_adapter_compare_and_set(self):
+        obj = memory_adapter.MemoryAdapter()
+        self.assertEqual(await obj.get_with_version("uid"), (None, 0))
+        self.assertTrue(await obj.compare_and_set("uid", 0, "v1"))
+        self.assertEqual(await obj.get_with_version("uid"), ("v1", 1))
+        self.assertFalse(await obj.compare_and_set("uid", 0, "v2"))
+        self.assertTrue(await obj.compare_and_set("uid", 1, "v2"))
+        self.assertEqual(await obj.get_with_version("uid"), ("v2", 2))
+
+    async def test_memory_adapter_compare_and_set_not_versioned_value(self):
+        obj = memory_adapter.MemoryAdapter()
+        # значение, записанное до появления версий
+        obj.memory_storage["uid"] = "v1"
+        self.assertEqual(await obj.get_with_version("uid"), ("v1", 0))
+        self.assertTrue(await obj.compare_and_set("uid", 0, "v2"))
+        self.assertEqual(await obj.get("uid"), "v2")
+
+    async def test_memory_adapter_writes_increment_version(self):
+        obj = memory_adapter.MemoryAdapter()
+        await obj.enable_versioning()
+        self.assertTrue(await obj.compare_and_set("uid", 0, "v1"))
+        # сохранение без версий после чтения с версией
+        await obj.save("uid", "v2")
+        self.assertFalse(await obj.compare_and_set("uid", 1, "v3"))
+        self.assertTrue(await obj.replace_if_equals("uid", "v2", "v3"))
+        self.assertEqual(await obj.get_with_version("uid"), ("v3", 3))
+
+    async def test_memory_adapter_writes_without_versioning(self):
+        obj = memory_adapter.MemoryAdapter()
+        self.assertTrue(await obj.compare_and_set("uid", 0, "v1"))
+        # без включённых версий запись не меняет версию
+        await obj.save("uid", "v2")
+        self.assertTrue(await obj.replace_if_equals("uid", "v2", "v3"))
+        self.assertEqual(obj.memory_storage, {"uid": "v3", "uid:version": "1"})
+
     async def test_memory_adapter_list_dir(self):
         obj = memory_adapter.MemoryAdapter()
         self.assertTrue(hasattr(obj, '_list_dir'))
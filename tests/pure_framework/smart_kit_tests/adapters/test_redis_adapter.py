@@ -0,0 +1,105 @@
+# coding: utf-8
+import unittest
+from unittest.mock import AsyncMock, Mock, call, patch
+
+from core.db_adapter.aioredis_adapter import AIORedisAdapter, COMPARE_AND_SET_SCRIPT, REPLACE_IF_EQUALS_SCRIPT, \
+    VERSIONED_REPLACE_IF_EQUALS_SCRIPT, VERSIONED_SAVE_SCRIPT
+from core.db_adapter.aioredis_sentinel_adapter import AIORedisSentinelAdapter
+
+
+class AIORedisAdapterTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.scripts = {}
+        self.redis = Mock(mget=AsyncMock(), set=AsyncMock())
+        self.redis.register_script.side_effect = lambda script: self.scripts.setdefault(script, AsyncMock())
+        aioredis = Mock(from_url=Mock(return_value=self.redis))
+        with patch("core.db_adapter.aioredis_adapter.importlib.import_module", return_value=aioredis):
+            self.adapter = AIORedisAdapter({"type": "aioredis", "redis": "redis://localhost:6379/0",
+                                            "version_ttl": 3600})
+        await self.adapter.connect()
+
+    async def test_version_ttl_is_not_a_client_option(self):
+        self.assertEqual(self.adapter.version_ttl, 3600)
+        self.assertNotIn("version_ttl", self.adapter.config)
+
+    async def test_save(self):
+        await self.adapter.save("uid", "data")
+        self.redis.set.assert_awaited_once_with("uid", "data")
+        self.scripts[VERSIONED_SAVE_SCRIPT].assert_not_awaited()
+
+    async def test_versioned_save_increments_version(self):
+        await self.adapter.enable_versioning()
+        await self.adapter.save("uid", "data")
+        self.scripts[VERSIONED_SAVE_SCRIPT].assert_awaited_once_with(keys=["uid", "uid:version"], args=[3600, "data"])
+        self.redis.set.assert_not_awaited()
+
+    async def test_compare_and_set(self):
+        compare_and_set = self.scripts[COMPARE_AND_SET_SCRIPT]
+        compare_and_set.return_value = 3
+        self.assertTrue(await self.adapter.compare_and_set("uid", 2, "data"))
+        compare_and_set.assert_awaited_once_with(keys=["uid", "uid:version"], args=[3600, 2, "data"])
+        compare_and_set.return_value = 0
+        self.assertFalse(await self.adapter.compare_and_set("uid", 2, "data"))
+
+    async def test_replace_if_equals_replaced(self):
+        replace_if_equals = self.scripts[REPLACE_IF_EQUALS_SCRIPT]
+        replace_if_equals.return_value = 4
+        with patch("core.db_adapter.aioredis_adapter.monitoring") as monitoring:
+            self.assertTrue(await self.adapter.replace_if_equals("uid", "sample", "data"))
+        replace_if_equals.assert_awaited_once_with(keys=["uid"], args=["sample", "data"])
+        monitoring.got_counter.assert_called_once_with("redis_replace_if_equals")
+        self.scripts[VERSIONED_REPLACE_IF_EQUALS_SCRIPT].assert_not_awaited()
+
+    async def test_versioned_replace_if_equals(self):
+        await self.adapter.enable_versioning()
+        replace_if_equals = self.scripts[VERSIONED_REPLACE_IF_EQUALS_SCRIPT]
+        replace_if_equals.return_value = 4
+        self.assertTrue(await self.adapter.replace_if_equals("uid", "sample", "data"))
+        replace_if_equals.assert_awaited_once_with(keys=["uid", "uid:version"], args=[3600, "sample", "data"])
+        self.scripts[REPLACE_IF_EQUALS_SCRIPT].assert_not_awaited()
+
+    async def test_replace_if_equals_not_replaced(self):
+        self.scripts[REPLACE_IF_EQUALS_SCRIPT].return_value = 0
+        with patch("core.db_adapter.aioredis_adapter.monitoring") as monitoring:
+            self.assertFalse(await self.adapter.replace_if_equals("uid", "sample", "data"))
+        self.assertEqual(monitoring.got_counter.call_args_list,
+                         [call("redis_replace_if_equals"), call("redis_replace_if_equals_collision")])
+
+    async def test_get_with_version(self):
+        self.redis.mget.return_value = [b"data", b"3"]
+        self.assertEqual(await self.adapter.get_with_version("uid"), (b"data", 3))
+        self.redis.mget.return_value = [None, None]
+        self.assertEqual(await self.adapter.get_with_version("uid"), (None, 0))
+        self.redis.mget.assert_awaited_with("uid", "uid:version")
+
+    def test_scripts_increment_version_with_ttl(self):
+        for script in [VERSIONED_SAVE_SCRIPT, VERSIONED_REPLACE_IF_EQUALS_SCRIPT, COMPARE_AND_SET_SCRIPT]:
+            self.assertIn("redis.call('INCR', KEYS[2])", script)
+            self.assertIn("redis.call('PEXPIRE', KEYS[2], ttl)", script)
+        self.assertNotIn("KEYS[2]", REPLACE_IF_EQUALS_SCRIPT)
+
+
+class AIORedisSentinelAdapterTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.redis = Mock()
+        self.script = AsyncMock(return_value=1)
+        self.redis.register_script.return_value = self.script
+        aioredis = Mock()
+        aioredis.sentinel.Sentinel.return_value.master_for = AsyncMock(return_value=self.redis)
+        with patch("core.db_adapter.aioredis_sentinel_adapter.importlib.import_module", return_value=aioredis):
+            self.adapter = AIORedisSentinelAdapter({"type": "aioredis_sentinel", "service_name": "master",
+                                                    "sentinels": [["localhost", 26379]], "version_ttl": 3600})
+        await self.adapter.connect()
+
+    async def test_replace_if_equals_registers_script_once(self):
+        self.assertTrue(await self.adapter.replace_if_equals("uid", "sample", "data"))
+        self.script.return_value = 0
+        self.assertFalse(await self.adapter.replace_if_equals("uid", "sample", "data"))
+        self.redis.register_script.assert_called_once_with(REPLACE_IF_EQUALS_SCRIPT)
+        self.script.assert_awaited_with(keys=["uid"], args=["sample", "data"], client=self.redis)
+
+    async def test_versioned_save(self):
+        await self.adapter.enable_versioning()
+        await self.adapter.save("uid", "data")
+        self.redis.register_script.assert_called_once_with(VERSIONED_SAVE_SCRIPT)
+        self.script.assert_awaited_once_with(keys=["uid", "uid:version"], args=[3600, "data"], client=self.redis)
@@ -0,0 +1,145 @@
+# coding: utf-8
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from core.db_adapter.memory_adapter import MemoryAdapter
+from core.db_adapter.user_cache import WriteBehindUserCache
+
+
+class WriteBehindUserCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.db = MemoryAdapter()
+        self.cache = WriteBehindUserCache(self.db, "app", {"max_size": 2, "ttl": 60})
+
+    async def test_saves_are_coalesced_until_flush(self):
+        self.cache.loaded("uid", None)
+        self.cache.save("uid", "v1")
+        self.cache.save("uid", "v2")
+        self.assertIsNone(await self.db.get("uid"))
+        self.assertEqual(self.cache.get("uid").data, "v2")
+        with patch.object(self.db, "save", wraps=self.db.save) as save:
+            await self.cache.flush()
+            await self.cache.flush()
+        save.assert_called_once_with("uid", "v2")
+        self.assertEqual(self.cache.dirty_count, 0)
+
+    async def test_flush_replaces_if_equals_to_loaded(self):
+        await self.db.save("uid", "v1")
+        self.cache.loaded("uid", "v1")
+        self.cache.save("uid", "v2")
+        await self.cache.flush()
+        self.assertEqual(await self.db.get("uid"), "v2")
+        self.cache.save("uid", "v3")
+        await self.cache.flush()
+        self.assertEqual(await self.db.get("uid"), "v3")
+
+    async def test_collision_drops_cached_user(self):
+        await self.db.save("uid", "v1")
+        self.cache.loaded("uid", "v1")
+        await self.db.save("uid", "changed by another writer")
+        self.cache.save("uid", "v2")
+        await self.cache.flush()
+        self.assertEqual(await self.db.get("uid"), "changed by another writer")
+        self.assertIsNone(self.cache.get("uid"))
+        self.assertEqual(self.cache.dirty_count, 0)
+
+    async def test_versioned_flush(self):
+        cache = WriteBehindUserCache(self.db, "app", versioned=True)
+        await self.db.compare_and_set("uid", 0, "v1")
+        cache.loaded("uid", *await self.db.get_with_version("uid"))
+        cache.save("uid", "v2")
+        await cache.flush()
+        cache.save("uid", "v3")
+        await cache.flush()
+        self.assertEqual(await self.db.get_with_version("uid"), ("v3", 3))
+        await self.db.compare_and_set("uid", 3, "changed by another writer")
+        cache.save("uid", "v4")
+        await cache.flush()
+        self.assertEqual(await self.db.get("uid"), "changed by another writer")
+        self.assertIsNone(cache.get("uid"))
+
+    async def test_evicted_dirty_user_is_kept_until_flush(self):
+        for db_uid in ["a", "b", "c"]:
+            self.cache.save(db_uid, db_uid + "1")
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.dirty_count, 3)
+        self.assertEqual(self.cache.get("a").data, "a1")
+        await self.cache.flush()
+        self.assertEqual([await self.db.get(db_uid) for db_uid in ["a", "b", "c"]], ["a1", "b1", "c1"])
+
+    async def test_clean_user_expires_by_ttl(self):
+        cache = WriteBehindUserCache(self.db, "app", {"ttl": 0})
+        cache.loaded("uid", "v1")
+        self.assertIsNone(cache.get("uid"))
+        cache.save("uid", "v2")
+        self.assertEqual(cache.get("uid").data, "v2")
+
+    async def test_invalidate_flushes_and_clears(self):
+        self.cache.save("uid", "v1")
+        await self.cache.invalidate()
+        self.assertEqual(await self.db.get("uid"), "v1")
+        self.assertEqual(len(self.cache), 0)
+        self.assertIsNone(self.cache.get("uid"))
+
+    async def test_after_flush_waits_for_write(self):
+        callback = AsyncMock()
+        self.assertFalse(self.cache.after_flush("uid", callback))
+        await self.db.save("uid", "v1")
+        self.cache.loaded("uid", "v1")
+        self.cache.save("uid", "v2")
+        self.assertTrue(self.cache.after_flush("uid", callback))
+        await self.cache.flush()
+        callback.assert_awaited_once_with()
+        self.assertFalse(self.cache.after_flush("uid", callback))
+
+    async def test_after_flush_is_dropped_on_collision(self):
+        callback = AsyncMock()
+        await self.db.save("uid", "v1")
+        self.cache.loaded("uid", "v1")
+        self.cache.save("uid", "v2")
+        self.cache.after_flush("uid", callback)
+        await self.db.save("uid", "changed by another writer")
+        await self.cache.flush()
+        await self.cache.flush()
+        callback.assert_not_awaited()
+        self.assertFalse(self.cache.after_flush("uid", callback))
+
+    async def test_after_flush_registered_during_write_of_same_data(self):
+        first, second = AsyncMock(), AsyncMock()
+        self.cache.save("uid", "v1")
+        self.cache.after_flush("uid", first)
+        save = self.db.save
+
+        async def slow_save(db_uid, data):
+            self.cache.save("uid", "v1")
+            self.assertTrue(self.cache.after_flush("uid", second))
+            await save(db_uid, data)
+
+        with patch.object(self.db, "save", side_effect=slow_save):
+            await self.cache.flush()
+        first.assert_awaited_once_with()
+        second.assert_awaited_once_with()
+        self.assertEqual(self.cache.dirty_count, 0)
+
+    async def test_after_flush_is_kept_on_error(self):
+        callback = AsyncMock()
+        self.cache.save("uid", "v1")
+        self.cache.after_flush("uid", callback)
+        with patch.object(self.db, "save", side_effect=ValueError):
+            await self.cache.flush()
+        callback.assert_not_awaited()
+        await self.cache.flush()
+        callback.assert_awaited_once_with()
+
+    async def test_concurrent_flushes_are_serialized(self):
+        self.cache.save("uid", "v1")
+        saves = []
+
+        async def slow_save(db_uid, data):
+            saves.append(data)
+            await asyncio.sleep(0.01)
+
+        with patch.object(self.db, "save", side_effect=slow_save):
+            await asyncio.gather(self.cache.flush(), self.cache.invalidate(), self.cache.flush())
+        self.assertEqual(saves, ["v1"])
@@ -0,0 +1,136 @@
+# coding: utf-8
+import asyncio
+import unittest
+from functools import partial
+from unittest.mock import AsyncMock, Mock, patch
+
+from kafka.errors import KafkaTimeoutError
+
+from core.request.rest_request import RestRequest
+from smart_kit.start_points.main_loop_kafka import MainLoop
+
+
+class InMemoryConsumer:
+    """Stand-in for KafkaConsumer that counts broker round-trips"""
+
+    def __init__(self, records):
+        self.records = list(records)
+        self.fetches = 0
+
+    async def poll(self):
+        self.fetches += 1
+        return self.records.pop(0) if self.records else None
+
+    async def consume(self, num_messages=1, timeout_ms=None):
+        self.fetches += 1
+        batch, self.records = self.records[:num_messages], self.records[num_messages:]
+        for record in batch:
+            yield record
+
+
+def make_main_loop(consumer, batch_poll, queues_count=4):
+    main_loop = MainLoop.__new__(MainLoop)
+    main_loop.is_work = True
+    main_loop.consumers = {"main": consumer}
+    main_loop.queues = [asyncio.Queue() for _ in range(queues_count)]
+    main_loop.no_kafka_messages_poll_time = 0
+    main_loop.MAX_LOG_TIME = 60
+    main_loop.kafka_batch_poll_enabled = batch_poll
+    main_loop.kafka_batch_max_records = 50
+    main_loop.kafka_batch_timeout_ms = 0
+    return main_loop
+
+
+def make_records(count, keys_count=10):
+    return [Mock(key=f"key_{i % keys_count}".encode(), offset=i, value=b"{}") for i in range(count)]
+
+
+class MainLoopKafkaPollTest(unittest.IsolatedAsyncioTestCase):
+    async def _drain(self, main_loop, expected_count):
+        async def stop_when_drained():
+            while sum(queue.qsize() for queue in main_loop.queues) < expected_count:
+                await asyncio.sleep(0)
+            main_loop.is_work = False
+        await asyncio.gather(main_loop.poll_kafka("main", main_loop.queues), stop_when_drained())
+
+    async def test_batch_poll_fetches_many_records_per_round_trip(self):
+        records = make_records(200)
+        single_consumer, batch_consumer = InMemoryConsumer(records), InMemoryConsumer(records)
+        await self._drain(make_main_loop(single_consumer, batch_poll=False), len(records))
+        await self._drain(make_main_loop(batch_consumer, batch_poll=True), len(records))
+        self.assertEqual(single_consumer.fetches, 200)
+        self.assertEqual(batch_consumer.fetches, 4)
+
+    async def test_batch_poll_keeps_key_order_in_queues(self):
+        records = make_records(100)
+        main_loop = make_main_loop(InMemoryConsumer(records), batch_poll=True)
+        await self._drain(main_loop, len(records))
+        seen_keys = {}
+        for index, queue in enumerate(main_loop.queues):
+            offsets_by_key = {}
+            while not queue.empty():
+                executable, kwargs = queue.get_nowait()
+                record = kwargs["mq_message"]
+                self.assertEqual(kwargs["kafka_key"], "main")
+                offsets_by_key.setdefault(record.key, []).append(record.offset)
+            for key, offsets in offsets_by_key.items():
+                self.assertEqual(offsets, sorted(offsets))
+                self.assertNotIn(key, seen_keys)
+                seen_keys[key] = index
+        self.assertEqual(len(seen_keys), 10)
+
+
+class MainLoopKafkaCommitTest(unittest.IsolatedAsyncioTestCase):
+    async def test_offset_is_committed_after_delivery(self):
+        consumer = Mock(commit_offset=AsyncMock())
+        record = make_records(1)[0]
+        deliveries = [asyncio.get_running_loop().create_future() for _ in range(2)]
+        commit = asyncio.ensure_future(MainLoop._commit_after_delivery(consumer, record, deliveries))
+        deliveries[0].set_result("record_metadata")
+        await asyncio.sleep(0)
+        consumer.commit_offset.assert_not_awaited()
+        deliveries[1].set_exception(KafkaTimeoutError())
+        await commit
+        consumer.commit_offset.assert_awaited_once_with(record)
+
+    async def test_commit_runs_in_background_until_revoke(self):
+        main_loop = MainLoop.__new__(MainLoop)
+        main_loop.commit_tasks = set()
+        consumer = Mock(commit_offset=AsyncMock())
+        record = make_records(1)[0]
+        delivery = asyncio.get_running_loop().create_future()
+        main_loop._commit_in_background(partial(MainLoop._commit_after_delivery, consumer, record, [delivery]))
+        self.assertEqual(len(main_loop.commit_tasks), 1)
+        revoke = asyncio.ensure_future(main_loop.on_revoke_wait_commits([]))
+        await asyncio.sleep(0)
+        self.assertFalse(revoke.done())
+        delivery.set_result("record_metadata")
+        await revoke
+        consumer.commit_offset.assert_awaited_once_with(record)
+        self.assertEqual(main_loop.commit_tasks, set())
+
+
+class MainLoopKafkaSendRequestTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.main_loop = MainLoop.__new__(MainLoop)
+        self.main_loop.settings = {"template_settings": {}}
+        self.main_loop.publishers = {}
+        self.main_loop.app_name = "app"
+        self.main_loop._log_request = Mock()
+
+    async def _send(self, request):
+        answer = Mock(request=request, value="answer")
+        with patch("smart_kit.start_points.main_loop_kafka.monitoring"):
+            return await self.main_loop._send_request(Mock(), answer, Mock())
+
+    async def test_rest_request_is_awaited(self):
+        request = RestRequest({"url": "http://localhost/answer"})
+        request.run_async = AsyncMock(return_value="response")
+        self.assertIsNone(await self._send(request))
+        request.run_async.assert_awaited_once()
+        self.assertEqual(request.run_async.await_args.args[0], b"answer")
+
+    async def test_kafka_request_delivery_is_returned(self):
+        delivery = asyncio.get_running_loop().create_future()
+        request = Mock(spec=["run", "topic_key"], run=AsyncMock(return_value=delivery))
+        self.assertIs(await self._send(request), delivery)
@@ -0,0 +1,66 @@
+# coding: utf-8
+import os
+import unittest
+from unittest.mock import Mock, patch
+
+from smart_kit.text_preprocessing.local_text_normalizer import LocalTextNormalizer
+from smart_kit.utils.cache import Cache
+
+
+def fake_normalize(self, text, message_type="voice"):
+    return {"original_text": text, "normalized_text": text.upper(), "pid": os.getpid()}
+
+
+@patch.object(LocalTextNormalizer, "load_everything", lambda self: None)
+@patch.object(LocalTextNormalizer, "__call__", fake_normalize)
+class LocalTextNormalizerSequenceTest(unittest.TestCase):
+    def setUp(self):
+        self.normalizer = LocalTextNormalizer()
+        self.texts = [f"text {i}" for i in range(10)]
+
+    def tearDown(self):
+        self.normalizer.close()
+        self.normalizer.workers = 1
+        self.normalizer.chunk_size = LocalTextNormalizer.DEFAULT_CHUNK_SIZE
+        self.normalizer.cache = None
+
+    def test_sequential(self):
+        result = self.normalizer.normalize_sequence(self.texts)
+        self.assertEqual([item["normalized_text"] for item in result], [text.upper() for text in self.texts])
+        self.assertEqual({item["pid"] for item in result}, {os.getpid()})
+
+    def test_parallel_keeps_order(self):
+        self.normalizer.workers = 2
+        result = self.normalizer.normalize_sequence(self.texts, batch_size=3)
+        self.assertEqual([item["normalized_text"] for item in result], [text.upper() for text in self.texts])
+        self.assertNotIn(os.getpid(), {item["pid"] for item in result})
+
+    def test_short_sequence_is_not_sent_to_workers(self):
+        self.normalizer.workers = 2
+        result = self.normalizer.normalize_sequence(self.texts[:2], batch_size=3)
+        self.assertEqual({item["pid"] for item in result}, {os.getpid()})
+        self.assertIsNone(self.normalizer._executor)
+
+    def test_results_are_cached(self):
+        self.normalizer.cache = Cache(float("+inf"))
+        self.normalizer.normalize_sequence(self.texts[:2])
+        self.assertEqual(self.normalizer.cache["text 1"]["normalized_text"], "TEXT 1")
+
+    def test_close_stops_pool(self):
+        self.normalizer.workers = 2
+        self.normalizer.normalize_sequence(self.texts, batch_size=3)
+        self.assertIsNotNone(self.normalizer._executor)
+        self.normalizer.close()
+        self.assertIsNone(self.normalizer._executor)
+        result = self.normalizer.normalize_sequence(self.texts, batch_size=3)
+        self.assertEqual([item["normalized_text"] for item in result], [text.upper() for text in self.texts])
+
+    def test_with_cache_returns_separate_instance(self):
+        app_config = Mock(NORMALIZATION_CACHE=Cache, NORMALIZATION_CACHE_TTL=0, REFERENCES_PATH="references")
+        normalizer = LocalTextNormalizer.with_cache(app_config, workers=3)
+        self.assertIsNot(normalizer, self.normalizer)
+        self.assertEqual(normalizer.workers, 3)
+        self.assertIsInstance(normalizer.cache, Cache)
+        self.assertEqual(self.normalizer.workers, 1)
+        self.assertIsNone(self.normalizer.cache)
+        self.assertIs(LocalTextNormalizer(), self.normalizer)
@@ -0,0 +1,41 @@
+# coding: utf-8
+import unittest
+from unittest.mock import patch
+
+from smart_kit.text_preprocessing.pymorphy2_morph_wrapper import Pymorphy2MorphWrapper
+
+
+class Pymorphy2MorphWrapperCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.morph = Pymorphy2MorphWrapper(cache_size=2)
+
+    def setUp(self):
+        self.morph._parse_cache.clear()
+        self.morph.cache_hits = self.morph.cache_misses = 0
+
+    def test_parse_is_cached(self):
+        with patch.object(self.morph.pymorphy_analyzer, "parse", wraps=self.morph.pymorphy_analyzer.parse) as parse:
+            first = self.morph.parse("рыба")
+            self.assertIs(self.morph.parse("рыба"), first)
+            parse.assert_called_once_with("рыба")
+        self.assertEqual(first[0].normal_form, "рыба")
+        self.assertEqual(self.morph.cache_hit_ratio, 0.5)
+
+    def test_least_recently_used_is_evicted(self):
+        self.morph.parse("рыба")
+        self.morph.parse("кот")
+        self.morph.parse("рыба")
+        self.morph.parse("дом")
+        self.assertEqual(list(self.morph._parse_cache), ["рыба", "дом"])
+
+    def test_warm_up_keeps_most_frequent(self):
+        count = self.morph.warm_up(["кот", "рыба", "дом", "рыба", "дом", "рыба"])
+        self.assertEqual(count, 2)
+        self.assertEqual(list(self.morph._parse_cache), ["дом", "рыба"])
+        self.assertEqual(self.morph.cache_misses, 0)
+
+    def test_token_processing_uses_cache(self):
+        tokens = self.morph([{"text": "рыбы"}, {"text": "рыбы"}])
+        self.assertEqual([token["lemma"] for token in tokens], ["рыба", "рыба", "."])
+        self.assertEqual(self.morph.cache_misses, 1)
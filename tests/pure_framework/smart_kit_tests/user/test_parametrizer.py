@@ -2,7 +2,10 @@
 import unittest
 from unittest.mock import Mock
 
+from core.basic_models.variables.variables import Variables
+from core.model.state_version import next_state_version
 from scenarios.user import parametrizer
+from scenarios.user.last_fields.last_fields import LastFields
 from smart_kit.utils.picklable_mock import PicklableMock
 
 
@@ -109,3 +112,64 @@ class UserTest1(unittest.TestCase):
         result2.pop('message')
         self.assertTrue(result1 == answer1)
         self.assertTrue(result2 == answer2)
+
+
+class ParametrizerSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.user = PicklableMock()
+        self.user.message = TestMessage()
+        self.user.descriptions = {"scenarios": {}}
+        self.user.last_scenarios.last_scenario_name = None
+        self.user.forms.version = 0
+        self.user.forms.collect_form_fields = Mock(side_effect=lambda: {"form": {"field": "value"}})
+        self.user.last_fields.version = 0
+        self.user.variables = Variables({}, self.user)
+        self.user.local_vars = Variables({}, self.user, savable=False)
+        self.parametrizer = parametrizer.Parametrizer(self.user, {})
+
+    def test_state_is_collected_once(self):
+        first = self.parametrizer._get_user_data()
+        second = self.parametrizer._get_user_data()
+        self.user.forms.collect_form_fields.assert_called_once()
+        self.assertEqual(first["forms"], second["forms"])
+        self.assertIs(first["forms"]["form"], second["forms"]["form"])
+
+    def test_snapshot_is_not_changed_by_caller(self):
+        self.user.variables.set("key", "value")
+        first = self.parametrizer._get_user_data()
+        first["variables"]["other"] = "value"
+        first["forms"].clear()
+        second = self.parametrizer._get_user_data()
+        self.user.forms.collect_form_fields.assert_called_once()
+        self.assertEqual(second["variables"], {"key": "value"})
+        self.assertEqual(second["forms"], {"form": {"field": "value"}})
+
+    def test_last_fields_change_invalidates_snapshot(self):
+        self.user.last_fields = LastFields({"field": {"value": 1}}, self.user)
+        self.parametrizer._get_user_data()
+        version = self.user.last_fields.version
+        self.user.last_fields["field"].value = 2
+        self.assertGreater(self.user.last_fields.version, version)
+        self.parametrizer._get_user_data()
+        self.assertEqual(self.user.forms.collect_form_fields.call_count, 2)
+
+    def test_variables_change_invalidates_snapshot(self):
+        self.parametrizer._get_user_data()
+        self.user.variables.set("key", "value")
+        self.user.local_vars.set("local", 1)
+        data = self.parametrizer._get_user_data()
+        self.assertEqual(data["variables"], {"key": "value"})
+        self.assertEqual(data["local_vars"], {"local": 1})
+
+    def test_forms_change_invalidates_snapshot(self):
+        self.parametrizer._get_user_data()
+        self.user.forms.version = next_state_version()
+        self.parametrizer._get_user_data()
+        self.assertEqual(self.user.forms.collect_form_fields.call_count, 2)
+
+    def test_expired_variables_invalidate_snapshot(self):
+        self.user.variables.set("key", "value", ttl=-1)
+        data = self.parametrizer._get_user_data()
+        self.assertEqual(data["variables"], {})
+        self.user.variables.set("other", "value", ttl=-1)
+        self.assertEqual(self.parametrizer._get_user_data()["variables"], {})
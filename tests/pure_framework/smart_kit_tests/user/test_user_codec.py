@@ -0,0 +1,58 @@
+# coding: utf-8
+import importlib.util
+import json
+import unittest
+
+from scenarios.user.user_codec import JsonUserCodec, MAGIC_PREFIX, MsgpackUserCodec, ZlibMsgpackUserCodec, \
+    ZstdMsgpackUserCodec, decode_user_data
+
+# binary codecs need the user_codecs extra
+HAS_MSGPACK = importlib.util.find_spec("msgpack") is not None
+HAS_ZSTANDARD = importlib.util.find_spec("zstandard") is not None
+
+
+class UserCodecTest(unittest.TestCase):
+    def setUp(self):
+        self.values = {"variables": {"values": {"name": "value", "numbers": [1, 2.5, None, True]}},
+                       "history": {"events": ["event"] * 50}}
+
+    @unittest.skipUnless(HAS_MSGPACK and HAS_ZSTANDARD, "msgpack and zstandard are not installed")
+    def test_binary_codecs_round_trip(self):
+        for codec_cls in [MsgpackUserCodec, ZlibMsgpackUserCodec, ZstdMsgpackUserCodec]:
+            with self.subTest(codec=codec_cls.NAME):
+                data = codec_cls().encode(self.values)
+                self.assertTrue(data.startswith(codec_cls.MAGIC))
+                self.assertEqual(decode_user_data(data), self.values)
+                self.assertEqual(decode_user_data(bytearray(data)), self.values)
+
+    @unittest.skipUnless(HAS_MSGPACK and HAS_ZSTANDARD, "msgpack and zstandard are not installed")
+    def test_compressed_codecs_are_smaller(self):
+        packed = MsgpackUserCodec().encode(self.values)
+        self.assertLess(len(ZlibMsgpackUserCodec().encode(self.values)), len(packed))
+        self.assertLess(len(ZstdMsgpackUserCodec().encode(self.values)), len(packed))
+
+    def test_json_users_are_decoded(self):
+        data = JsonUserCodec().encode(self.values)
+        self.assertEqual(data, json.dumps(self.values))
+        self.assertEqual(decode_user_data(data), self.values)
+        self.assertEqual(decode_user_data(data.encode()), self.values)
+
+    def test_non_serializable_values(self):
+        values = {"object": object()}
+        self.assertEqual(decode_user_data(JsonUserCodec().encode(values)), {"object": "<non-serializable: object>"})
+
+    @unittest.skipUnless(HAS_MSGPACK, "msgpack is not installed")
+    def test_msgpack_non_serializable_values(self):
+        values = {"object": object()}
+        self.assertEqual(decode_user_data(MsgpackUserCodec().encode(values)), {"object": "<non-serializable: object>"})
+
+    def test_broken_data(self):
+        with self.assertRaises(ValueError):
+            decode_user_data(MAGIC_PREFIX + b"?data")
+        with self.assertRaises(ValueError):
+            decode_user_data("{not json")
+
+    @unittest.skipUnless(HAS_MSGPACK, "msgpack is not installed")
+    def test_broken_compressed_data(self):
+        with self.assertRaises(ValueError):
+            decode_user_data(ZlibMsgpackUserCodec.MAGIC + b"not compressed")
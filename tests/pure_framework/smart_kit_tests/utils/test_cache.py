@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+
+from smart_kit.utils.cache import ItemExpired, SQLiteCache
+
+
+class SQLiteCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, ".normalization_cache.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_missing_database(self):
+        cache = SQLiteCache(float("+inf"))
+        with self.assertRaises(FileNotFoundError):
+            cache.load(self.path)
+        cache["phrase"] = {"normalized_text": "фраза"}
+        self.assertEqual(cache["phrase"], {"normalized_text": "фраза"})
+        with self.assertRaises(KeyError):
+            cache["other"]
+
+    def test_saved_items_are_shared(self):
+        cache = SQLiteCache(float("+inf"))
+        cache["phrase"] = {"normalized_text": "фраза"}
+        cache.save(self.path)
+        self.assertTrue(os.path.isfile(os.path.join(self.directory.name, ".normalization_cache.sqlite")))
+
+        other = SQLiteCache(float("+inf"))
+        other.load(self.path)
+        self.assertEqual(other["phrase"], {"normalized_text": "фраза"})
+        other["second"] = {"normalized_text": "второй"}
+        other.save(self.path)
+        self.assertEqual(list(cache.values()), [{"normalized_text": "фраза"}, {"normalized_text": "второй"}])
+
+    def test_batches_are_written(self):
+        cache = SQLiteCache(float("+inf"))
+        cache.save(self.path)
+        for i in range(SQLiteCache.WRITE_BATCH_SIZE):
+            cache[str(i)] = i
+        self.assertEqual(cache._pending, {})
+        other = SQLiteCache(float("+inf"))
+        other.load(self.path)
+        self.assertEqual(other["7"], 7)
+
+    def test_expired(self):
+        cache = SQLiteCache(0)
+        cache["phrase"] = "value"
+        cache.save(self.path)
+        cache["phrase"] = "value"
+        with self.assertRaises(ItemExpired):
+            cache["phrase"]
+
+    def test_clear(self):
+        cache = SQLiteCache(float("+inf"))
+        cache["phrase"] = "value"
+        cache.save(self.path)
+        cache.clear()
+        with self.assertRaises(KeyError):
+            cache["phrase"]
+
+    def test_loaded_database_is_not_written(self):
+        cache = SQLiteCache(float("+inf"))
+        cache["phrase"] = "value"
+        cache.save(self.path)
+        other = SQLiteCache(float("+inf"))
+        other.load(self.path)
+        for i in range(SQLiteCache.WRITE_BATCH_SIZE):
+            other[str(i)] = i
+        self.assertEqual(other["7"], 7)
+        self.assertEqual(list(cache.values()), ["value"])
+
+    def test_writable_database(self):
+        cache = SQLiteCache(float("+inf"))
+        cache["old"] = "value"
+        cache.save(self.path)
+        writer = SQLiteCache(float("+inf"))
+        writer.load(self.path, writable=True)
+        writer.MEMORY_SIZE = 2
+        writer.clear()
+        for i in range(3):
+            writer[str(i)] = i
+        self.assertEqual(writer["0"], 0)
+        writer.save(self.path, update=False)
+        self.assertEqual(sorted(cache.values()), [0, 1, 2])
+
+    def test_missing_database_is_created_writable(self):
+        cache = SQLiteCache(float("+inf"))
+        cache.load(self.path, writable=True)
+        cache["phrase"] = "value"
+        cache.save(self.path)
+        other = SQLiteCache(float("+inf"))
+        other.load(self.path)
+        self.assertEqual(other["phrase"], "value")
+
+    def test_memory_is_bounded(self):
+        cache = SQLiteCache(float("+inf"), read_only=True)
+        cache.MEMORY_SIZE = 2
+        for i in range(3):
+            cache[str(i)] = i
+        with self.assertRaises(KeyError):
+            cache["0"]
+        self.assertEqual(cache["2"], 2)
+
+    def test_read_only_is_not_saved(self):
+        cache = SQLiteCache(float("+inf"), read_only=True)
+        cache["phrase"] = "value"
+        cache.save(self.path)
+        self.assertFalse(os.path.exists(SQLiteCache.db_path(self.path)))
+        self.assertEqual(cache["phrase"], "value")
+        with self.assertRaises(KeyError):
+            cache["other"]
+
+    def test_write_error(self):
+        with open(SQLiteCache.db_path(self.path), "wb") as file:
+            file.write(b"not a database" * 100)
+        cache = SQLiteCache(float("+inf"))
+        cache["phrase"] = "value"
+        with self.assertLogs(level="ERROR"):
+            cache.save(self.path)
+        self.assertEqual(cache["phrase"], "value")
+        cache["other"] = "value"
+        with self.assertRaises(KeyError):
+            cache["missing"]